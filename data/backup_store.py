@@ -0,0 +1,362 @@
+"""Content-addressed backup store for DB snapshots (<repo>/backups/store, or backups/store next to
+a DB outside the repository).
+
+- Every backup point is identified by the blake2b hash of the snapshot bytes; objects are
+  gzip-compressed and stored once per hash, so repeated backups of an unchanged DB cost nothing
+- Per-record delta chains: a snapshot in the repository layout ({"items": [...]}, unique ids,
+  indent=2) is stored as the changed/new records + runs of unchanged positions against the
+  previous backup; chains are capped at MAX_CHAIN, then a full object is written again
+- manifest.json lists the backup points (time, hash, label, source, size, chain depth) and
+  the base of every delta object
+- Retention: the last `keep_last` points plus the newest point per hour / day / week for the
+  configured number of buckets; objects no longer reachable from the manifest are deleted
+- restore(dst, point_in_time): newest point at or before the given time, verified against its
+  hash and written atomically; restore_hash(dst, digest) for a known point (object file names
+  start with the hash, see services/backup_service.restore_json)
+- describe(entry): hash, time and the restore_point() call for logs; object files themselves
+  are gzip and may be deltas, so they are never handed out as "the backup"
+- Manifest read-modify-write (backup, prune) holds an exclusive lock on <store>/store.lock
+  (data/file_lock.py), restore a shared one, so processes backing up the same DB keep each
+  other's points
+"""
+from __future__ import annotations
+
+import gzip, hashlib, json, logging, os, time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from data.file_lock import FileLock
+
+log = logging.getLogger(__name__)
+
+MAX_CHAIN = 16
+DEFAULT_RETENTION = {"keep_last": 20, "hourly": 24, "daily": 14, "weekly": 12}
+
+PointInTime = Union[None, float, int, str, datetime]
+
+
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def store_for(db_path: Union[str, Path]) -> "BackupStore":
+    """Store for a DB: <repo>/backups/store (the old backups/ folder) for DBs inside the
+    repository, <db dir>/backups/store for any other location (PROMPT_DB_PATH, tests)."""
+    db = Path(db_path).resolve()
+    try:
+        db.relative_to(_REPO_ROOT)
+    except ValueError:
+        return BackupStore(db.parent / "backups" / "store")
+    return BackupStore(_REPO_ROOT / "backups" / "store")
+
+
+def _hash(payload: bytes) -> str:
+    return hashlib.blake2b(payload, digest_size=20).hexdigest()
+
+
+def _serialize(data: Any) -> bytes:
+    # byte-identical to PromptRepository._dump, which makes record deltas reversible
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _records(payload: bytes) -> Optional[List[Dict]]:
+    """Items of a snapshot if it can be stored as a record delta, else None."""
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or list(data) != ["items"] or not isinstance(data["items"], list):
+        return None
+    items = data["items"]
+    ids = [it.get("id") if isinstance(it, dict) else None for it in items]
+    if not all(isinstance(i, str) and i for i in ids) or len(set(ids)) != len(ids):
+        return None
+    return items if _serialize(data) == payload else None
+
+
+def _to_ts(point: PointInTime) -> float:
+    if point is None:
+        return float("inf")
+    if isinstance(point, (int, float)):
+        return float(point)
+    if isinstance(point, str):
+        point = datetime.fromisoformat(point)
+    if point.tzinfo is None:
+        point = point.astimezone()  # naive = local time
+    return point.timestamp()
+
+
+class BackupStore:
+    def __init__(self, root: Union[str, Path], delta: bool = True, retention: Optional[Dict[str, int]] = None) -> None:
+        self.root = Path(root)
+        self.delta = delta
+        self.retention = dict(DEFAULT_RETENTION if retention is None else retention)
+        self._lock: Optional[FileLock] = None
+
+    @property
+    def lock(self) -> FileLock:
+        if self._lock is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._lock = FileLock(str(self.root / "store.lock"))
+        return self._lock
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    def object_path(self, digest: str, kind: str = "full") -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.{kind}.gz"
+
+    # ----------------- manifest -----------------
+    def _load(self) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return [], {}
+        except ValueError as e:
+            log.warning("Unreadable backup manifest %s: %s", self.manifest_path, e)
+            return [], {}
+        points = [e for e in manifest.get("points") or [] if isinstance(e, dict) and e.get("hash")]
+        return sorted(points, key=lambda e: e["ts"]), dict(manifest.get("deltas") or {})
+
+    def _save(self, points: List[Dict[str, Any]], deltas: Dict[str, str]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"points": points, "deltas": deltas}, f, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Backup points, oldest first."""
+        return self._load()[0]
+
+    @staticmethod
+    def _depth(digest: str, deltas: Dict[str, str]) -> int:
+        depth = 0
+        while digest in deltas:
+            digest, depth = deltas[digest], depth + 1
+        return depth
+
+    # ----------------- objects -----------------
+    def _put(self, path: Path, payload: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with gzip.open(tmp, "wb", compresslevel=6) as f:
+            f.write(payload)
+        os.replace(tmp, path)
+
+    def locate(self, digest: str) -> Tuple[str, Path]:
+        """("full" | "delta", object file) for a snapshot hash."""
+        for kind in ("full", "delta"):
+            p = self.object_path(digest, kind)
+            if p.exists():
+                return kind, p
+        raise FileNotFoundError(f"backup object {digest} missing in {self.root}")
+
+    def snapshot_bytes(self, digest: str) -> bytes:
+        """Raw snapshot bytes for a hash, resolving delta chains."""
+        chain: List[Dict] = []
+        while True:
+            kind, path = self.locate(digest)
+            with gzip.open(path, "rb") as f:
+                payload = f.read()
+            if kind == "full":
+                break
+            delta = json.loads(payload)
+            chain.append(delta)
+            digest = delta["base"]
+        for delta in reversed(chain):
+            items = json.loads(payload)["items"]
+            payload = _serialize({"items": self._apply_delta(items, delta)})
+            if _hash(payload) != delta["hash"]:
+                raise ValueError(f"backup object {delta['hash']} does not reproduce its snapshot")
+        return payload
+
+    @staticmethod
+    def _make_delta(base: List[Dict], items: List[Dict]) -> Dict[str, Any]:
+        """Runs of base positions ["b", start, n] and new records ["n", [items]];
+        records whose content changed in place are listed in 'changed'."""
+        pos = {it["id"]: n for n, it in enumerate(base)}
+        segments: List[list] = []
+        changed: Dict[str, Dict] = {}
+        for it in items:
+            p = pos.get(it["id"])
+            if p is None:
+                if segments and segments[-1][0] == "n":
+                    segments[-1][1].append(it)
+                else:
+                    segments.append(["n", [it]])
+                continue
+            if it != base[p]:
+                changed[it["id"]] = it
+            last = segments[-1] if segments else None
+            if last and last[0] == "b" and last[1] + last[2] == p:
+                last[2] += 1
+            else:
+                segments.append(["b", p, 1])
+        return {"segments": segments, "changed": changed}
+
+    @staticmethod
+    def _apply_delta(base: List[Dict], delta: Dict[str, Any]) -> List[Dict]:
+        changed = delta.get("changed") or {}
+        out: List[Dict] = []
+        for seg in delta["segments"]:
+            if seg[0] == "n":
+                out.extend(seg[1])
+            else:
+                out.extend(changed.get(it["id"], it) for it in base[seg[1]:seg[1] + seg[2]])
+        return out
+
+    # ----------------- backup / restore -----------------
+    def backup(self, src: Union[str, Path], label: str = "", now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Record a backup point of `src`; returns the manifest entry (None if src is missing)."""
+        src = Path(src)
+        try:
+            payload = src.read_bytes()
+        except FileNotFoundError:
+            return None
+        digest = _hash(payload)
+        with self.lock.exclusive():
+            entries, deltas = self._load()
+            if entries and entries[-1]["hash"] == digest:
+                return entries[-1]  # unchanged since the last point: that point stays valid
+            if not self._has_object(digest):
+                base = self._store(digest, payload, entries[-1]["hash"] if entries else None, deltas)
+                if base:
+                    deltas[digest] = base
+            ts = time.time() if now is None else now
+            entry = {
+                "ts": ts,
+                "time": datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds"),
+                "hash": digest,
+                "size": len(payload),
+                "depth": self._depth(digest, deltas),
+                "label": label,
+                "source": str(src),
+            }
+            entries.append(entry)
+            self._save(entries, deltas)
+            self._prune()
+            log.info("Backup of %s: %s (%s bytes, depth %s, label=%s)", src, digest[:12], len(payload), entry["depth"], label)
+            return entry
+
+    def _has_object(self, digest: str) -> bool:
+        return self.object_path(digest, "full").exists() or self.object_path(digest, "delta").exists()
+
+    def _store(self, digest: str, payload: bytes, prev: Optional[str], deltas: Dict[str, str]) -> Optional[str]:
+        """Write the object for `payload`; returns the base hash if it was stored as a delta."""
+        items = _records(payload) if self.delta and prev and self._depth(prev, deltas) < MAX_CHAIN else None
+        if items is not None:
+            try:
+                base = _records(self.snapshot_bytes(prev))
+            except (OSError, ValueError) as e:
+                log.warning("Backup base %s unusable (%s); storing full snapshot", prev[:12], e)
+                base = None
+            if base is not None:
+                delta = self._make_delta(base, items)
+                delta.update(base=prev, hash=digest)
+                blob = json.dumps(delta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                # only worth it when small, and only safe when it reproduces the bytes (key order!)
+                if len(blob) < len(payload) // 2 and _hash(_serialize({"items": self._apply_delta(base, delta)})) == digest:
+                    self._put(self.object_path(digest, "delta"), blob)
+                    return prev
+        self._put(self.object_path(digest, "full"), payload)
+        return None
+
+    def find(self, point_in_time: PointInTime = None) -> Optional[Dict[str, Any]]:
+        """Newest backup point at or before `point_in_time` (datetime, ISO string, epoch; None = latest)."""
+        limit = _to_ts(point_in_time)
+        found = None
+        for e in self.entries():
+            if e["ts"] <= limit:
+                found = e
+        return found
+
+    def find_hash(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Newest backup point with snapshot hash `digest`."""
+        found = None
+        for e in self.entries():
+            if e["hash"] == digest:
+                found = e
+        return found
+
+    def describe(self, entry: Dict[str, Any]) -> str:
+        """Hash, time and restore call of a backup point, for logs and tool output."""
+        return (f"{entry['hash'][:12]} ({entry['time']}); restore with "
+                f"services.backup_service.restore_point(dst, {entry['ts']!r}, {str(self.root.parent)!r})")
+
+    def restore(self, dst: Union[str, Path], point_in_time: PointInTime = None) -> Dict[str, Any]:
+        """Write the snapshot valid at `point_in_time` to `dst` (atomically). Returns its entry."""
+        return self._restore(dst, lambda: self.find(point_in_time), f"at or before {point_in_time!r}")
+
+    def restore_hash(self, dst: Union[str, Path], digest: str) -> Dict[str, Any]:
+        """Write the snapshot with hash `digest` to `dst` (atomically). Returns its entry."""
+        return self._restore(dst, lambda: self.find_hash(digest), f"with hash {digest}")
+
+    def _restore(self, dst: Union[str, Path], pick: Callable[[], Optional[Dict[str, Any]]], what: str) -> Dict[str, Any]:
+        with self.lock.shared():  # no prune() between finding the point and reading its chain
+            entry = pick()
+            if entry is None:
+                raise LookupError(f"no backup {what} in {self.root}")
+            payload = self.snapshot_bytes(entry["hash"])
+        if _hash(payload) != entry["hash"]:
+            raise ValueError(f"backup {entry['hash']} is corrupt")
+        dst = Path(dst)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(dst.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, dst)
+        log.info("Restored %s from backup %s (%s)", dst, entry["hash"][:12], entry["time"])
+        return entry
+
+    # ----------------- retention -----------------
+    def _keep(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        policy = self.retention
+        newest_first = sorted(entries, key=lambda e: e["ts"], reverse=True)
+        keep = {id(e) for e in newest_first[: policy.get("keep_last", 0)]}
+        for name, width in (("hourly", 3600), ("daily", 86400), ("weekly", 7 * 86400)):
+            buckets: Set[int] = set()
+            for e in newest_first:
+                bucket = int(e["ts"] // width)
+                if bucket in buckets:
+                    continue
+                if len(buckets) >= policy.get(name, 0):
+                    break
+                buckets.add(bucket)
+                keep.add(id(e))
+        return [e for e in entries if id(e) in keep]
+
+    def prune(self) -> int:
+        """Apply the retention policy and delete unreachable objects. Returns points removed."""
+        with self.lock.exclusive():
+            return self._prune()
+
+    def _prune(self) -> int:
+        entries, deltas = self._load()
+        kept = self._keep(entries)
+        live: Set[str] = set()
+        for e in kept:
+            digest = e["hash"]
+            while digest and digest not in live:  # a delta keeps its whole chain alive
+                live.add(digest)
+                digest = deltas.get(digest)
+        live_deltas = {d: b for d, b in deltas.items() if d in live}
+        if len(kept) != len(entries) or len(live_deltas) != len(deltas):
+            self._save(kept, live_deltas)
+        self._collect(live)
+        return len(entries) - len(kept)
+
+    def _collect(self, live: Set[str]) -> None:
+        objects = self.root / "objects"
+        if not objects.is_dir():
+            return
+        for path in objects.glob("*/*.gz"):
+            if path.name.split(".", 1)[0] not in live:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    log.warning("Removing backup object %s failed: %s", path, e)
@@ -6,8 +6,9 @@ Each article is a dict with optional 'tags' key; tags are normalized before stor
 from __future__ import annotations
 
 import json
-from typing import Iterable, Tuple, Dict, List, IO
+from typing import Iterable, Tuple, Dict, List, IO, Optional
 from .tag_normalizer import TagNormalizer
+from .article_ingestor import ingest_article
 
 
 def _iter_json_lines(fp: IO[str]) -> Iterable[Dict]:
@@ -18,11 +19,18 @@ def _iter_json_lines(fp: IO[str]) -> Iterable[Dict]:
         yield json.loads(line)
 
 
-def bulk_ingest_from_path(path: str, repo, normalizer: TagNormalizer) -> List[Tuple[Dict, List[Tuple[str, str]]]]:
+def bulk_ingest_from_path(path: str, repo, normalizer: TagNormalizer, batch_size: Optional[int] = None) -> List[Tuple[Dict, List[Tuple[str, str]]]]:
     results = []
     with open(path, "r", encoding="utf-8") as f:
         for obj in _iter_json_lines(f):
-            from .article_ingestor import ingest_article
-            stored, log = ingest_article(repo, obj, normalizer)
+            # pure transform here; persisted below in batches
+            stored, log = ingest_article(None, obj, normalizer)
             results.append((stored, log))
+
+    add_many = getattr(repo, "add_many", None)
+    if callable(add_many):
+        add_many([stored for stored, _ in results], batch_size=batch_size)
+    elif callable(getattr(repo, "add", None)):
+        for stored, _ in results:
+            repo.add(stored)
     return results
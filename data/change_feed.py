@@ -0,0 +1,147 @@
+"""Change events for repository subscribers and a cross-process change feed.
+
+- ChangeEvent: ids added / updated / deleted by one commit, tagged with the feed generation
+- ChangeFeed: every commit appends one JSON line to <db>.changes (the writer holds the DB's
+  exclusive lock, so generations are strictly increasing); other processes poll() the file
+  from their last offset and get the events they have not seen yet
+- The feed is rotated (os.replace) once it grows past MAX_FEED_BYTES; a reader that sees a
+  new file, a generation gap or an unreadable line gets a `reset` event (reload everything)
+"""
+from __future__ import annotations
+
+import json, logging, os, uuid
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+MAX_FEED_BYTES = 1 << 20
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    generation: int
+    added: Tuple[str, ...] = ()
+    updated: Tuple[str, ...] = ()
+    deleted: Tuple[str, ...] = ()
+    reset: bool = False  # unknown change (external rewrite, missed feed lines): reload everything
+    source: str = ""     # writer token of the ChangeFeed that appended the event
+
+    @classmethod
+    def from_ops(cls, ops: Iterable[Dict], generation: int = 0, source: str = "") -> "ChangeEvent":
+        """Net effect of (flattened) mutation ops: an id added and deleted again is dropped,
+        an id added and then updated stays 'added'."""
+        state: Dict[str, str] = {}
+        for op in ops:
+            kind = op.get("op")
+            if kind in ("add", "update"):
+                doc_id = str((op.get("item") or {}).get("id") or op.get("id"))
+                prev = state.get(doc_id)
+                if kind == "add":
+                    state[doc_id] = "updated" if prev == "deleted" else "added"
+                elif prev != "added":
+                    state[doc_id] = "updated"
+            elif kind == "delete":
+                doc_id = str(op.get("id"))
+                if state.get(doc_id) == "added":
+                    del state[doc_id]
+                else:
+                    state[doc_id] = "deleted"
+        pick = lambda what: tuple(i for i, s in state.items() if s == what)
+        return cls(generation, pick("added"), pick("updated"), pick("deleted"), source=source)
+
+    def __bool__(self) -> bool:
+        return self.reset or bool(self.added or self.updated or self.deleted)
+
+    def to_json(self) -> str:
+        return json.dumps({"gen": self.generation, "src": self.source, "added": self.added,
+                           "updated": self.updated, "deleted": self.deleted}, ensure_ascii=False)
+
+
+class ChangeFeed:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.source = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.generation = 0
+        self._offset = 0
+        self._ino: Optional[int] = None
+        self.poll()  # start at the current end: earlier changes are part of the loaded state
+
+    def _stat(self) -> Optional[os.stat_result]:
+        try:
+            return os.stat(self.path)
+        except OSError:
+            return None
+
+    def poll(self) -> List[ChangeEvent]:
+        """Events appended by other writers since the last poll()/append()."""
+        st = self._stat()
+        if st is None:
+            return []
+        events: List[ChangeEvent] = []
+        if st.st_ino != self._ino or st.st_size < self._offset:
+            # first poll, or the feed was rotated: continue from the end of the new file
+            known = self._ino is not None
+            self._ino, self._offset = st.st_ino, 0
+            last = self._read_new()
+            if last and known:
+                events.append(ChangeEvent(last[-1].generation, reset=True))
+            if last:
+                self.generation = last[-1].generation
+            return events
+        if st.st_size == self._offset:
+            return events
+        for ev in self._read_new():
+            if ev.reset or ev.generation != self.generation + 1:
+                events.append(ChangeEvent(ev.generation, reset=True))
+            elif ev.source != self.source:
+                events.append(ev)
+            self.generation = ev.generation
+        return events
+
+    def _read_new(self) -> List[ChangeEvent]:
+        out: List[ChangeEvent] = []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read()
+        except OSError:
+            return out
+        end = chunk.rfind(b"\n") + 1  # a torn last line is read again on the next poll
+        self._offset += end
+        for line in chunk[:end].splitlines():
+            try:
+                rec = json.loads(line)
+                out.append(ChangeEvent(int(rec["gen"]), tuple(rec.get("added") or ()), tuple(rec.get("updated") or ()),
+                                       tuple(rec.get("deleted") or ()), source=str(rec.get("src", ""))))
+            except Exception:
+                log.warning("Unreadable change feed line in %s", self.path)
+                out.append(ChangeEvent(self.generation, reset=True))
+        return out
+
+    def append(self, event: ChangeEvent) -> ChangeEvent:
+        """Stamp `event` with the next generation and append it. Caller holds the DB's
+        exclusive lock and has poll()ed, so self.generation is the feed's latest."""
+        event = ChangeEvent(self.generation + 1, event.added, event.updated, event.deleted, source=self.source)
+        line = (event.to_json() + "\n").encode("utf-8")
+        st = self._stat()
+        try:
+            if st is not None and st.st_size + len(line) > MAX_FEED_BYTES:
+                tmp = self.path + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(line)
+                os.replace(tmp, self.path)
+                st = self._stat()
+                self._ino, self._offset = (st.st_ino if st else None), len(line)
+            else:
+                with open(self.path, "ab") as f:
+                    f.write(line)
+                    self._offset = f.tell()
+                if self._ino is None:
+                    st = self._stat()
+                    self._ino = st.st_ino if st else None
+        except OSError as e:
+            # the feed is best effort: local subscribers still get the event
+            log.warning("Appending to change feed %s failed: %s", self.path, e)
+        self.generation = event.generation
+        return event
@@ -0,0 +1,85 @@
+"""Migration stamp for the JSON DB (<db>.stamp).
+
+- Records the schema version, that every item has an id, and a blake2b checksum of the
+  snapshot bytes (plus size/mtime as a cheap pre-check)
+- PromptRepository writes it after every snapshot it produces; a DB whose stamp still
+  matches opens without the schema/id migration scans
+- Missing, older or mismatching stamps (external edit, legacy file) mean: migrate fully
+"""
+from __future__ import annotations
+
+import hashlib, json, logging, os
+from typing import Any, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1  # {"items": [...]}, every item with a stable 'id'
+_CHUNK = 1 << 20
+
+
+def stamp_path(db_path: str) -> str:
+    return str(db_path) + ".stamp"
+
+
+def digest_bytes(payload: bytes) -> str:
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def digest_file(db_path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(db_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def read_stamp(db_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(stamp_path(db_path), "r", encoding="utf-8") as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return stamp if isinstance(stamp, dict) else None
+
+
+def write_stamp(db_path: str, digest: Optional[str] = None, ids_complete: bool = True) -> None:
+    """Stamp the DB file as migrated. `digest` of the bytes just written saves re-reading them."""
+    try:
+        st = os.stat(db_path)
+        stamp = {
+            "schema": SCHEMA_VERSION,
+            "ids_complete": bool(ids_complete),
+            "blake2b": digest or digest_file(db_path),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        }
+        tmp = stamp_path(db_path) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(stamp, f)
+        os.replace(tmp, stamp_path(db_path))
+    except OSError as e:
+        # only costs a full scan on the next start
+        log.warning("Writing DB stamp failed: %s", e)
+
+
+def stamp_is_current(db_path: str) -> bool:
+    """True if the DB is unchanged since it was last stamped and needs no migration."""
+    stamp = read_stamp(db_path)
+    if not stamp or stamp.get("schema") != SCHEMA_VERSION or not stamp.get("ids_complete"):
+        return False
+    try:
+        st = os.stat(db_path)
+    except OSError:
+        return False
+    if st.st_size != stamp.get("size"):
+        return False
+    if st.st_mtime_ns == stamp.get("mtime_ns"):
+        return True
+    # touched (copied, restored, synced): same bytes are still fine
+    try:
+        same = digest_file(db_path) == stamp.get("blake2b")
+    except OSError:
+        return False
+    if same:
+        write_stamp(db_path, stamp["blake2b"])
+    return same
@@ -0,0 +1,197 @@
+"""Tag/category facet index backed by integer bitmaps.
+
+- Every prompt gets a dense document number (slots of deleted prompts are reused)
+- Canonical tag -> Bitmap and lowercased category -> Bitmap of document numbers
+- Rare tags keep their document numbers in a small set; a tag switches to dense 64-bit words
+  once those are cheaper (SPARSE_BITS_PER_MEMBER)
+- AND/OR tag filters become bitmap intersections/unions (Python ints, C speed)
+- Per-tag counts for the chip bar are kept up to date on add/remove, tag_counts() is O(tags)
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# bit positions per byte value, for decoding result bitmaps
+_BYTE_BITS = [tuple(b for b in range(8) if v >> b & 1) for v in range(256)]
+# a set member costs about as much memory as this many bitmap bits (hash slot + int object)
+SPARSE_BITS_PER_MEMBER = 512
+
+
+class Bitmap:
+    """Set of document numbers with a maintained count; O(1) set/clear.
+
+    Sparse (a Python set) while the members are few compared to the highest document
+    number, then a growable bitset over 64-bit words (array('Q')).
+    """
+    __slots__ = ("_sparse", "_words", "_hi", "_n")
+
+    def __init__(self) -> None:
+        self._sparse: Optional[Set[int]] = set()
+        self._words = array("Q")
+        self._hi = -1  # highest document number added while sparse
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def sparse(self) -> bool:
+        return self._sparse is not None
+
+    def add(self, n: int) -> None:
+        if n in self:
+            return
+        self._n += 1
+        if self._sparse is not None:
+            self._sparse.add(n)
+            if n > self._hi:
+                self._hi = n
+            if len(self._sparse) * SPARSE_BITS_PER_MEMBER > self._hi:
+                self._densify()
+            return
+        w = n >> 6
+        if w >= len(self._words):
+            self._words.extend([0] * (w + 1 - len(self._words)))
+        self._words[w] |= 1 << (n & 63)
+
+    def _densify(self) -> None:
+        members, self._sparse = self._sparse, None
+        self._words = array("Q", [0]) * ((self._hi >> 6) + 1)
+        for n in members:
+            self._words[n >> 6] |= 1 << (n & 63)
+
+    def discard(self, n: int) -> None:
+        if n not in self:
+            return
+        self._n -= 1
+        if self._sparse is not None:
+            self._sparse.discard(n)
+            return
+        self._words[n >> 6] &= ~(1 << (n & 63)) & 0xFFFFFFFFFFFFFFFF
+
+    def __contains__(self, n: int) -> bool:
+        if self._sparse is not None:
+            return n in self._sparse
+        w = n >> 6
+        return w < len(self._words) and bool(self._words[w] >> (n & 63) & 1)
+
+    def to_int(self) -> int:
+        if self._sparse is not None:
+            if not self._sparse:
+                return 0
+            buf = bytearray((self._hi >> 3) + 1)
+            for n in self._sparse:
+                buf[n >> 3] |= 1 << (n & 7)
+            return int.from_bytes(buf, "little")
+        return int.from_bytes(self._words.tobytes(), "little")
+
+    def count(self) -> int:
+        return self._n
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Positions of the set bits of a non-negative int, ascending."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for i, byte in enumerate(data):
+        if byte:
+            base = i << 3
+            for b in _BYTE_BITS[byte]:
+                yield base + b
+
+
+class FacetIndex:
+    def __init__(self, canonicalize: Callable[[str], str]) -> None:
+        self._canonicalize = canonicalize
+        self._docs: List[Optional[str]] = []                  # doc number -> prompt id
+        self._docno: Dict[str, int] = {}                      # prompt id -> doc number
+        self._free: List[int] = []
+        self._keys: Dict[int, Tuple[Tuple[str, ...], str]] = {}  # doc number -> (tags, category)
+        self._tags: Dict[str, Bitmap] = {}
+        self._tag_n: Dict[str, int] = {}                      # canonical tag -> documents (chip counts)
+        self._cats: Dict[str, Bitmap] = {}
+
+    @staticmethod
+    def category_key(value: Any) -> str:
+        return str(value if value is not None else "").strip().lower()
+
+    def tag_keys(self, tags: Iterable[Any]) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(self._canonicalize(t) for t in (tags or [])))
+
+    # ----------------- maintenance -----------------
+    def add(self, doc_id: str, item: Dict[str, Any]) -> None:
+        doc_id = str(doc_id)
+        if doc_id in self._docno:
+            self.remove(doc_id)
+        docno = self._free.pop() if self._free else len(self._docs)
+        if docno == len(self._docs):
+            self._docs.append(doc_id)
+        else:
+            self._docs[docno] = doc_id
+        self._docno[doc_id] = docno
+        tags = self.tag_keys(item.get("tags"))
+        cat = self.category_key(item.get("category", ""))
+        self._keys[docno] = (tags, cat)
+        tag_n = self._tag_n
+        for t in tags:
+            self._tags.setdefault(t, Bitmap()).add(docno)
+            tag_n[t] = tag_n.get(t, 0) + 1
+        self._cats.setdefault(cat, Bitmap()).add(docno)
+
+    def remove(self, doc_id: str) -> None:
+        docno = self._docno.pop(str(doc_id), None)
+        if docno is None:
+            return
+        tags, cat = self._keys.pop(docno)
+        for t in tags:
+            self._tags[t].discard(docno)
+            n = self._tag_n[t] - 1
+            if n:
+                self._tag_n[t] = n
+            else:
+                del self._tag_n[t], self._tags[t]  # unused tags drop out of the chip bar
+        self._cats[cat].discard(docno)
+        self._docs[docno] = None
+        self._free.append(docno)
+
+    def set_canonicalize(self, canonicalize: Callable[[str], str]) -> None:
+        """Switch the tag mapping (alias reload). Existing keys are kept: documents whose
+        canonical tags change must be re-added by the caller."""
+        self._canonicalize = canonicalize
+
+    @classmethod
+    def build(cls, items: Iterable[Dict[str, Any]], canonicalize: Callable[[str], str]) -> "FacetIndex":
+        index = cls(canonicalize)
+        for it in items:
+            if isinstance(it, dict) and it.get("id"):
+                index.add(str(it["id"]), it)
+        return index
+
+    # ----------------- queries -----------------
+    def match_bits(self, tags: Iterable[str] = (), match_all: bool = True, category: str = "") -> Optional[int]:
+        """Bitmap of documents matching canonical `tags` (AND/OR) and `category`; None = no filter."""
+        result: Optional[int] = None
+        tags = list(dict.fromkeys(tags))
+        if tags:
+            maps = [self._tags[t].to_int() if t in self._tags else 0 for t in tags]
+            result = maps[0]
+            for m in maps[1:]:
+                result = (result & m) if match_all else (result | m)
+        if category:
+            cat = self._cats[category].to_int() if category in self._cats else 0
+            result = cat if result is None else result & cat
+        return result
+
+    def ids(self, bits: int) -> Set[str]:
+        docs = self._docs
+        return {docs[n] for n in iter_bits(bits) if n < len(docs) and docs[n] is not None}
+
+    def match(self, tags: Iterable[str] = (), match_all: bool = True, category: str = "") -> Optional[Set[str]]:
+        bits = self.match_bits(tags, match_all=match_all, category=category)
+        return None if bits is None else self.ids(bits)
+
+    def tag_counts(self) -> Dict[str, int]:
+        return dict(self._tag_n)
+
+    def category_counts(self) -> Dict[str, int]:
+        return {c: len(bm) for c, bm in self._cats.items() if bm and c}
@@ -0,0 +1,238 @@
+"""Cross-process reader/writer lock on a sidecar lock file (<db>.lock).
+
+- fcntl.flock: any number of shared holders (readers) or one exclusive holder (writer)
+- Bounded waits: non-blocking attempts with backoff until `timeout`, then LockTimeout
+- Reentrant within a process (shared inside exclusive is free, shared -> exclusive upgrades);
+  a thread RLock keeps threads of one process from sharing a single flock
+- Fallback without fcntl (Windows) or when flock is unsupported (some network shares):
+  an O_EXCL lock file <path>.excl holding "<pid> <host>"; shared and exclusive both map to it.
+  A lock file is only broken once its holder is gone (same host, pid no longer running) or,
+  for a file without owner (crash between create and write), after STALE_AFTER seconds;
+  holders on other hosts cannot be checked and are waited for
+- LockStats per lock: acquisitions, contended acquisitions, time spent waiting, timeouts
+"""
+from __future__ import annotations
+
+import logging, os, socket, threading, time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+SHARED, EXCLUSIVE = "shared", "exclusive"
+DEFAULT_TIMEOUT = 10.0
+STALE_AFTER = 300.0  # only for lock files without a readable owner
+_POLL_MIN, _POLL_MAX = 0.001, 0.05
+
+
+class LockTimeout(TimeoutError):
+    """The lock could not be acquired within the configured timeout."""
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process with this pid runs on this host (errs on the side of "alive")."""
+    if pid <= 0:
+        return False
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":  # pragma: no cover - Windows; os.kill(pid, 0) would terminate it there
+        import ctypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return ctypes.get_last_error() == 5  # ERROR_ACCESS_DENIED: exists, not ours
+        try:
+            code = ctypes.c_ulong()
+            return not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)) or code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # EPERM: exists, owned by another user
+    return True
+
+
+class LockStats:
+    def __init__(self) -> None:
+        self.acquired = {SHARED: 0, EXCLUSIVE: 0}
+        self.contended = 0
+        self.wait_s = 0.0
+        self.max_wait_s = 0.0
+        self.timeouts = 0
+
+    def record(self, mode: str, waited: float, contended: bool, acquired: bool = True) -> None:
+        if acquired:
+            self.acquired[mode] += 1
+        if contended:
+            self.contended += 1
+            self.wait_s += waited
+            self.max_wait_s = max(self.max_wait_s, waited)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "shared": self.acquired[SHARED],
+            "exclusive": self.acquired[EXCLUSIVE],
+            "contended": self.contended,
+            "wait_ms": round(self.wait_s * 1000, 1),
+            "max_wait_ms": round(self.max_wait_s * 1000, 1),
+            "timeouts": self.timeouts,
+        }
+
+
+class FileLock:
+    def __init__(self, path: str, timeout: float = DEFAULT_TIMEOUT) -> None:
+        self.path = path
+        self.timeout = float(timeout)
+        self.stats = LockStats()
+        self._thread_lock = threading.RLock()
+        self._modes: List[str] = []  # held modes, innermost last
+        self._fd: Optional[int] = None
+        self._use_flock = fcntl is not None
+        self._holds_file = False
+
+    @property
+    def excl_path(self) -> str:
+        return self.path + ".excl"
+
+    @property
+    def held(self) -> Optional[str]:
+        if EXCLUSIVE in self._modes:
+            return EXCLUSIVE
+        return SHARED if self._modes else None
+
+    def shared(self):
+        """Context manager: hold the lock for reading."""
+        return self._hold(SHARED)
+
+    def exclusive(self):
+        """Context manager: hold the lock for writing."""
+        return self._hold(EXCLUSIVE)
+
+    @contextmanager
+    def _hold(self, mode: str) -> Iterator[None]:
+        if not self._thread_lock.acquire(timeout=self.timeout):
+            self.stats.timeouts += 1
+            raise LockTimeout(f"{mode} lock on {self.path} busy in another thread")
+        try:
+            prev = self.held
+            need = prev is None or (mode == EXCLUSIVE and prev == SHARED)
+            if need:
+                try:
+                    self._acquire(mode)
+                except LockTimeout:
+                    if prev is not None:
+                        self._acquire(prev)  # a failed flock conversion may drop the old lock
+                    raise
+            self._modes.append(mode)
+            try:
+                yield
+            finally:
+                self._modes.pop()
+                if need:
+                    if prev is None:
+                        self._release()
+                    else:
+                        self._acquire(prev)  # downgrade back to shared
+        finally:
+            self._thread_lock.release()
+
+    # ----------------- acquisition -----------------
+    def _acquire(self, mode: str) -> None:
+        start = time.monotonic()
+        deadline = start + self.timeout
+        delay, contended = _POLL_MIN, False
+        while not self._try(mode):
+            contended = True
+            now = time.monotonic()
+            if now >= deadline:
+                self.stats.timeouts += 1
+                self.stats.record(mode, now - start, contended, acquired=False)
+                raise LockTimeout(f"{mode} lock on {self.path} not acquired within {self.timeout:.1f}s")
+            time.sleep(min(delay, deadline - now))
+            delay = min(delay * 2, _POLL_MAX)
+        waited = time.monotonic() - start
+        self.stats.record(mode, waited, contended)
+        if contended:
+            log.debug("Waited %.1f ms for %s lock on %s", waited * 1000, mode, self.path)
+
+    def _try(self, mode: str) -> bool:
+        if self._use_flock:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(self._fd, (fcntl.LOCK_EX if mode == EXCLUSIVE else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                return False
+            except OSError as e:
+                log.warning("flock unsupported for %s (%s); falling back to lock file", self.path, e)
+                self._use_flock = False
+                self._close_fd()
+        return self._try_lockfile()
+
+    def _try_lockfile(self) -> bool:
+        if self._holds_file:
+            return True
+        try:
+            fd = os.open(self.excl_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            self._break_if_stale()
+            return False
+        try:
+            os.write(fd, f"{os.getpid()} {socket.gethostname()}\n".encode("utf-8"))
+        finally:
+            os.close(fd)
+        self._holds_file = True
+        return True
+
+    def _break_if_stale(self) -> None:
+        """Remove the lock file if its holder is gone; a running holder keeps it however long it takes."""
+        try:
+            st = os.stat(self.excl_path)
+            with open(self.excl_path, "r", encoding="utf-8", errors="replace") as f:
+                owner = f.read().split()
+        except OSError:
+            return  # released meanwhile; next attempt may succeed
+        if owner and owner[0].isdigit():
+            pid, host = int(owner[0]), owner[1] if len(owner) > 1 else None
+            if host is not None and host != socket.gethostname():
+                return  # cannot check a process on another host
+            if _pid_alive(pid):
+                return
+            reason = f"holder pid {pid} is gone"
+        else:
+            age = time.time() - st.st_mtime
+            if age <= STALE_AFTER:
+                return  # just created, owner not written yet
+            reason = f"no owner, age {age:.0f}s"
+        try:
+            now = os.stat(self.excl_path)
+            if (now.st_ino, now.st_mtime_ns) != (st.st_ino, st.st_mtime_ns):
+                return  # replaced by a new holder meanwhile
+            log.warning("Breaking stale lock file %s (%s)", self.excl_path, reason)
+            os.remove(self.excl_path)
+        except OSError:
+            pass
+
+    def _release(self) -> None:
+        if self._fd is not None:
+            self._close_fd()  # closing the descriptor drops the flock
+        if self._holds_file:
+            self._holds_file = False
+            try:
+                os.remove(self.excl_path)
+            except OSError:
+                pass
+
+    def _close_fd(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            os.close(fd)
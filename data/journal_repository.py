@@ -0,0 +1,123 @@
+"""Append-only journal storage engine for PromptRepository.
+
+- Snapshot stays at db_path in the usual {"items": [...]} layout
+- Mutations are appended as JSON lines to <db_path>.journal (O(1) I/O per add/update/delete)
+- Reads replay snapshot + journal; compaction folds the journal into a new snapshot
+- Compaction runs automatically every `compact_every` ops and on close()
+- A multi-op commit (batch, transaction) is one journal line {"op": "batch", "ops": [...]},
+  so a torn append drops the whole commit instead of half of it
+
+External tools that read prompts.json directly only see the state of the last
+compaction; call close() / compact() before handing over (tools/dedupe_db.py opens
+the journal engine itself while a journal is pending).
+"""
+from __future__ import annotations
+
+import json, os, logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from data.prompt_repository import PromptRepository, apply_ops, DEFAULT_BATCH_SIZE, DEFAULT_LOCK_TIMEOUT
+from data.tag_normalizer import TagNormalizer
+
+log = logging.getLogger(__name__)
+
+DEFAULT_COMPACT_EVERY = 1000
+
+
+class JournalPromptRepository(PromptRepository):
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        normalizer: Optional[TagNormalizer] = None,
+        cache: bool = True,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        compact_every: int = DEFAULT_COMPACT_EVERY,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+    ) -> None:
+        self.compact_every = max(1, int(compact_every))
+        self._journal_ops = 0
+        super().__init__(db_path, normalizer=normalizer, cache=cache, batch_size=batch_size, lock_timeout=lock_timeout)
+
+    @property
+    def journal_path(self) -> str:
+        return self.db_path + ".journal"
+
+    # ----------------- internal IO -----------------
+    def _file_signature(self) -> Optional[Tuple[int, ...]]:
+        snap = super()._file_signature()
+        if snap is None:
+            return None
+        try:
+            st = os.stat(self.journal_path)
+            journal = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError:
+            journal = (0, 0, 0)
+        return snap + journal
+
+    def _read_journal(self) -> List[Dict]:
+        ops: List[Dict] = []
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for ln, line in enumerate(f, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        op = json.loads(line)
+                    except Exception:
+                        # torn tail after a crash mid-append: ignore the fragment
+                        log.warning("Skipping unreadable journal line %s (journal=%s)", ln, self.journal_path)
+                        continue
+                    if isinstance(op, dict):
+                        ops.append(op)
+        except FileNotFoundError:
+            pass
+        return ops
+
+    def _load_raw(self) -> Any:
+        raw = super()._load_raw()
+        ops = self._read_journal()
+        self._journal_ops = sum(len(op.get("ops") or []) if op.get("op") == "batch" else 1 for op in ops)
+        if not ops:
+            return raw
+        return {"items": apply_ops(self._normalize_items(raw), ops)}
+
+    def _dump(self, data: Dict) -> None:
+        super()._dump(data)
+        # snapshot is durable before the journal is dropped; a crash in between
+        # only means the (idempotent) journal gets replayed once more
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+        self._journal_ops = 0
+
+    def _commit(self, data: Dict, ops: List[Dict]) -> None:
+        if self._journal_ops + len(ops) >= self.compact_every:
+            self._write(data)
+            log.info("DB journal compacted into snapshot (db=%s)", self.db_path)
+            return
+        record = ops[0] if len(ops) == 1 else {"op": "batch", "ops": ops}
+        payload = json.dumps(record, ensure_ascii=False) + "\n"
+        try:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            self.invalidate_cache()
+            raise
+        self._journal_ops += len(ops)
+        self._remember(data)
+
+    # ----------------- maintenance -----------------
+    def compact(self) -> None:
+        """Fold the journal into a fresh snapshot."""
+        with self._lock.exclusive():
+            events = self._poll_feed()
+            self._write(self._read())
+            self._announce([])  # same content, new files: tells other processes it is not a reset
+        self._publish(events)
+
+    def close(self) -> None:
+        if self._journal_ops:
+            self.compact()
+        super().close()
@@ -2,17 +2,52 @@
 
 - Anchors DB path at repo root (data/prompts.json)
 - Reads legacy formats and migrates to {"items": [...]}
-- Creates timestamped backups before in-place migration
+- Backs the DB up (data/backup_store.py: content-addressed, deduplicated) before in-place migration
 - Ensures every item has a stable 'id' (uuid4 hex)
+- Migration stamp (data/db_stamp.py, <db>.stamp): a DB unchanged since this repository last
+  wrote it opens without the schema/id scans (one parse, on first read)
 - delete() accepts either index (int) OR id (str)
+- Optional in-memory cache, invalidated when the file's mtime/size/inode changes
+- Batch mutations (add_many/update_many/delete_many) persist once per batch
+- list_items(fields, offset, limit, order_by) projects/slices/sorts; page() is the keyset variant
+  with an opaque cursor that stays stable while items are added or deleted. With the cache the
+  full items are resident anyway (items_resident), so projections save memory only without it
+- Mutations are described as ops ({"op": "add"|"update"|"delete", ...}) and persisted via _commit()
+- Snapshots are written atomically (temp file + fsync + os.replace)
+- transaction(): stage many mutations in memory, persist them once on exit, roll back on error
+- Cross-process locking (data/file_lock.py, <db>.lock): file loads hold a shared lock, commits an
+  exclusive one; a commit whose DB changed on disk since it was read replays its ops onto the
+  current file first, so concurrent writers (GUI, ingest/dedupe tools) do not lose each other's work
+- Change events (data/change_feed.py): subscribe() callbacks get a ChangeEvent (added/updated/
+  deleted ids + generation) per commit; commits are also appended to <db>.changes, and
+  poll_changes() delivers the ones made by other processes
+- id -> position index (lazy, maintained on mutation) for get_by_id/update/delete by id
+- Inverted full-text index (data/search_index.py) answers search()/match_ids() from postings;
+  maintained incrementally and persisted next to the DB (<db>.search.idx);
+  search(rank=True) orders matches by BM25F relevance computed from the same index;
+  fuzzy_search() tolerates typos via trigram similarity over the index vocabulary
+- Facet index (data/facet_index.py): canonical tag / category -> bitmap for tag filters and chip counts
+- TF-IDF index (data/similarity_index.py) for similar()/link_related(); built lazily, kept in step
+- Signature index (data/signature_index.py): prompt_signature per id for O(1) duplicate checks
+  (has_signature(), add_many(skip_duplicates=True)); persisted next to the DB (<db>.sig.idx)
 """
 from __future__ import annotations
 
-import json, os, logging, shutil, re, uuid
-from typing import Dict, Optional, List, Iterable, Set, Any
+import base64, bisect, json, os, logging, re, uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, List, Iterable, Set, Any, Tuple
 from pathlib import Path
-from datetime import datetime
-from data.tag_normalizer import TagNormalizer
+from data.tag_normalizer import TagNormalizer, get_normalizer
+from data.search_index import InvertedIndex, rank_bm25
+from data.trigram_index import DEFAULT_THRESHOLD as FUZZY_THRESHOLD
+from data.facet_index import FacetIndex
+from data.similarity_index import TfidfIndex
+from data.tag_suggest_index import TagSuggestIndex
+from data.signature_index import SignatureIndex, item_signature
+from data.file_lock import FileLock, DEFAULT_TIMEOUT as DEFAULT_LOCK_TIMEOUT
+from data.change_feed import ChangeEvent, ChangeFeed
+from data.db_stamp import digest_bytes, stamp_is_current, write_stamp
+from data.backup_store import store_for
 
 log = logging.getLogger(__name__)
 
@@ -21,57 +56,202 @@ def _default_repo_root() -> Path:
     return Path(__file__).resolve().parents[1]
 
 
-def _ts() -> str:
-    return datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+def resolve_db_path(db_path: Optional[str] = None, default_name: str = "prompts.json") -> Tuple[str, str]:
+    """Resolve the DB location: PROMPT_DB_PATH > ctor argument > repo default. Returns (path, source)."""
+    env_override = os.environ.get("PROMPT_DB_PATH")
+    repo_root = _default_repo_root()
 
+    if env_override:
+        path = Path(env_override)
+        resolved = path if path.is_absolute() else (repo_root / path).resolve()
+        source = "PROMPT_DB_PATH"
+    elif db_path is None:
+        resolved = (repo_root / "data" / default_name).resolve()
+        source = "default@repo_root"
+    else:
+        path = Path(db_path)
+        resolved = path if path.is_absolute() else (repo_root / path).resolve()
+        source = "ctor"
+    return str(resolved), source
 
-class PromptRepository:
-    def __init__(self, db_path: Optional[str] = None, normalizer: Optional[TagNormalizer] = None) -> None:
-        env_override = os.environ.get("PROMPT_DB_PATH")
-        repo_root = _default_repo_root()
-
-        if env_override:
-            path = Path(env_override)
-            resolved = path if path.is_absolute() else (repo_root / path).resolve()
-            source = "PROMPT_DB_PATH"
-        elif db_path is None:
-            resolved = (repo_root / "data" / "prompts.json").resolve()
-            source = "default@repo_root"
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_PAGE_SIZE = 200
+
+
+def project_item(item: Dict, fields: Optional[Iterable[str]]) -> Dict:
+    """Copy of `item` restricted to `fields` ('id' always kept); the item itself for fields=None."""
+    if fields is None:
+        return item
+    out = {"id": item.get("id")}
+    for f in fields:
+        if f in item:
+            out[f] = item[f]
+    return out
+
+
+def parse_order(order_by: Optional[str]) -> Tuple[str, bool]:
+    """'title' -> ('title', False), '-updated_at' -> ('updated_at', True); '' = storage order."""
+    order_by = (order_by or "").strip()
+    return (order_by[1:], True) if order_by.startswith("-") else (order_by, False)
+
+
+def _sort_value(value: Any) -> Tuple[int, str]:
+    # comparable across types; missing/empty values sort last (first with "-field")
+    if value is None or value == "" or value == []:
+        return (1, "")
+    if isinstance(value, (list, tuple)):
+        value = ", ".join(str(v) for v in value)
+    return (0, str(value).casefold())
+
+
+def encode_cursor(state: List[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, ensure_ascii=False).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, order_by: Optional[str]) -> List[Any]:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("invalid cursor") from None
+    if not isinstance(state, list) or not state or state[0] != (order_by or ""):
+        raise ValueError("cursor belongs to a different order_by")
+    return state[1:]
+
+
+def _chunks(seq: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(seq), size):
+        yield seq[start:start + size]
+
+
+def _flatten_ops(ops: Iterable[Dict]) -> Iterable[Dict]:
+    # {"op": "batch", "ops": [...]} groups the ops of one transaction
+    for op in ops:
+        if op.get("op") == "batch":
+            yield from _flatten_ops(op.get("ops") or [])
         else:
-            path = Path(db_path)
-            resolved = path if path.is_absolute() else (repo_root / path).resolve()
-            source = "ctor"
+            yield op
+
 
-        self.db_path = str(resolved)
-        self.normalizer = normalizer or TagNormalizer()
+def apply_ops(items: List[Dict], ops: Iterable[Dict]) -> List[Dict]:
+    """Replay mutation ops onto a list of items and return the resulting list.
+
+    Replay is idempotent: an 'add' for an existing id replaces the item in place,
+    'update'/'delete' for unknown ids are ignored. This makes re-applying a journal
+    on top of a snapshot that already contains some of its ops safe.
+    """
+    by_id: Dict[str, Dict] = {}
+    ops = _flatten_ops(ops)
+    for n, it in enumerate(items):
+        key = str(it.get("id")) if isinstance(it, dict) and it.get("id") else f"\0{n}"
+        by_id[key] = it
+    for op in ops:
+        kind = op.get("op")
+        if kind in ("add", "update"):
+            item = op.get("item")
+            if not isinstance(item, dict) or not item.get("id"):
+                continue
+            key = str(item["id"])
+            if kind == "add" or key in by_id:
+                by_id[key] = item
+        elif kind == "delete":
+            by_id.pop(str(op.get("id")), None)
+    return list(by_id.values())
+
+
+class PromptRepository:
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        normalizer: Optional[TagNormalizer] = None,
+        cache: bool = True,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+    ) -> None:
+        self.db_path, source = resolve_db_path(db_path)
+        self.normalizer = normalizer or get_normalizer()
+        self._watch_aliases = normalizer is None  # shared normalizer: follow edits of the alias file
+        self.batch_size = max(1, int(batch_size))
+        # Parsed DB kept in memory; valid as long as the file signature is unchanged.
+        # Items returned by read methods are shared with the cache: treat them as read-only.
+        self.cache_enabled = bool(cache)
+        self._cache: Optional[Dict] = None
+        self._cache_sig: Optional[Tuple[int, int, int]] = None
+        # file signature the in-memory state was read from / written as (also without cache)
+        self._base_sig: Optional[Tuple[int, ...]] = None
+        self._lock = FileLock(self.db_path + ".lock", timeout=lock_timeout)
+        # change notification: local subscribers + cross-process feed
+        self._subscribers: List[Callable[[ChangeEvent], None]] = []
+        self._feed: Optional[ChangeFeed] = None
+        self._feed_sig: Optional[Tuple[int, ...]] = None  # DB signature as of the last feed poll/append
+        # id -> slot index; belongs to one parsed DB object, positions >= _id_dirty_from may be stale
+        self._id_index: Dict[str, int] = {}
+        self._id_index_owner: Optional[Dict] = None
+        self._id_dirty_from = 0
+        # full-text index; like the id index it belongs to one parsed DB object
+        self._search_index: Optional[InvertedIndex] = None
+        self._search_index_owner: Optional[Dict] = None
+        self._search_dirty = False
+        # tag/category bitmaps; rebuilt from the items (cheap), never persisted
+        self._facet_index: Optional[FacetIndex] = None
+        self._facet_index_owner: Optional[Dict] = None
+        # TF-IDF rows for "similar prompts"; same lifecycle as the facet index
+        self._similarity_index: Optional[TfidfIndex] = None
+        self._similarity_index_owner: Optional[Dict] = None
+        # tag co-occurrence / token -> tag counts for tag suggestions; same lifecycle
+        self._tag_suggest_index: Optional[TagSuggestIndex] = None
+        self._tag_suggest_index_owner: Optional[Dict] = None
+        # (DB object, field, items sorted ascending, their sort keys) for list_items/page(order_by=...)
+        self._order_cache: Optional[Tuple[Dict, str, List[Dict], List[Tuple]]] = None
+        # duplicate signatures; persisted like the full-text index
+        self._signature_index: Optional[SignatureIndex] = None
+        self._signature_index_owner: Optional[Dict] = None
+        self._signature_dirty = False
+        # staged state of an open transaction()
+        self._txn_data: Optional[Dict] = None
+        self._txn_ops: List[Dict] = []
 
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        if not Path(self.db_path).exists():
-            self._write({"items": []})
-            log.info("PromptRepository created new DB file at %s (source=%s)", self.db_path, source)
-        else:
-            self._ensure_schema_on_disk()
-            # NEW: ensure every item has a stable id
-            added = self._ensure_ids_on_disk()
-            if added:
-                log.info("DB ensured ids for %d items (db=%s)", added, self.db_path)
-            log.info("PromptRepository using DB at %s (source=%s)", self.db_path, source)
+        with self._lock.exclusive():
+            if not Path(self.db_path).exists():
+                self._write({"items": []})
+                log.info("PromptRepository created new DB file at %s (source=%s)", self.db_path, source)
+            elif stamp_is_current(self.db_path):
+                log.info("PromptRepository using DB at %s (source=%s, stamp current)", self.db_path, source)
+            else:
+                migrated = self._ensure_schema_on_disk()
+                # NEW: ensure every item has a stable id
+                added = self._ensure_ids_on_disk()
+                if added:
+                    log.info("DB ensured ids for %d items (db=%s)", added, self.db_path)
+                if not (migrated or added):
+                    write_stamp(self.db_path)  # rewrites above stamped already
+                log.info("PromptRepository using DB at %s (source=%s)", self.db_path, source)
+            self._feed = ChangeFeed(self.db_path + ".changes")
+            self._feed_sig = self._file_signature()
 
     # ----------------- internal IO -----------------
     def _backup_db(self) -> Optional[str]:
         try:
-            src = Path(self.db_path)
-            if not src.exists():
-                return None
-            backups = _default_repo_root() / "backups"
-            backups.mkdir(parents=True, exist_ok=True)
-            dst = backups / f"prompts_{_ts()}.json"
-            shutil.copy2(src, dst)
-            return str(dst)
+            store = store_for(self.db_path)
+            entry = store.backup(self.db_path, label="migration")
+            return store.describe(entry) if entry else None
         except Exception as e:
             log.warning("DB backup failed: %s", e)
             return None
 
+    def _file_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def invalidate_cache(self) -> None:
+        """Drop the in-memory copy; the next read re-parses the file."""
+        self._cache = None
+        self._cache_sig = None
+
     def _load_raw(self) -> Any:
         try:
             with open(self.db_path, "r", encoding="utf-8") as f:
@@ -80,7 +260,8 @@ class PromptRepository:
             log.warning("Reading DB failed (%s). Resetting to empty schema.", e)
             return {}
 
-    def _normalize_items(self, data: Any) -> List[Dict]:
+    @staticmethod
+    def _normalize_items(data: Any) -> List[Dict]:
         """Try to extract a list of items from various legacy layouts."""
         # Standard: {"items": [...]}
         if isinstance(data, dict) and isinstance(data.get("items"), list):
@@ -119,31 +300,261 @@ class PromptRepository:
         # Default empty
         return []
 
-    def _ensure_schema_on_disk(self) -> None:
-        """Ensure file is a dict with 'items': list. If not, migrate in place with backup."""
+    def _ensure_schema_on_disk(self) -> bool:
+        """Ensure file is a dict with 'items': list. If not, migrate in place with backup.
+        Returns True if the file was rewritten."""
         raw = self._load_raw()
         items = self._normalize_items(raw)
         if isinstance(raw, dict) and raw.get("items") == items and isinstance(items, list):
-            return  # already normalized
+            return False  # already normalized
 
         # Needs migration
         backup = self._backup_db()
         self._write({"items": items})
         log.info("DB auto-migrated to {{'items': [...]}}; backup=%s; count=%d; db=%s", backup, len(items), self.db_path)
+        return True
 
     def _read(self) -> Dict:
-        raw = self._load_raw()
+        if self._txn_data is not None:
+            # inside transaction(): everything works on the staged copy
+            return self._txn_data
+        if self.cache_enabled and self._cache is not None:
+            if self._cache_sig is not None and self._cache_sig == self._file_signature():
+                return self._cache
+            log.debug("DB changed on disk, reloading (db=%s)", self.db_path)
+        # signature is taken before reading: a concurrent change is picked up on the next call
+        with self._lock.shared():
+            sig = self._file_signature()
+            raw = self._load_raw()
+        self._base_sig = sig
         if not isinstance(raw, dict):
             raw = {"items": []}
         if "items" not in raw or not isinstance(raw["items"], list):
             # self-heal (unlikely after ensure)
             raw["items"] = self._normalize_items(raw)
-            self._write({"items": raw["items"]})
+            with self._lock.exclusive():
+                self._write({"items": raw["items"]})
+            return self._cache if self.cache_enabled and self._cache is not None else raw
+        if self.cache_enabled:
+            self._cache, self._cache_sig = raw, sig
         return raw
 
+    def _dump(self, data: Dict) -> None:
+        # never truncate the live file: write a sibling, fsync, then swap it in
+        tmp = self.db_path + ".tmp"
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.db_path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        # snapshots written here are in the current layout; ids may still be missing mid-migration
+        items = data.get("items") or []
+        write_stamp(self.db_path, digest_bytes(payload), ids_complete=all(isinstance(it, dict) and it.get("id") for it in items))
+
+    def _remember(self, data: Dict) -> None:
+        self._base_sig = self._file_signature()
+        if self.cache_enabled:
+            self._cache, self._cache_sig = data, self._base_sig
+
     def _write(self, data: Dict) -> None:
-        with open(self.db_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """Persist the full DB (snapshot)."""
+        try:
+            self._dump(data)
+        except Exception:
+            self.invalidate_cache()
+            raise
+        self._remember(data)
+
+    def _commit(self, data: Dict, ops: List[Dict]) -> None:
+        """Persist a mutation. `data` is the already mutated DB, `ops` describes the change.
+
+        The JSON engine simply rewrites the file; other engines may persist only `ops`.
+        """
+        self._write(data)
+
+    def _locked_commit(self, data: Dict, ops: List[Dict]) -> Tuple[Dict, List[ChangeEvent]]:
+        """_commit() under the exclusive lock. If another process changed the DB since `data`
+        was read, `ops` are replayed onto the current file instead.
+
+        Returns the persisted DB and the change events to publish (other processes' changes
+        seen in the feed, then this commit).
+
+        On any failure (LockTimeout included) the in-memory copy, which already carries the
+        mutation, is dropped: the next read re-parses the file instead of persisting it later.
+        """
+        try:
+            with self._lock.exclusive():
+                events = self._poll_feed()
+                if self._base_sig is None or self._base_sig != self._file_signature():
+                    log.info("DB changed on disk since it was read; replaying %s ops onto it (db=%s)", len(ops), self.db_path)
+                    self.invalidate_cache()
+                    data = self._read()
+                    data["items"] = apply_ops(data["items"], ops)
+                self._commit(data, ops)
+                events.append(self._announce(ops))
+        except BaseException:
+            self.invalidate_cache()
+            self._base_sig = None
+            raise
+        return data, events
+
+    def _save(self, data: Dict, ops: List[Dict]) -> None:
+        """Persist a mutation and keep the in-memory indexes in step with it."""
+        if self._txn_data is not None:
+            self._txn_ops.extend(ops)  # persisted when the transaction ends
+            self._index_ops(data, ops)
+            return
+        data, events = self._locked_commit(data, ops)
+        self._index_ops(data, ops)
+        self._publish(events)
+
+    @contextmanager
+    def transaction(self):
+        """Unit of work: mutations inside the block are staged in memory and persisted
+        with a single _commit() on exit; an exception discards all of them.
+
+        Nested transaction() blocks join the outermost one.
+        """
+        if self._txn_data is not None:
+            yield self
+            return
+        self._txn_data, self._txn_ops = self._read(), []
+        try:
+            yield self
+        except BaseException:
+            self._txn_data, self._txn_ops = None, []
+            # the staged copy (and the indexes following it) may be the cached object
+            self.invalidate_cache()
+            log.info("DB transaction rolled back (db=%s)", self.db_path)
+            raise
+        data, ops = self._txn_data, self._txn_ops
+        self._txn_data, self._txn_ops = None, []
+        if ops:
+            _, events = self._locked_commit(data, ops)
+            log.info("DB transaction committed: %s ops (db=%s)", len(ops), self.db_path)
+            self._publish(events)
+
+    # ----------------- change events -----------------
+    def subscribe(self, callback: Callable[[ChangeEvent], None]) -> Callable[[], None]:
+        """Call `callback(event)` after every commit (own and, via poll_changes(), other
+        processes'). Returns a function that unsubscribes again."""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    def poll_changes(self) -> List[ChangeEvent]:
+        """Changes other processes committed since the last poll; also sent to subscribers."""
+        with self._lock.shared():
+            events = self._poll_feed()
+        self._publish(events)
+        return events
+
+    def _poll_feed(self) -> List[ChangeEvent]:
+        if self._feed is None:
+            return []
+        events = self._feed.poll()
+        sig = self._file_signature()
+        if sig != self._feed_sig and not events:
+            # rewritten without a feed entry (manual edit, restore, migration)
+            events = [ChangeEvent(self._feed.generation, reset=True)]
+        self._feed_sig = sig
+        return events
+
+    def _announce(self, ops: List[Dict]) -> ChangeEvent:
+        """Append a commit to the feed (exclusive lock held)."""
+        event = ChangeEvent.from_ops(_flatten_ops(ops))
+        if self._feed is not None:
+            event = self._feed.append(event)
+            self._feed_sig = self._file_signature()
+        return event
+
+    def _publish(self, events: List[ChangeEvent]) -> None:
+        for event in events:
+            if not event:
+                continue
+            for callback in list(self._subscribers):
+                try:
+                    callback(event)
+                except Exception:
+                    log.exception("Change subscriber failed (db=%s)", self.db_path)
+
+    def _index_ops(self, data: Dict, ops: List[Dict]) -> None:
+        # indexes not built for this DB object are rebuilt lazily on next use
+        self._order_cache = None
+        if self._id_index_owner is data:
+            self._index_ops_ids(data, ops)
+        if self._search_index_owner is data and self._search_index is not None:
+            self._replay_ops(self._search_index, ops)
+            self._search_dirty = True
+        if self._facet_index_owner is data and self._facet_index is not None:
+            self._replay_ops(self._facet_index, ops)
+        if self._similarity_index_owner is data and self._similarity_index is not None:
+            self._replay_ops(self._similarity_index, ops)
+        if self._tag_suggest_index_owner is data and self._tag_suggest_index is not None:
+            self._replay_ops(self._tag_suggest_index, ops)
+        if self._signature_index_owner is data and self._signature_index is not None:
+            self._replay_ops(self._signature_index, ops)
+            self._signature_dirty = True
+
+    @staticmethod
+    def _replay_ops(index: Any, ops: List[Dict]) -> None:
+        """Apply mutation ops to an in-memory index with add(id, item)/remove(id)."""
+        for op in ops:
+            if op.get("op") in ("add", "update"):
+                index.add(str(op["item"].get("id")), op["item"])
+            elif op.get("op") == "delete":
+                index.remove(str(op.get("id")))
+
+    def _index_ops_ids(self, data: Dict, ops: List[Dict]) -> None:
+        items = data.get("items", [])
+        next_slot = len(items) - sum(1 for op in ops if op.get("op") == "add")
+        for op in ops:
+            kind = op.get("op")
+            if kind == "add":
+                self._id_index.setdefault(str(op["item"].get("id")), next_slot)
+                next_slot += 1
+            elif kind == "delete":
+                slot = self._id_index.pop(str(op.get("id")), None)
+                if slot is not None:
+                    # later items moved down by one; repaired on demand
+                    self._id_dirty_from = min(self._id_dirty_from, slot)
+            # updates keep their slot
+
+    @property
+    def search_index_path(self) -> str:
+        return self.db_path + ".search.idx"
+
+    @property
+    def signature_index_path(self) -> str:
+        return self.db_path + ".sig.idx"
+
+    def lock_stats(self) -> Dict[str, Any]:
+        """Acquisitions, contention and wait time of the cross-process DB lock."""
+        return self._lock.stats.as_dict()
+
+    def close(self) -> None:
+        """Flush pending state (persist indexes that changed since they were loaded)."""
+        if self._lock.stats.contended:
+            log.info("DB lock stats: %s (db=%s)", self.lock_stats(), self.db_path)
+        if self._search_dirty and self._search_index is not None and self._search_index_owner is self._cache:
+            try:
+                self._search_index.save(self.search_index_path, self._cache_sig)
+                self._search_dirty = False
+            except Exception as e:
+                log.warning("Saving search index failed: %s", e)
+        if self._signature_dirty and self._signature_index is not None and self._signature_index_owner is self._cache:
+            try:
+                self._signature_index.save(self.signature_index_path, self._cache_sig)
+                self._signature_dirty = False
+            except Exception as e:
+                log.warning("Saving signature index failed: %s", e)
 
     # ----------------- ID handling -----------------
     def _ensure_ids_on_disk(self) -> int:
@@ -159,17 +570,42 @@ class PromptRepository:
             self._write(data)
         return added
 
+    def _rebuild_id_index(self, data: Dict, start: int = 0) -> None:
+        items = data.get("items", [])
+        if start == 0 or self._id_index_owner is not data:
+            self._id_index, self._id_index_owner, start = {}, data, 0
+        index = self._id_index
+        # walk backwards so the first occurrence of a duplicated id wins
+        for idx in range(len(items) - 1, start - 1, -1):
+            it = items[idx]
+            if not isinstance(it, dict):
+                continue
+            key = str(it.get("id", ""))
+            cur = index.get(key)
+            if cur is None or cur >= start:
+                index[key] = idx
+        self._id_dirty_from = len(items)
+
     def _find_index_by_id(self, id_value: str) -> Optional[int]:
-        data = self._read()
-        for idx, it in enumerate(data.get("items", [])):
-            if isinstance(it, dict) and str(it.get("id", "")) == str(id_value):
-                return idx
-        return None
+        return self._slot_of(self._read(), id_value)
 
-    # ----------------- CRUD ------------------------
-    def add(self, item: Dict) -> Dict:
-        data = self._read()
-        before = len(data.get("items", []))
+    def _slot_of(self, data: Dict, id_value: str) -> Optional[int]:
+        items = data.get("items", [])
+        key = str(id_value)
+        if self._id_index_owner is not data:
+            self._rebuild_id_index(data)
+        elif self._id_dirty_from < len(items):
+            self._rebuild_id_index(data, self._id_dirty_from)
+        slot = self._id_index.get(key)
+        if slot is None:
+            return None
+        if slot < len(items) and isinstance(items[slot], dict) and str(items[slot].get("id", "")) == key:
+            return slot
+        # stale entry (e.g. an id changed through update()): fall back to a full rebuild
+        self._rebuild_id_index(data)
+        return self._id_index.get(key)
+
+    def _prepare_new(self, item: Dict) -> Dict:
         item = dict(item)
         # ensure id
         if not item.get("id"):
@@ -177,15 +613,9 @@ class PromptRepository:
         # normalize tags
         tags, _ = self.normalizer.normalize_list(item.get("tags", []))
         item["tags"] = tags
-        data["items"].append(item)
-        self._write(data)
-        after = len(data.get("items", []))
-        log.info("DB add() ok: %s -> %s items (db=%s)", before, after, self.db_path)
         return item
 
-    def update(self, idx: int, fields: Dict) -> Dict:
-        data = self._read()
-        item = data["items"][idx]
+    def _apply_fields(self, item: Dict, fields: Optional[Dict]) -> Dict:
         for k, v in (fields or {}).items():
             if k == "tags":
                 v, _ = self.normalizer.normalize_list(v)
@@ -193,9 +623,37 @@ class PromptRepository:
         # never drop id
         if not item.get("id"):
             item["id"] = uuid.uuid4().hex
+        return item
+
+    def _resolve_index(self, items: List[Dict], key: int | str) -> int:
+        if isinstance(key, int):
+            if not -len(items) <= key < len(items):
+                raise IndexError("list index out of range")
+            return key % len(items)
+        idx = self._find_index_by_id(str(key))
+        if idx is None:
+            raise KeyError(f"id not found: {key}")
+        return idx
+
+    # ----------------- CRUD ------------------------
+    def add(self, item: Dict) -> Dict:
+        data = self._read()
+        before = len(data.get("items", []))
+        item = self._prepare_new(item)
+        data["items"].append(item)
+        self._save(data, [{"op": "add", "item": item}])
+        after = len(data.get("items", []))
+        log.info("DB add() ok: %s -> %s items (db=%s)", before, after, self.db_path)
+        return item
+
+    def update(self, key: int | str, fields: Dict) -> Dict:
+        """Update by index (int) OR by stable id (str). Returns the updated item."""
+        data = self._read()
+        idx = self._resolve_index(data["items"], key)
+        item = self._apply_fields(data["items"][idx], fields)
         data["items"][idx] = item
-        self._write(data)
-        log.info("DB update() idx=%s ok (db=%s)", idx, self.db_path)
+        self._save(data, [{"op": "update", "id": item["id"], "item": item}])
+        log.info("DB update() key=%s (idx=%s) ok (db=%s)", key, idx, self.db_path)
         return item
 
     def delete(self, key: int | str) -> Dict:
@@ -204,7 +662,7 @@ class PromptRepository:
         items = data.get("items", [])
         if isinstance(key, int):
             removed = items.pop(key)
-            self._write(data)
+            self._save(data, [{"op": "delete", "id": removed.get("id")}])
             log.info("DB delete() idx=%s ok (db=%s)", key, self.db_path)
             return removed
         # else: treat as id
@@ -212,10 +670,64 @@ class PromptRepository:
         if idx is None:
             raise KeyError(f"id not found: {key}")
         removed = items.pop(idx)
-        self._write(data)
+        self._save(data, [{"op": "delete", "id": removed.get("id")}])
         log.info("DB delete() id=%s (idx=%s) ok (db=%s)", key, idx, self.db_path)
         return removed
 
+    # ----------------- batch mutations ------------------------
+    def add_many(self, items: Iterable[Dict], batch_size: Optional[int] = None, skip_duplicates: bool = False) -> List[Dict]:
+        """Add items (ids assigned, tags normalized); persists once per batch. Returns stored items.
+
+        skip_duplicates: drop items whose title+content signature is already in the DB
+        (or earlier in `items`).
+        """
+        if skip_duplicates:
+            items = self._without_duplicates(items)
+        prepared = [self._prepare_new(it) for it in items]
+        for batch in _chunks(prepared, batch_size or self.batch_size):
+            data = self._read()
+            data["items"].extend(batch)
+            self._save(data, [{"op": "add", "item": it} for it in batch])
+            log.info("DB add_many() +%s -> %s items (db=%s)", len(batch), len(data["items"]), self.db_path)
+        return prepared
+
+    def update_many(self, updates: Iterable[Tuple[int | str, Dict]], batch_size: Optional[int] = None) -> List[Dict]:
+        """Apply (index-or-id, fields) pairs; persists once per batch. Returns updated items."""
+        updates = list(updates)
+        out: List[Dict] = []
+        for batch in _chunks(updates, batch_size or self.batch_size):
+            data = self._read()
+            items = data["items"]
+            ops: List[Dict] = []
+            for key, fields in batch:
+                idx = self._resolve_index(items, key)
+                item = self._apply_fields(items[idx], fields)
+                ops.append({"op": "update", "id": item["id"], "item": item})
+                out.append(item)
+            self._save(data, ops)
+            log.info("DB update_many() %s items (db=%s)", len(batch), self.db_path)
+        return out
+
+    def delete_many(self, keys: Iterable[int | str], batch_size: Optional[int] = None) -> List[Dict]:
+        """Delete by index (positions before the call) or id; persists once per batch. Returns removed items."""
+        items = self._read()["items"]
+        # resolve everything up front so positions do not shift between batches
+        ids: List[str] = []
+        for key in keys:
+            ids.append(str(items[self._resolve_index(items, key)].get("id")))
+        ids = list(dict.fromkeys(ids))
+        removed: List[Dict] = []
+        for batch in _chunks(ids, batch_size or self.batch_size):
+            data = self._read()
+            drop = set(batch)
+            keep: List[Dict] = []
+            for it in data["items"]:
+                (removed if str(it.get("id")) in drop else keep).append(it)
+            data["items"] = keep
+            self._save(data, [{"op": "delete", "id": i} for i in batch])
+            log.info("DB delete_many() -%s -> %s items (db=%s)", len(batch), len(keep), self.db_path)
+        return removed
+
     def get(self, idx: int) -> Dict:
         return self._read()["items"][idx]
 
@@ -232,20 +744,148 @@ class PromptRepository:
 
     def bulk_update_from_alias_map(self) -> int:
         data = self._read()
-        mutated = 0
-        for it in data.get("items", []):
-            new_tags, _ = self.normalizer.normalize_list(it.get("tags", []))
+        ops: List[Dict] = []
+        items = data.get("items", [])
+        normalized = self.normalizer.normalize_many(it.get("tags", []) for it in items)
+        for it, new_tags in zip(items, normalized):
             if new_tags != it.get("tags", []):
                 it["tags"] = new_tags
-                mutated += 1
+                ops.append({"op": "update", "id": it.get("id"), "item": it})
+        mutated = len(ops)
         if mutated:
-            self._write(data)
+            self._save(data, ops)
         log.info("DB reindex aliases -> mutated=%s (db=%s)", mutated, self.db_path)
         return mutated
 
+    def reload_aliases(self, normalizer: Optional[TagNormalizer] = None) -> int:
+        """Switch to a new alias map and re-tag only the items it affects.
+
+        - normalizer: the new map; default: the shared normalizer of the alias file
+        - Diffs old and new map; candidates are the facet postings of the changed tags' old
+          canonical forms (full scan without cache), rewritten in one update_many() commit
+        - Assumes stored tags match the old map; bulk_update_from_alias_map() is the full repair
+        - If the commit fails, the old map stays in effect
+        Returns the number of re-tagged items.
+        """
+        new, old = normalizer or get_normalizer(), self.normalizer
+        if new is old:
+            return 0
+        changed = old.changed_keys(new)
+        data = self._read()
+        facets = self._facets(data)
+        if not changed:
+            candidates: List[Dict] = []
+        elif facets is not None:
+            # postings are still keyed by the old canonical tags
+            ids = facets.match([old.canonicalize(k) for k in changed], match_all=False) or set()
+            candidates = self._items_for_ids(data, ids)
+        else:
+            candidates = data.get("items", [])
+        self.normalizer = new
+        if facets is not None:
+            facets.set_canonicalize(new.canonicalize)  # unaffected postings stay valid
+        else:
+            self._facet_index = None
+        self._tag_suggest_index = None  # keyed by canonical tags; rebuilt on next use
+        normalized = new.normalize_many(it.get("tags", []) for it in candidates)
+        updates = [(str(it.get("id")), {"tags": tags})
+                   for it, tags in zip(candidates, normalized) if tags != it.get("tags", [])]
+        try:
+            if updates:
+                self.update_many(updates, batch_size=len(updates))
+        except BaseException:
+            # nothing was written: stored tags and postings still follow the old map
+            self.normalizer = old
+            if facets is not None:
+                facets.set_canonicalize(old.canonicalize)
+            raise
+        log.info("DB reload aliases -> changed=%s candidates=%s mutated=%s (db=%s)",
+                 len(changed), len(candidates), len(updates), self.db_path)
+        return len(updates)
+
+    def check_aliases(self) -> int:
+        """Alias hot reload: re-tag incrementally if the alias file changed since the last check.
+        No-op for repositories created with their own normalizer."""
+        if not self._watch_aliases:
+            return 0
+        return self.reload_aliases(get_normalizer())
+
     # --------------- UI helper methods -------------
-    def list_items(self) -> List[Dict]:
-        return list(self._read().get("items", []))
+    def list_items(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        order_by: Optional[str] = None,
+    ) -> List[Dict]:
+        """Items in storage order (or sorted by `order_by`, '-field' = descending), optionally
+        projected onto `fields` and sliced by offset/limit. Use page() to walk large DBs."""
+        data = self._read()
+        field, desc = parse_order(order_by)
+        items = self._sorted(data, field)[0] if field else data.get("items", [])
+        if desc:
+            items = items[::-1]
+        end = None if limit is None else offset + max(0, int(limit))
+        window = items[max(0, int(offset)):end]  # a copy, like the old list(...)
+        return window if fields is None else [project_item(it, fields) for it in window]
+
+    def page(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        order_by: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Keyset pagination: (items, next_cursor); next_cursor is None after the last page.
+
+        A page continues after the last item returned (not at an offset), so inserts or deletes
+        between calls neither repeat nor skip items.
+        """
+        data = self._read()
+        limit = max(1, int(limit))
+        field, desc = parse_order(order_by)
+        if not field:
+            items = data.get("items", [])
+            start = 0
+            if cursor:
+                slot, last_id = decode_cursor(cursor, order_by)
+                found = self._find_index_by_id(str(last_id))
+                start = found + 1 if found is not None else min(int(slot), len(items))  # last item deleted
+            window = items[start:start + limit]
+            more = start + limit < len(items)
+            last = [start + len(window) - 1, window[-1].get("id")] if window else None
+        else:
+            items, keys = self._sorted(data, field)
+            if not desc:
+                start = bisect.bisect_right(keys, tuple(decode_cursor(cursor, order_by))) if cursor else 0
+                window = items[start:start + limit]
+                more = start + limit < len(items)
+                last = list(keys[start + len(window) - 1]) if window else None
+            else:
+                end = bisect.bisect_left(keys, tuple(decode_cursor(cursor, order_by))) if cursor else len(items)
+                start = max(0, end - limit)
+                window = items[start:end][::-1]
+                more = start > 0
+                last = list(keys[start]) if window else None
+        next_cursor = encode_cursor([order_by or ""] + last) if more and last else None
+        return [project_item(it, fields) for it in window], next_cursor
+
+    def _sorted(self, data: Dict, field: str) -> Tuple[List[Dict], List[Tuple]]:
+        cached = self._order_cache
+        if cached is not None and cached[0] is data and cached[1] == field:
+            return cached[2], cached[3]
+        keyed = sorted((((*_sort_value(it.get(field)), str(it.get("id", ""))), it)
+                        for it in data.get("items", []) if isinstance(it, dict)), key=lambda pair: pair[0])
+        items, keys = [it for _, it in keyed], [k for k, _ in keyed]
+        if self.cache_enabled and data is self._cache:
+            self._order_cache = (data, field, items, keys)
+        return items, keys
+
+    @property
+    def items_resident(self) -> bool:
+        """Whether read methods hand out items the cache keeps in memory anyway. Listings for
+        display should then use them as they are: list_items(fields=...) only adds copies."""
+        return self.cache_enabled
 
     def all(self) -> List[Dict]:
         return self.list_items()
@@ -268,26 +908,278 @@ class PromptRepository:
                     tags.add(t.strip())
         return sorted(tags)
 
-    def search(self, query: str = "", tags: Iterable[str] = (), category: str = "") -> List[Dict]:
+    # --------------- full-text index -------------
+    def _text_index(self, data: Dict) -> Optional[InvertedIndex]:
+        """Inverted index for `data`; None without cache (it would be rebuilt on every call)."""
+        if not self.cache_enabled or data is not self._cache:
+            return None
+        if self._search_index_owner is not data or self._search_index is None:
+            index = InvertedIndex.load(self.search_index_path, self._cache_sig)
+            if index is None:
+                index = InvertedIndex.build(data.get("items", []))
+                self._search_dirty = True
+            else:
+                self._search_dirty = False
+            self._search_index, self._search_index_owner = index, data
+        return self._search_index
+
+    def _text_candidates(self, data: Dict, q: str) -> Optional[Set[str]]:
+        """Ids that may contain `q`; None if the index cannot narrow it down."""
+        index = self._text_index(data)
+        return index.candidates(q) if index is not None else None
+
+    def _items_for_ids(self, data: Dict, ids: Iterable[str]) -> List[Dict]:
+        """Items with the given ids, in DB order."""
+        items = data.get("items", [])
+        slots = sorted(s for s in (self._slot_of(data, i) for i in ids) if s is not None)
+        return [items[s] for s in slots]
+
+    def _candidate_items(self, data: Dict, q: str) -> Optional[List[Dict]]:
+        """Items (in DB order) that may contain `q`; None if the index cannot narrow it down."""
+        ids = self._text_candidates(data, q)
+        return None if ids is None else self._items_for_ids(data, ids)
+
+    # --------------- facet index -----------------
+    def _facets(self, data: Dict) -> Optional[FacetIndex]:
+        """Facet bitmaps for `data`; None without cache."""
+        if not self.cache_enabled or data is not self._cache:
+            return None
+        if self._facet_index_owner is not data or self._facet_index is None:
+            self._facet_index = FacetIndex.build(data.get("items", []), self.normalizer.canonicalize)
+            self._facet_index_owner = data
+        return self._facet_index
+
+    def ids_with_tags(self, tags: Iterable[str], match_all: bool = True, category: str = "") -> Optional[Set[str]]:
+        """Ids carrying all (match_all) or any of `tags` (canonicalized) within `category`.
+
+        None when neither tags nor category are given.
+        """
+        tset = [self.normalizer.canonicalize(t) for t in (tags or []) if str(t).strip()]
+        cat = (category or "").strip().lower()
+        if not tset and not cat:
+            return None
+        data = self._read()
+        facets = self._facets(data)
+        if facets is not None:
+            return facets.match(tset, match_all=match_all, category=cat)
+        wanted = set(tset)
+        out: Set[str] = set()
+        for it in data.get("items", []):
+            if cat and str(it.get("category", "")).strip().lower() != cat:
+                continue
+            have = {self.normalizer.canonicalize(t) for t in (it.get("tags") or [])}
+            if wanted and not (wanted.issubset(have) if match_all else wanted & have):
+                continue
+            out.add(str(it.get("id", "")))
+        return out
+
+    def tag_counts(self) -> Dict[str, int]:
+        """Canonical tag -> number of prompts carrying it."""
+        data = self._read()
+        facets = self._facets(data)
+        if facets is not None:
+            return facets.tag_counts()
+        counts: Dict[str, int] = {}
+        for it in data.get("items", []):
+            for t in set(self.normalizer.canonicalize(t) for t in (it.get("tags") or [])):
+                counts[t] = counts.get(t, 0) + 1
+        return counts
+
+    def match_ids(self, query: str, fields: Iterable[str] = ("title", "content", "description", "category")) -> Optional[Set[str]]:
+        """Ids whose fields (joined by newlines, lowercased) contain `query`; None for an empty query."""
+        q = (query or "").strip().lower()
+        if not q:
+            return None
+        fields = tuple(fields)
+        data = self._read()
+        items = self._candidate_items(data, q)
+        if items is None:
+            items = data.get("items", [])
+        out: Set[str] = set()
+        for it in items:
+            if q in "\n".join(str(it.get(f, "")) for f in fields).lower():
+                out.add(str(it.get("id", "")))
+        return out
+
+    # --------------- duplicate signatures ---------
+    def _signatures(self, data: Dict) -> SignatureIndex:
+        if self._signature_index_owner is not data or self._signature_index is None:
+            cached = self.cache_enabled and data is self._cache
+            index = SignatureIndex.load(self.signature_index_path, self._cache_sig) if cached else None
+            if index is None:
+                index = SignatureIndex.build(data.get("items", []))
+                self._signature_dirty = cached
+            else:
+                self._signature_dirty = False
+            if not cached:
+                return index
+            self._signature_index, self._signature_index_owner = index, data
+        return self._signature_index
+
+    def has_signature(self, sig: str) -> bool:
+        """True if a prompt with this prompt_signature() (title + content) exists."""
+        return sig in self._signatures(self._read())
+
+    def is_duplicate(self, item: Dict) -> bool:
+        return self.has_signature(item_signature(item))
+
+    def _without_duplicates(self, items: Iterable[Dict]) -> List[Dict]:
+        index = self._signatures(self._read())
+        seen: Set[str] = set()
+        out: List[Dict] = []
+        for it in items:
+            sig = item_signature(it)
+            if sig in index or sig in seen:
+                continue
+            seen.add(sig)
+            out.append(it)
+        return out
+
+    # --------------- similar prompts -------------
+    def _similarity(self, data: Dict) -> TfidfIndex:
+        if self._similarity_index_owner is not data or self._similarity_index is None:
+            index = TfidfIndex.build(data.get("items", []))
+            if not self.cache_enabled or data is not self._cache:
+                return index
+            self._similarity_index, self._similarity_index_owner = index, data
+        return self._similarity_index
+
+    def similar(self, key: int | str, k: int = 10) -> List[Tuple[Dict, float]]:
+        """Top-k (item, cosine similarity) for the prompt at index/id `key`, best first."""
+        data = self._read()
+        items = data.get("items", [])
+        source = items[self._resolve_index(items, key)]
+        return self._with_items(data, self._similarity(data).similar_to(str(source.get("id", "")), k))
+
+    def similar_to_text(self, text: str, k: int = 10) -> List[Tuple[Dict, float]]:
+        """Top-k (item, cosine similarity) for free text, best first."""
+        data = self._read()
+        return self._with_items(data, self._similarity(data).similar_to_text(text, k))
+
+    def _with_items(self, data: Dict, hits: List[Tuple[str, float]]) -> List[Tuple[Dict, float]]:
+        items = data.get("items", [])
+        out: List[Tuple[Dict, float]] = []
+        for doc_id, score in hits:
+            slot = self._slot_of(data, doc_id)
+            if slot is not None:
+                out.append((items[slot], score))
+        return out
+
+    def link_related(self, k: int = 5, min_score: float = 0.2) -> int:
+        """Fill `related_ids` of every prompt with its top-k similar prompts; returns #updated."""
+        data = self._read()
+        index = self._similarity(data)
+        updates: List[Tuple[str, Dict]] = []
+        for it in data.get("items", []):
+            pid = str(it.get("id", ""))
+            related = [doc_id for doc_id, score in index.similar_to(pid, k) if score >= min_score]
+            if related != list(it.get("related_ids") or []):
+                updates.append((pid, {"related_ids": related}))
+        self.update_many(updates)
+        return len(updates)
+
+    def fuzzy_search(self, query: str, limit: int = 20, threshold: float = FUZZY_THRESHOLD) -> List[Dict]:
+        """Up to `limit` items most similar to `query` (typo tolerant), best first."""
+        data = self._read()
+        index = self._text_index(data)
+        if index is None:
+            index = InvertedIndex.build(data.get("items", []))
+        items = data.get("items", [])
+        out: List[Dict] = []
+        for doc_id, _score in index.fuzzy(query, threshold=threshold, limit=limit):
+            slot = self._slot_of(data, doc_id)
+            if slot is not None:
+                out.append(items[slot])
+        return out
+
+    @staticmethod
+    def _haystack(it: Dict) -> str:
+        return " ".join([
+            str(it.get("title", "")),
+            str(it.get("content", "")),
+            str(it.get("category", "")),
+            " ".join(it.get("tags", []) or []),
+        ]).lower()
+
+    def search(
+        self,
+        query: str = "",
+        tags: Iterable[str] = (),
+        category: str = "",
+        rank: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Items containing `query` with all `tags` in `category`.
+
+        rank=True orders them by BM25F relevance (title > description > content) instead
+        of DB order; limit keeps the first/top `limit` results.
+        """
         q = (query or "").strip().lower()
         tset = {self.normalizer.canonicalize(t) for t in (tags or []) if str(t).strip()}
         cat = (category or "").strip().lower()
 
+        data = self._read()
+        facets = self._facets(data) if (tset or cat) else None
+        ids = facets.match(tset, category=cat) if facets is not None else None
+        if q:
+            text_ids = self._text_candidates(data, q)
+            if text_ids is not None:
+                ids = text_ids if ids is None else ids & text_ids
+        items = data.get("items", []) if ids is None else self._items_for_ids(data, ids)
         results: List[Dict] = []
-        for it in self._read().get("items", []):
-            if cat and (str(it.get("category", "")).strip().lower() != cat):
-                continue
-            item_tags = [self.normalizer.canonicalize(t) for t in (it.get("tags") or [])]
-            if tset and not tset.issubset(set(item_tags)):
-                continue
-            if q:
-                hay = " ".join([
-                    str(it.get("title", "")),
-                    str(it.get("content", "")),
-                    str(it.get("category", "")),
-                    " ".join(it.get("tags", []) or []),
-                ]).lower()
-                if q not in hay:
+        for it in items:
+            if facets is None:
+                if cat and (str(it.get("category", "")).strip().lower() != cat):
+                    continue
+                item_tags = [self.normalizer.canonicalize(t) for t in (it.get("tags") or [])]
+                if tset and not tset.issubset(set(item_tags)):
                     continue
+            if q and q not in self._haystack(it):
+                continue
             results.append(it)
-        return results
+        if rank and q:
+            return rank_bm25(results, q, index=self._text_index(data), limit=limit)
+        return results if limit is None else results[:max(0, limit)]
+
+    # --------------- tag suggestions -------------
+    def _tag_suggestions(self, data: Dict) -> TagSuggestIndex:
+        if self._tag_suggest_index_owner is not data or self._tag_suggest_index is None:
+            index = TagSuggestIndex.build(data.get("items", []), self.normalizer.canonicalize)
+            if not self.cache_enabled or data is not self._cache:
+                return index
+            self._tag_suggest_index, self._tag_suggest_index_owner = index, data
+        return self._tag_suggest_index
+
+    def suggest_tags(self, text: str, tags: Iterable[str] = (), k: int = 8) -> List[Tuple[str, float]]:
+        """Top-k (canonical tag, score) for prompt text, learned from the tagged prompts; `tags`
+        already chosen add co-occurrence evidence and are not suggested again."""
+        return self._tag_suggestions(self._read()).suggest(text, tags, k)
+
+    def related_tags(self, tag: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (canonical tag, cosine) most often used together with `tag`."""
+        return self._tag_suggestions(self._read()).related(tag, k)
+
+
+BACKENDS = ("json", "journal", "sqlite")
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+
+def open_repository(db_path: Optional[str] = None, backend: Optional[str] = None, **kwargs: Any):
+    """Create a repository for the selected storage engine.
+
+    backend: "json" (default), "journal" or "sqlite"; falls back to $PROMPT_DB_BACKEND.
+    Without an explicit backend a DB path ending in .sqlite/.sqlite3/.db selects SQLite.
+    """
+    name = (backend or os.environ.get("PROMPT_DB_BACKEND") or "").strip().lower()
+    if not name:
+        path, _ = resolve_db_path(db_path)
+        name = "sqlite" if Path(path).suffix.lower() in SQLITE_SUFFIXES else "json"
+    if name == "sqlite":
+        from data.sqlite_repository import SqlitePromptRepository
+        return SqlitePromptRepository(db_path, **kwargs)
+    if name == "json":
+        return PromptRepository(db_path, **kwargs)
+    if name == "journal":
+        from data.journal_repository import JournalPromptRepository
+        return JournalPromptRepository(db_path, **kwargs)
+    raise ValueError(f"unknown DB backend: {name!r} (expected one of {', '.join(BACKENDS)})")
@@ -0,0 +1,421 @@
+"""Token-level inverted index for PromptRepository full-text search.
+
+- Indexes title, description, content, category and tags (lowercased `\\w+` tokens)
+- Forward index per document (term ids in order) = positional information
+- Postings per term: array of document numbers; deletes are tombstoned and compacted
+- candidates(query) returns a superset of the documents whose text contains `query`
+  as a substring; callers verify the few candidates against their exact haystack
+- save()/load() persist the index next to the DB as JSON (arrays as base64 bytes) together with
+  the DB signature; anything that does not match is ignored and the index rebuilt
+- bm25() scores documents with BM25F over title/description/content (field boosts)
+  straight from the forward index; rank_bm25() orders a result list by it
+- fuzzy() finds documents despite typos via a trigram index over the vocabulary
+  (data/trigram_index.py), synced lazily with newly added terms
+"""
+from __future__ import annotations
+
+import base64, heapq, json, logging, math, os, re, sys
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from data.trigram_index import TrigramIndex, DEFAULT_THRESHOLD
+
+log = logging.getLogger(__name__)
+
+INDEX_VERSION = 2  # 2: JSON instead of pickle
+FIELDS = ("title", "description", "content", "category", "tags")
+BM25_BOOSTS = {"title": 2.5, "description": 1.5, "content": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def field_text(item: Dict[str, Any], field: str) -> str:
+    if field == "tags":
+        return " ".join(str(t) for t in (item.get("tags") or []))
+    return str(item.get(field, ""))
+
+
+class InvertedIndex:
+    def __init__(self) -> None:
+        self._term_ids: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._postings: List[array] = []          # term id -> doc numbers (ascending)
+        self._df: List[int] = []                  # term id -> live document frequency
+        self._docs: List[Optional[str]] = []      # doc number -> prompt id (None = deleted)
+        self._docno: Dict[str, int] = {}          # prompt id -> doc number
+        self._forward: List[Optional[array]] = [] # doc number -> term ids in field order
+        self._field_ends: List[Optional[Tuple[int, ...]]] = []
+        self._dead = 0
+        self._field_len_sums: List[int] = [0] * len(FIELDS)  # live token count per field
+        self._vocab_blob: Optional[str] = None    # "\n"-joined terms for fast substring lookup
+        self._vocab_offsets: List[int] = []
+        self._trigrams: Optional[TrigramIndex] = None  # built on first fuzzy() call
+
+    # ----------------- maintenance -----------------
+    def __len__(self) -> int:
+        return len(self._docno)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._docno
+
+    def add(self, doc_id: str, item: Dict[str, Any]) -> None:
+        doc_id = str(doc_id)
+        if doc_id in self._docno:
+            self.remove(doc_id)
+        docno = len(self._docs)
+        term_ids = self._term_ids
+        tokens: List[str] = []
+        ends: List[int] = []
+        for field in FIELDS:
+            tokens.extend(tokenize(field_text(item, field)))
+            ends.append(len(tokens))
+        for tok in set(tokens).difference(term_ids):
+            term_ids[tok] = len(self._terms)
+            self._terms.append(tok)
+            self._postings.append(array("I"))
+            self._df.append(0)
+            self._vocab_blob = None
+        seq = array("I", map(term_ids.__getitem__, tokens))
+        postings, df = self._postings, self._df
+        for tid in set(seq):
+            postings[tid].append(docno)
+            df[tid] += 1
+        self._docs.append(doc_id)
+        self._docno[doc_id] = docno
+        self._forward.append(seq)
+        self._field_ends.append(tuple(ends))
+        self._count_fields(ends, 1)
+
+    def _count_fields(self, ends: Sequence[int], sign: int) -> None:
+        start = 0
+        for fi, end in enumerate(ends):
+            self._field_len_sums[fi] += sign * (end - start)
+            start = end
+
+    def remove(self, doc_id: str) -> None:
+        docno = self._docno.pop(str(doc_id), None)
+        if docno is None:
+            return
+        for tid in set(self._forward[docno] or ()):
+            self._df[tid] -= 1
+        self._count_fields(self._field_ends[docno] or (), -1)
+        self._docs[docno] = None
+        self._forward[docno] = None
+        self._field_ends[docno] = None
+        self._dead += 1
+        if self._dead > 1000 and self._dead > len(self._docno):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Drop tombstones: renumber live documents and rebuild the postings."""
+        live = [(d, f, e) for d, f, e in zip(self._docs, self._forward, self._field_ends) if d is not None]
+        self._postings = [array("I") for _ in self._terms]
+        self._docs, self._forward, self._field_ends, self._docno = [], [], [], {}
+        for docno, (doc_id, seq, ends) in enumerate(live):
+            for tid in set(seq):
+                self._postings[tid].append(docno)
+            self._docs.append(doc_id)
+            self._docno[doc_id] = docno
+            self._forward.append(seq)
+            self._field_ends.append(ends)
+        self._dead = 0
+
+    @classmethod
+    def build(cls, items: Iterable[Dict[str, Any]]) -> "InvertedIndex":
+        index = cls()
+        for it in items:
+            if isinstance(it, dict) and it.get("id"):
+                index.add(str(it["id"]), it)
+        return index
+
+    # ----------------- lookup -----------------
+    def _matching_terms(self, tok: str, whole_left: bool, whole_right: bool) -> List[int]:
+        """Term ids containing `tok`; whole_left/right demand that it starts/ends the term."""
+        if whole_left and whole_right:
+            tid = self._term_ids.get(tok)
+            return [] if tid is None else [tid]
+        if self._vocab_blob is None:
+            self._vocab_blob = "\n".join(self._terms)
+            offsets, pos = [], 0
+            for t in self._terms:
+                offsets.append(pos)
+                pos += len(t) + 1
+            self._vocab_offsets = offsets
+        blob, offsets = self._vocab_blob, self._vocab_offsets
+        found: List[int] = []
+        start = blob.find(tok)
+        while start != -1:
+            tid = bisect_right(offsets, start) - 1
+            term = self._terms[tid]
+            if (not whole_left or term.startswith(tok)) and (not whole_right or term.endswith(tok)):
+                found.append(tid)
+            # continue behind this term; further hits in it add nothing
+            start = blob.find(tok, offsets[tid] + len(term) + 1)
+        return found
+
+    def _docs_for_terms(self, tids: Sequence[int]) -> Set[int]:
+        out: Set[int] = set()
+        for tid in tids:
+            if self._df[tid]:
+                out.update(self._postings[tid])
+        return out
+
+    def candidates(self, query: str) -> Optional[Set[str]]:
+        """Ids of documents that may contain `query` as a substring (lowercased).
+
+        Returns None when the query has no word characters and the index cannot help.
+        """
+        q = (query or "").lower()
+        spans = [(m.group(0), m.start(), m.end()) for m in _TOKEN_RE.finditer(q)]
+        if not spans:
+            return None
+        # a token bounded by non-word characters inside the query must be a whole term
+        per_token = [
+            self._docs_for_terms(self._matching_terms(tok, start > 0, end < len(q)))
+            for tok, start, end in spans
+        ]
+        per_token.sort(key=len)
+        docnos = per_token[0]
+        for other in per_token[1:]:
+            if not docnos:
+                break
+            docnos = docnos & other
+        return {self._docs[n] for n in docnos if self._docs[n] is not None}
+
+    def positions(self, doc_id: str, term: str) -> List[int]:
+        """Token positions of `term` in the document (fields concatenated in FIELDS order)."""
+        docno, tid = self._docno.get(str(doc_id)), self._term_ids.get(term)
+        if docno is None or tid is None:
+            return []
+        return [i for i, t in enumerate(self._forward[docno]) if t == tid]
+
+    # ----------------- ranking -----------------
+    def bm25(
+        self,
+        query: str,
+        doc_ids: Iterable[str],
+        boosts: Optional[Dict[str, float]] = None,
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+    ) -> Dict[str, float]:
+        """BM25F score per id in `doc_ids` (0.0 for ids not in the index).
+
+        Query tokens are expanded like candidates() does, so partial words score too.
+        """
+        boosts = BM25_BOOSTS if boosts is None else boosts
+        q = (query or "").lower()
+        n = len(self._docno) or 1
+        idf: Dict[int, float] = {}
+        for m in _TOKEN_RE.finditer(q):
+            for tid in self._matching_terms(m.group(0), m.start() > 0, m.end() < len(q)):
+                df = self._df[tid]
+                if df:
+                    idf[tid] = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+        fields = [(FIELDS.index(f), w) for f, w in boosts.items() if f in FIELDS and w]
+        avg = {fi: (self._field_len_sums[fi] / n) or 1.0 for fi, _ in fields}
+        query_terms = set(idf)
+        scores: Dict[str, float] = {}
+        for doc_id in doc_ids:
+            docno = self._docno.get(str(doc_id))
+            if docno is None or not query_terms:
+                scores[doc_id] = 0.0
+                continue
+            seq, ends = self._forward[docno], self._field_ends[docno]
+            segments = []
+            for fi, w in fields:
+                start, end = (ends[fi - 1] if fi else 0), ends[fi]
+                if end > start:
+                    segments.append((seq[start:end], w / (1.0 - b + b * (end - start) / avg[fi])))
+            score = 0.0
+            for tid in query_terms.intersection(seq):
+                tf = sum(seg.count(tid) * norm for seg, norm in segments)
+                if tf:
+                    score += idf[tid] * tf * (k1 + 1.0) / (k1 + tf)
+            scores[doc_id] = score
+        return scores
+
+    def fuzzy(self, query: str, threshold: float = DEFAULT_THRESHOLD, limit: int = 20) -> List[Tuple[str, float]]:
+        """Top `limit` (id, score) pairs for a query that may contain typos.
+
+        Each query token is matched against vocabulary terms by trigram similarity; a
+        document scores the mean over tokens of its best matching term's similarity.
+        Documents are visited through the postings of the most similar terms first
+        (threshold algorithm), so the scan stops as soon as the top `limit` are certain.
+        """
+        tokens = list(dict.fromkeys(tokenize(query or "")))
+        if not tokens or limit <= 0:
+            return []
+        if self._trigrams is None:
+            self._trigrams = TrigramIndex()
+        self._trigrams.sync(self._terms)
+        similar = [self._trigrams.similar(tok, threshold) for tok in tokens]
+        keys = [set(sims) for sims in similar]
+        streams = [self._fuzzy_stream(sims) for sims in similar]
+        bounds = [1.0] * len(tokens)   # best similarity still reachable per token
+        n, docs, forward = len(tokens), self._docs, self._forward
+        seen: Set[int] = set()
+        top: List[Tuple[float, int]] = []  # min-heap of (score, -docno)
+        while any(s is not None for s in streams):
+            for i, stream in enumerate(streams):
+                if stream is None:
+                    continue
+                step = next(stream, None)
+                if step is None:
+                    streams[i], bounds[i] = None, 0.0
+                    continue
+                bounds[i], chunk = step
+                for docno in chunk:
+                    if docno in seen or docs[docno] is None:
+                        continue
+                    seen.add(docno)
+                    present = set(forward[docno])
+                    score = sum(max((sims[t] for t in present.intersection(k)), default=0.0)
+                                for sims, k in zip(similar, keys)) / n
+                    entry = (score, -docno)
+                    if len(top) < limit:
+                        heapq.heappush(top, entry)
+                    elif entry > top[0]:
+                        heapq.heapreplace(top, entry)
+            if len(top) >= limit and top[0][0] >= sum(bounds) / n:
+                break
+        top.sort(reverse=True)
+        return [(docs[-neg], score) for score, neg in top]
+
+    def _fuzzy_stream(self, sims: Dict[int, float], chunk: int = 64):
+        """Yields (similarity, docnos) in descending similarity, `chunk` docs at a time."""
+        for tid in sorted(sims, key=sims.__getitem__, reverse=True):
+            if not self._df[tid]:
+                continue
+            plist = self._postings[tid]
+            for start in range(0, len(plist), chunk):
+                yield sims[tid], plist[start:start + chunk]
+
+    # ----------------- persistence -----------------
+    def save(self, path: str, signature: Any) -> None:
+        postings, postings_lens = _pack(self._postings)
+        forward, forward_lens = _pack(self._forward)
+        state = {
+            "version": INDEX_VERSION,
+            "signature": _json_signature(signature),
+            "byteorder": sys.byteorder,
+            "itemsize": array("I").itemsize,
+            "terms": self._terms,
+            "postings": postings,
+            "postings_lens": postings_lens,
+            "df": self._df,
+            "docs": self._docs,
+            "forward": forward,
+            "forward_lens": forward_lens,
+            "field_ends": self._field_ends,
+            "dead": self._dead,
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, signature: Any) -> Optional["InvertedIndex"]:
+        """Load a saved index; None if missing, unreadable or built for another DB state."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning("Ignoring unreadable search index %s: %s", path, e)
+            return None
+        if (not isinstance(state, dict) or state.get("version") != INDEX_VERSION
+                or state.get("signature") != _json_signature(signature)
+                or state.get("byteorder") != sys.byteorder or state.get("itemsize") != array("I").itemsize):
+            return None
+        try:
+            return cls._from_state(state)
+        except Exception as e:
+            log.warning("Ignoring inconsistent search index %s: %s", path, e)
+            return None
+
+    @classmethod
+    def _from_state(cls, state: Dict[str, Any]) -> "InvertedIndex":
+        index = cls()
+        terms = [str(t) for t in state["terms"]]
+        docs = [None if d is None else str(d) for d in state["docs"]]
+        postings = _unpack(state["postings"], state["postings_lens"])
+        forward = _unpack(state["forward"], state["forward_lens"])
+        field_ends = [None if e is None else tuple(int(x) for x in e) for e in state["field_ends"]]
+        df = [int(n) for n in state["df"]]
+        if not (len(postings) == len(df) == len(terms) and len(forward) == len(field_ends) == len(docs)):
+            raise ValueError("section lengths differ")
+        if any(p and max(p) >= len(docs) for p in postings) or any(s and max(s) >= len(terms) for s in forward):
+            raise ValueError("reference out of range")
+        index._terms = terms
+        index._term_ids = {t: i for i, t in enumerate(terms)}
+        index._postings = postings
+        index._df = df
+        index._docs = docs
+        index._docno = {d: i for i, d in enumerate(docs) if d is not None}
+        index._forward = forward
+        index._field_ends = field_ends
+        index._dead = int(state["dead"])
+        for ends in index._field_ends:
+            if ends is not None:
+                index._count_fields(ends, 1)
+        return index
+
+
+def _json_signature(signature: Any) -> Any:
+    # DB file signatures are int tuples; JSON gives them back as lists
+    return list(signature) if isinstance(signature, (tuple, list)) else signature
+
+
+def _pack(arrays: Sequence[Optional[array]]) -> Tuple[str, List[int]]:
+    """Arrays -> (base64 of their concatenated bytes, length per array; -1 = None)."""
+    flat = array("I")
+    lens: List[int] = []
+    for a in arrays:
+        if a is None:
+            lens.append(-1)
+        else:
+            flat.extend(a)
+            lens.append(len(a))
+    return base64.b64encode(flat.tobytes()).decode("ascii"), lens
+
+
+def _unpack(blob: str, lens: Sequence[int]) -> List[Optional[array]]:
+    flat = array("I")
+    flat.frombytes(base64.b64decode(blob, validate=True))
+    out: List[Optional[array]] = []
+    pos = 0
+    for n in lens:
+        if n < 0:
+            out.append(None)
+            continue
+        out.append(flat[pos:pos + n])
+        pos += n
+    if pos != len(flat):
+        raise ValueError("array lengths do not match the data")
+    return out
+
+def rank_bm25(
+    items: List[Dict[str, Any]],
+    query: str,
+    index: Optional[InvertedIndex] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """`items` ordered by BM25F relevance for `query` (ties keep their order), top `limit`.
+
+    Without a maintained `index` the statistics come from `items` alone.
+    """
+    if index is None:
+        index = InvertedIndex.build(items)
+    scores = index.bm25(query, [str(it.get("id", "")) for it in items])
+    keyed = [(-scores.get(str(it.get("id", "")), 0.0), i) for i, it in enumerate(items)]
+    picked = heapq.nsmallest(limit, keyed) if limit is not None else sorted(keyed)
+    return [items[i] for _, i in picked]
@@ -0,0 +1,91 @@
+"""Duplicate signature index for PromptRepository.
+
+- prompt_signature() (sha256 of normalized title + content) per prompt id
+- Counts per signature, so existing duplicates in the DB do not confuse delete/update
+- O(1) membership test for ingest paths; persisted next to the DB as JSON (<db>.sig.idx)
+"""
+from __future__ import annotations
+
+import json, logging, os
+from typing import Any, Dict, Iterable, Optional
+
+from utils.hash_utils import prompt_signature
+
+log = logging.getLogger(__name__)
+
+INDEX_VERSION = 2  # 2: JSON instead of pickle
+
+
+def item_signature(item: Dict[str, Any]) -> str:
+    return prompt_signature(str(item.get("title", "") or ""), str(item.get("content", "") or ""))
+
+
+class SignatureIndex:
+    def __init__(self) -> None:
+        self._by_id: Dict[str, str] = {}
+        self._counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, sig: object) -> bool:
+        return sig in self._counts
+
+    def add(self, doc_id: str, item: Dict[str, Any]) -> None:
+        doc_id = str(doc_id)
+        if doc_id in self._by_id:
+            self.remove(doc_id)
+        sig = item_signature(item)
+        self._by_id[doc_id] = sig
+        self._counts[sig] = self._counts.get(sig, 0) + 1
+
+    def remove(self, doc_id: str) -> None:
+        sig = self._by_id.pop(str(doc_id), None)
+        if sig is None:
+            return
+        n = self._counts[sig] - 1
+        if n:
+            self._counts[sig] = n
+        else:
+            del self._counts[sig]
+
+    @classmethod
+    def build(cls, items: Iterable[Dict[str, Any]]) -> "SignatureIndex":
+        index = cls()
+        for it in items:
+            if isinstance(it, dict) and it.get("id"):
+                index.add(str(it["id"]), it)
+        return index
+
+    # ----------------- persistence -----------------
+    def save(self, path: str, signature: Any) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "signature": _json_signature(signature), "by_id": self._by_id}, f,
+                      ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, signature: Any) -> Optional["SignatureIndex"]:
+        """Load a saved index; None if missing, unreadable or built for another DB state."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning("Ignoring unreadable signature index %s: %s", path, e)
+            return None
+        if (not isinstance(state, dict) or state.get("version") != INDEX_VERSION
+                or state.get("signature") != _json_signature(signature) or not isinstance(state.get("by_id"), dict)):
+            return None
+        index = cls()
+        index._by_id = {str(k): str(v) for k, v in state["by_id"].items()}
+        for sig in index._by_id.values():
+            index._counts[sig] = index._counts.get(sig, 0) + 1
+        return index
+
+
+def _json_signature(signature: Any) -> Any:
+    # DB file signatures are int tuples; JSON gives them back as lists
+    return list(signature) if isinstance(signature, (tuple, list)) else signature
@@ -0,0 +1,136 @@
+"""Local TF-IDF "similar prompts" index (no network, stdlib only).
+
+- One sparse row per prompt over title + content: term ids (array 'I') and
+  sublinear term frequencies 1 + log(tf) (array 'f')
+- Postings term -> {doc number: tf weight} for dot products; idf is applied at query time,
+  so adding/removing a prompt only touches its own row and postings
+- Cosine top-k: accumulate dot products over the query's strongest terms, divide by the
+  row norms (cached, dropped whenever the corpus size drifts by more than NORM_DRIFT)
+"""
+from __future__ import annotations
+
+import heapq, math
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from data.search_index import tokenize
+
+SIM_FIELDS = ("title", "content")
+MAX_QUERY_TERMS = 48   # strongest query terms used for candidate generation
+MAX_DF_RATIO = 0.5     # terms in more than half of all prompts carry no signal (skipped)
+NORM_DRIFT = 0.05
+
+
+def _terms(item: Dict[str, Any]) -> Dict[str, int]:
+    tf: Dict[str, int] = {}
+    for field in SIM_FIELDS:
+        for tok in tokenize(str(item.get(field, "") or "")):
+            if len(tok) > 1 and not tok.isdigit():
+                tf[tok] = tf.get(tok, 0) + 1
+    return tf
+
+
+class TfidfIndex:
+    def __init__(self) -> None:
+        self._term_ids: Dict[str, int] = {}
+        self._postings: List[Dict[int, float]] = []   # term id -> {doc number: tf weight}
+        self._rows: List[Optional[Tuple[array, array]]] = []
+        self._docs: List[Optional[str]] = []
+        self._docno: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._norms: Dict[int, float] = {}
+        self._norms_n = 0  # corpus size the cached norms were computed for
+
+    def __len__(self) -> int:
+        return len(self._docno)
+
+    # ----------------- maintenance -----------------
+    def add(self, doc_id: str, item: Dict[str, Any]) -> None:
+        doc_id = str(doc_id)
+        if doc_id in self._docno:
+            self.remove(doc_id)
+        docno = self._free.pop() if self._free else len(self._docs)
+        if docno == len(self._docs):
+            self._docs.append(doc_id)
+            self._rows.append(None)
+        else:
+            self._docs[docno] = doc_id
+        tids, weights = array("I"), array("f")
+        for term, tf in _terms(item).items():
+            tid = self._term_ids.get(term)
+            if tid is None:
+                tid = self._term_ids[term] = len(self._postings)
+                self._postings.append({})
+            w = 1.0 + math.log(tf)
+            tids.append(tid)
+            weights.append(w)
+            self._postings[tid][docno] = w
+        self._rows[docno] = (tids, weights)
+        self._docno[doc_id] = docno
+
+    def remove(self, doc_id: str) -> None:
+        docno = self._docno.pop(str(doc_id), None)
+        if docno is None:
+            return
+        tids, _ = self._rows[docno]
+        for tid in tids:
+            self._postings[tid].pop(docno, None)
+        self._rows[docno] = None
+        self._docs[docno] = None
+        self._norms.pop(docno, None)
+        self._free.append(docno)
+
+    @classmethod
+    def build(cls, items: Iterable[Dict[str, Any]]) -> "TfidfIndex":
+        index = cls()
+        for it in items:
+            if isinstance(it, dict) and it.get("id"):
+                index.add(str(it["id"]), it)
+        return index
+
+    # ----------------- scoring -----------------
+    def _idf(self, tid: int, n: int) -> float:
+        return math.log((1 + n) / (1 + len(self._postings[tid]))) + 1.0
+
+    def _norm(self, docno: int, n: int) -> float:
+        if abs(n - self._norms_n) > NORM_DRIFT * max(self._norms_n, 1):
+            self._norms.clear()
+            self._norms_n = n
+        norm = self._norms.get(docno)
+        if norm is None:
+            tids, weights = self._rows[docno]
+            norm = math.sqrt(sum((w * self._idf(t, n)) ** 2 for t, w in zip(tids, weights))) or 1.0
+            self._norms[docno] = norm
+        return norm
+
+    def _top(self, query: Dict[int, float], k: int, exclude: Optional[int] = None) -> List[Tuple[str, float]]:
+        n = len(self._docno)
+        qvec = {tid: w * self._idf(tid, n) for tid, w in query.items()}
+        qnorm = math.sqrt(sum(v * v for v in qvec.values())) or 1.0
+        max_df = max(10, int(MAX_DF_RATIO * n))
+        strong = heapq.nlargest(MAX_QUERY_TERMS, (t for t in qvec if len(self._postings[t]) <= max_df), key=qvec.__getitem__)
+        dots: Dict[int, float] = {}
+        for tid in strong:
+            qw = qvec[tid] * self._idf(tid, n)
+            for docno, w in self._postings[tid].items():
+                dots[docno] = dots.get(docno, 0.0) + qw * w
+        dots.pop(exclude, None)
+        scored = ((dot / (qnorm * self._norm(docno, n)), -docno) for docno, dot in dots.items())
+        return [(self._docs[-neg], score) for score, neg in heapq.nlargest(k, scored)]
+
+    def similar_to(self, doc_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (id, cosine) of the prompts most similar to an indexed prompt."""
+        docno = self._docno.get(str(doc_id))
+        if docno is None:
+            return []
+        tids, weights = self._rows[docno]
+        return self._top(dict(zip(tids, weights)), k, exclude=docno)
+
+    def similar_to_text(self, text: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (id, cosine) of the prompts most similar to free text."""
+        query: Dict[int, float] = {}
+        for term, tf in _terms({"content": text}).items():
+            tid = self._term_ids.get(term)
+            if tid is not None:
+                query[tid] = 1.0 + math.log(tf)
+        return self._top(query, k)
@@ -0,0 +1,596 @@
+"""SQLite storage engine with the PromptRepository interface (stdlib sqlite3).
+
+- One row per prompt; the full item is kept as JSON in `doc` (lossless round-trip)
+- Tags live in a `tags` table + `prompt_tags` join table (indexed by canonical tag)
+- Insertion order (`pos`) mirrors the list order of the JSON engine, so index-based
+  get/update/delete keep their meaning
+- list_items()/page() project fields inside SQLite (json_extract) and page by (sort key, pos)
+- migrate_json_to_sqlite() copies an existing {"items": [...]} DB (or a legacy layout)
+"""
+from __future__ import annotations
+
+import json, logging, math, sqlite3, uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from data.prompt_repository import (
+    PromptRepository, resolve_db_path, DEFAULT_BATCH_SIZE, DEFAULT_PAGE_SIZE, _chunks,
+    parse_order, encode_cursor, decode_cursor,
+)
+from data.tag_normalizer import TagNormalizer, get_normalizer
+from data.search_index import rank_bm25
+from data.similarity_index import TfidfIndex
+from data.tag_suggest_index import TagSuggestIndex
+from data.signature_index import item_signature
+
+log = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prompts (
+    pos          INTEGER PRIMARY KEY AUTOINCREMENT,
+    id           TEXT NOT NULL UNIQUE,
+    category     TEXT NOT NULL DEFAULT '',
+    category_key TEXT NOT NULL DEFAULT '',
+    search_text  TEXT NOT NULL DEFAULT '',
+    signature    TEXT NOT NULL DEFAULT '',
+    doc          TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_prompts_category_key ON prompts(category_key);
+CREATE TABLE IF NOT EXISTS tags (
+    tag_id    INTEGER PRIMARY KEY,
+    name      TEXT NOT NULL UNIQUE,
+    canonical TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tags_canonical ON tags(canonical);
+CREATE TABLE IF NOT EXISTS prompt_tags (
+    prompt_pos INTEGER NOT NULL REFERENCES prompts(pos) ON DELETE CASCADE,
+    tag_id     INTEGER NOT NULL REFERENCES tags(tag_id),
+    PRIMARY KEY (prompt_pos, tag_id)
+);
+CREATE INDEX IF NOT EXISTS idx_prompt_tags_tag ON prompt_tags(tag_id, prompt_pos);
+"""
+
+
+def _category_display(it: Dict) -> str:
+    c = it.get("category") or it.get("Category") or ""
+    return c.strip() if isinstance(c, str) else ""
+
+
+def _search_text(it: Dict) -> str:
+    # same haystack as PromptRepository.search()
+    return " ".join([
+        str(it.get("title", "")),
+        str(it.get("content", "")),
+        str(it.get("category", "")),
+        " ".join(it.get("tags", []) or []),
+    ]).lower()
+
+
+class SqlitePromptRepository:
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        normalizer: Optional[TagNormalizer] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        self.db_path, source = resolve_db_path(db_path, default_name="prompts.sqlite")
+        self.normalizer = normalizer or get_normalizer()
+        self._watch_aliases = normalizer is None
+        self.batch_size = max(1, int(batch_size))
+        self._in_txn = False
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            self._upgrade_schema()
+        log.info("SqlitePromptRepository using DB at %s (source=%s)", self.db_path, source)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def _tx(self):
+        """One SQLite transaction per call, unless transaction() already holds one."""
+        if self._in_txn:
+            yield
+            return
+        with self._conn:
+            yield
+
+    @contextmanager
+    def transaction(self):
+        """Unit of work: all mutations inside the block commit together or roll back."""
+        if self._in_txn:
+            yield self
+            return
+        self._in_txn = True
+        try:
+            with self._conn:
+                yield self
+        finally:
+            self._in_txn = False
+
+    # ----------------- internal helpers -----------------
+    def _upgrade_schema(self) -> None:
+        cols = {row[1] for row in self._conn.execute("PRAGMA table_info(prompts)")}
+        if "signature" not in cols:
+            # v1 -> v2: duplicate signatures
+            self._conn.execute("ALTER TABLE prompts ADD COLUMN signature TEXT NOT NULL DEFAULT ''")
+            rows = self._conn.execute("SELECT pos, doc FROM prompts").fetchall()
+            self._conn.executemany(
+                "UPDATE prompts SET signature = ? WHERE pos = ?",
+                [(item_signature(json.loads(doc)), pos) for pos, doc in rows],
+            )
+            log.info("SQLite DB upgraded to schema v2 (signatures for %d rows)", len(rows))
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_prompts_signature ON prompts(signature)")
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+        )
+
+    def _tag_id(self, name: str) -> int:
+        row = self._conn.execute("SELECT tag_id FROM tags WHERE name = ?", (name,)).fetchone()
+        if row:
+            return row[0]
+        cur = self._conn.execute(
+            "INSERT INTO tags(name, canonical) VALUES (?, ?)", (name, self.normalizer.canonicalize(name))
+        )
+        return cur.lastrowid
+
+    def _set_tags(self, pos: int, tags: Iterable[Any]) -> None:
+        self._conn.execute("DELETE FROM prompt_tags WHERE prompt_pos = ?", (pos,))
+        names = {t.strip() for t in (tags or []) if isinstance(t, str) and t.strip()}
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO prompt_tags(prompt_pos, tag_id) VALUES (?, ?)",
+            [(pos, self._tag_id(n)) for n in names],
+        )
+
+    def _insert(self, item: Dict) -> None:
+        cur = self._conn.execute(
+            "INSERT INTO prompts(id, category, category_key, search_text, signature, doc) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                str(item["id"]),
+                _category_display(item),
+                str(item.get("category", "")).strip().lower(),
+                _search_text(item),
+                item_signature(item),
+                json.dumps(item, ensure_ascii=False),
+            ),
+        )
+        self._set_tags(cur.lastrowid, item.get("tags"))
+
+    def _store(self, pos: int, item: Dict) -> None:
+        self._conn.execute(
+            "UPDATE prompts SET id = ?, category = ?, category_key = ?, search_text = ?, signature = ?, doc = ? WHERE pos = ?",
+            (
+                str(item["id"]),
+                _category_display(item),
+                str(item.get("category", "")).strip().lower(),
+                _search_text(item),
+                item_signature(item),
+                json.dumps(item, ensure_ascii=False),
+                pos,
+            ),
+        )
+        self._set_tags(pos, item.get("tags"))
+
+    def _locate(self, key: int | str) -> Tuple[int, Dict]:
+        """Resolve index (int) or id (str) to (pos, item)."""
+        if isinstance(key, int):
+            n = self.count()
+            idx = key + n if key < 0 else key
+            row = None
+            if 0 <= idx < n:
+                row = self._conn.execute(
+                    "SELECT pos, doc FROM prompts ORDER BY pos LIMIT 1 OFFSET ?", (idx,)
+                ).fetchone()
+            if row is None:
+                raise IndexError("list index out of range")
+        else:
+            row = self._conn.execute("SELECT pos, doc FROM prompts WHERE id = ?", (str(key),)).fetchone()
+            if row is None:
+                raise KeyError(f"id not found: {key}")
+        return row[0], json.loads(row[1])
+
+    # ----------------- CRUD ------------------------
+    def _prepare_new(self, item: Dict) -> Dict:
+        item = dict(item)
+        if not item.get("id"):
+            item["id"] = uuid.uuid4().hex
+        tags, _ = self.normalizer.normalize_list(item.get("tags", []))
+        item["tags"] = tags
+        return item
+
+    def _apply_fields(self, item: Dict, fields: Optional[Dict]) -> Dict:
+        for k, v in (fields or {}).items():
+            if k == "tags":
+                v, _ = self.normalizer.normalize_list(v)
+            item[k] = v
+        if not item.get("id"):
+            item["id"] = uuid.uuid4().hex
+        return item
+
+    def add(self, item: Dict) -> Dict:
+        item = self._prepare_new(item)
+        with self._tx():
+            self._insert(item)
+        log.info("DB add() ok (db=%s)", self.db_path)
+        return item
+
+    def update(self, key: int | str, fields: Dict) -> Dict:
+        pos, item = self._locate(key)
+        item = self._apply_fields(item, fields)
+        with self._tx():
+            self._store(pos, item)
+        log.info("DB update() key=%s ok (db=%s)", key, self.db_path)
+        return item
+
+    def delete(self, key: int | str) -> Dict:
+        """Delete by index (int) OR by stable id (str). Returns removed item."""
+        pos, item = self._locate(key)
+        with self._tx():
+            self._conn.execute("DELETE FROM prompts WHERE pos = ?", (pos,))
+        log.info("DB delete() key=%s ok (db=%s)", key, self.db_path)
+        return item
+
+    # ----------------- batch mutations ------------------------
+    def add_many(self, items: Iterable[Dict], batch_size: Optional[int] = None, skip_duplicates: bool = False) -> List[Dict]:
+        """Add items; one transaction per batch. Returns stored items."""
+        if skip_duplicates:
+            seen: Set[str] = set()
+            unique: List[Dict] = []
+            for it in items:
+                sig = item_signature(it)
+                if sig in seen or self.has_signature(sig):
+                    continue
+                seen.add(sig)
+                unique.append(it)
+            items = unique
+        prepared = [self._prepare_new(it) for it in items]
+        for batch in _chunks(prepared, batch_size or self.batch_size):
+            with self._tx():
+                for it in batch:
+                    self._insert(it)
+            log.info("DB add_many() +%s (db=%s)", len(batch), self.db_path)
+        return prepared
+
+    def update_many(self, updates: Iterable[Tuple[int | str, Dict]], batch_size: Optional[int] = None) -> List[Dict]:
+        """Apply (index-or-id, fields) pairs; one transaction per batch. Returns updated items."""
+        out: List[Dict] = []
+        for batch in _chunks(list(updates), batch_size or self.batch_size):
+            with self._tx():
+                for key, fields in batch:
+                    pos, item = self._locate(key)
+                    self._store(pos, self._apply_fields(item, fields))
+                    out.append(item)
+            log.info("DB update_many() %s items (db=%s)", len(batch), self.db_path)
+        return out
+
+    def delete_many(self, keys: Iterable[int | str], batch_size: Optional[int] = None) -> List[Dict]:
+        """Delete by index (positions before the call) or id; one transaction per batch."""
+        located = list({pos: item for pos, item in (self._locate(k) for k in keys)}.items())
+        for batch in _chunks(located, batch_size or self.batch_size):
+            with self._tx():
+                self._conn.executemany("DELETE FROM prompts WHERE pos = ?", [(pos,) for pos, _ in batch])
+            log.info("DB delete_many() -%s (db=%s)", len(batch), self.db_path)
+        return [item for _, item in located]
+
+    def get(self, idx: int) -> Dict:
+        return self._locate(int(idx))[1]
+
+    def has_signature(self, sig: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM prompts WHERE signature = ? LIMIT 1", (sig,)).fetchone() is not None
+
+    def is_duplicate(self, item: Dict) -> bool:
+        return self.has_signature(item_signature(item))
+
+    def get_by_id(self, id_value: str) -> Dict:
+        return self._locate(str(id_value))[1]
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM prompts").fetchone()[0]
+
+    def bulk_update_from_alias_map(self) -> int:
+        mutated = 0
+        with self._tx():
+            # refresh canonical forms first (alias map may have changed)
+            for tag_id, name in self._conn.execute("SELECT tag_id, name FROM tags").fetchall():
+                self._conn.execute(
+                    "UPDATE tags SET canonical = ? WHERE tag_id = ?", (self.normalizer.canonicalize(name), tag_id)
+                )
+            for pos, doc in self._conn.execute("SELECT pos, doc FROM prompts ORDER BY pos").fetchall():
+                it = json.loads(doc)
+                new_tags, _ = self.normalizer.normalize_list(it.get("tags", []))
+                if new_tags != it.get("tags", []):
+                    it["tags"] = new_tags
+                    self._store(pos, it)
+                    mutated += 1
+        log.info("DB reindex aliases -> mutated=%s (db=%s)", mutated, self.db_path)
+        return mutated
+
+    def reload_aliases(self, normalizer: Optional[TagNormalizer] = None) -> int:
+        """Switch to a new alias map; only tags whose canonical form changes and the prompts
+        carrying them (via prompt_tags) are rewritten, in one transaction. If it rolls back,
+        the old map stays in effect."""
+        new, old = normalizer or get_normalizer(), self.normalizer
+        if new is old:
+            return 0
+        changed = old.changed_keys(new)
+        self.normalizer = new  # update_many() normalizes with it
+        if not changed:
+            return 0
+        try:
+            with self.transaction():
+                affected = [(tag_id, name) for tag_id, name in self._conn.execute("SELECT tag_id, name FROM tags").fetchall()
+                            if new.normalize_tag(name) in changed]
+                self._conn.executemany(
+                    "UPDATE tags SET canonical = ? WHERE tag_id = ?", [(new.canonicalize(n), t) for t, n in affected]
+                )
+                tag_ids = [t for t, _ in affected]
+                rows = self._conn.execute(
+                    "SELECT doc FROM prompts WHERE pos IN (SELECT prompt_pos FROM prompt_tags WHERE tag_id IN "
+                    f"({','.join('?' * len(tag_ids))})) ORDER BY pos", tag_ids
+                ).fetchall() if tag_ids else []
+                items = [json.loads(doc) for (doc,) in rows]
+                normalized = new.normalize_many(it.get("tags", []) for it in items)
+                updates = [(str(it.get("id")), {"tags": tags})
+                           for it, tags in zip(items, normalized) if tags != it.get("tags", [])]
+                if updates:
+                    self.update_many(updates, batch_size=len(updates))
+        except BaseException:
+            self.normalizer = old  # rolled back: stored tags still follow the old map
+            raise
+        log.info("DB reload aliases -> changed=%s mutated=%s (db=%s)", len(changed), len(updates), self.db_path)
+        return len(updates)
+
+    def check_aliases(self) -> int:
+        """Alias hot reload: re-tag incrementally if the alias file changed since the last check."""
+        if not self._watch_aliases:
+            return 0
+        return self.reload_aliases(get_normalizer())
+
+    # --------------- UI helper methods -------------
+    @staticmethod
+    def _projection(fields: Optional[Iterable[str]]) -> Tuple[str, List[Any]]:
+        """SELECT expression + params returning the (projected) item as JSON text."""
+        if fields is None:
+            return "doc", []
+        names = ["id"] + [f for f in dict.fromkeys(fields) if f != "id"]
+        params: List[Any] = []
+        for f in names:
+            params += [f, f'$."{f}"']
+        return "json_object(" + ", ".join(["?, json_extract(doc, ?)"] * len(names)) + ")", params
+
+    @staticmethod
+    def _decode(doc: str, fields: Optional[Iterable[str]]) -> Dict:
+        item = json.loads(doc)
+        # projected: json_extract yields null for missing keys; drop them like project_item()
+        return item if fields is None else {k: v for k, v in item.items() if v is not None or k == "id"}
+
+    def _keyed_select(self, fields: Optional[List[str]], field: str) -> Tuple[str, List[Any], List[str]]:
+        """SELECT of (projected item, sort key columns...); the keys end with pos as tiebreaker."""
+        expr, params = self._projection(fields)
+        if not field:
+            return f"SELECT {expr}, pos FROM prompts", params, ["pos"]
+        # (missing/empty last, case-insensitive value), same idea as PromptRepository._sorted
+        v = "json_extract(doc, ?)"
+        inner = (f"SELECT doc, pos, CASE WHEN {v} IS NULL OR {v} IN ('', '[]') THEN 1 ELSE 0 END AS k1, "
+                 f"lower(COALESCE({v}, '')) AS k2 FROM prompts")
+        return f"SELECT {expr}, k1, k2, pos FROM ({inner})", params + [f'$."{field}"'] * 3, ["k1", "k2", "pos"]
+
+    def list_items(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        order_by: Optional[str] = None,
+    ) -> List[Dict]:
+        fields = None if fields is None else list(fields)
+        field, desc = parse_order(order_by)
+        sql, params, keys = self._keyed_select(fields, field)
+        direction = " DESC" if desc else ""
+        sql += " ORDER BY " + ", ".join(k + direction for k in keys) + " LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else max(0, int(limit)), max(0, int(offset))]
+        return [self._decode(row[0], fields) for row in self._conn.execute(sql, params)]
+
+    def page(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        order_by: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Keyset pagination: (items, next_cursor); see PromptRepository.page()."""
+        fields = None if fields is None else list(fields)
+        limit = max(1, int(limit))
+        field, desc = parse_order(order_by)
+        sql, params, keys = self._keyed_select(fields, field)
+        if cursor:
+            last = decode_cursor(cursor, order_by)
+            if len(last) != len(keys):
+                raise ValueError("cursor belongs to a different engine")
+            sql += f" WHERE ({', '.join(keys)}) {'<' if desc else '>'} ({', '.join('?' * len(keys))})"
+            params += last
+        direction = " DESC" if desc else ""
+        sql += " ORDER BY " + ", ".join(k + direction for k in keys) + " LIMIT ?"
+        params.append(limit + 1)
+        rows = self._conn.execute(sql, params).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor([order_by or ""] + list(rows[-1][1:])) if more and rows else None
+        return [self._decode(row[0], fields) for row in rows], next_cursor
+
+    @property
+    def items_resident(self) -> bool:
+        """Items are decoded per query; see PromptRepository.items_resident."""
+        return False
+
+    def all(self) -> List[Dict]:
+        return self.list_items()
+
+    def all_categories(self) -> List[str]:
+        rows = self._conn.execute("SELECT DISTINCT category FROM prompts WHERE category != ''")
+        return sorted(r[0] for r in rows)
+
+    def all_tags(self) -> List[str]:
+        rows = self._conn.execute(
+            "SELECT t.name FROM tags t WHERE EXISTS (SELECT 1 FROM prompt_tags pt WHERE pt.tag_id = t.tag_id)"
+        )
+        return sorted({r[0] for r in rows})
+
+    def ids_with_tags(self, tags: Iterable[str], match_all: bool = True, category: str = "") -> Optional[Set[str]]:
+        tset = sorted({self.normalizer.canonicalize(t) for t in (tags or []) if str(t).strip()})
+        cat = (category or "").strip().lower()
+        if not tset and not cat:
+            return None
+        sql = ["SELECT p.id FROM prompts p WHERE 1 = 1"]
+        params: List[Any] = []
+        if cat:
+            sql.append("AND p.category_key = ?")
+            params.append(cat)
+        if tset:
+            marks = ", ".join("?" for _ in tset)
+            sql.append(
+                "AND (SELECT COUNT(DISTINCT tg.canonical) FROM prompt_tags pt JOIN tags tg ON tg.tag_id = pt.tag_id "
+                f"WHERE pt.prompt_pos = p.pos AND tg.canonical IN ({marks})) >= ?"
+            )
+            params.extend(tset)
+            params.append(len(tset) if match_all else 1)
+        return {pid for (pid,) in self._conn.execute(" ".join(sql), params)}
+
+    def match_ids(self, query: str, fields: Iterable[str] = ("title", "content", "description", "category")) -> Optional[Set[str]]:
+        """Ids whose fields (joined by newlines, lowercased) contain `query`; None for an empty query."""
+        q = (query or "").strip().lower()
+        if not q:
+            return None
+        fields = list(fields)
+        cols = ", ".join(["json_extract(doc, ?)"] * len(fields))
+        rows = self._conn.execute(f"SELECT id, {cols} FROM prompts", [f'$."{f}"' for f in fields])
+        return {r[0] for r in rows if q in "\n".join("" if v is None else str(v) for v in r[1:]).lower()}
+
+    def tag_counts(self) -> Dict[str, int]:
+        rows = self._conn.execute(
+            "SELECT tg.canonical, COUNT(DISTINCT pt.prompt_pos) FROM prompt_tags pt "
+            "JOIN tags tg ON tg.tag_id = pt.tag_id GROUP BY tg.canonical"
+        )
+        return {canon: n for canon, n in rows}
+
+    # no in-memory state for this engine: the TF-IDF rows are built per call
+    def similar(self, key: int | str, k: int = 10) -> List[Tuple[Dict, float]]:
+        _, source = self._locate(key)
+        items = {str(it.get("id", "")): it for it in self.list_items()}
+        hits = TfidfIndex.build(items.values()).similar_to(str(source.get("id", "")), k)
+        return [(items[doc_id], score) for doc_id, score in hits]
+
+    def similar_to_text(self, text: str, k: int = 10) -> List[Tuple[Dict, float]]:
+        items = {str(it.get("id", "")): it for it in self.list_items()}
+        hits = TfidfIndex.build(items.values()).similar_to_text(text, k)
+        return [(items[doc_id], score) for doc_id, score in hits]
+
+    def link_related(self, k: int = 5, min_score: float = 0.2) -> int:
+        items = self.list_items()
+        index = TfidfIndex.build(items)
+        updates: List[Tuple[str, Dict]] = []
+        for it in items:
+            pid = str(it.get("id", ""))
+            related = [doc_id for doc_id, score in index.similar_to(pid, k) if score >= min_score]
+            if related != list(it.get("related_ids") or []):
+                updates.append((pid, {"related_ids": related}))
+        self.update_many(updates)
+        return len(updates)
+
+    def suggest_tags(self, text: str, tags: Iterable[str] = (), k: int = 8) -> List[Tuple[str, float]]:
+        return TagSuggestIndex.build(self.list_items(), self.normalizer.canonicalize).suggest(text, tags, k)
+
+    def related_tags(self, tag: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Co-occurrence straight from prompt_tags (cosine of the canonical tags' prompt sets)."""
+        canon = self.normalizer.canonicalize(tag)
+        counts = self.tag_counts()
+        if not counts.get(canon):
+            return []
+        rows = self._conn.execute(
+            "SELECT tb.canonical, COUNT(DISTINCT pb.prompt_pos) FROM prompt_tags pa "
+            "JOIN tags ta ON ta.tag_id = pa.tag_id "
+            "JOIN prompt_tags pb ON pb.prompt_pos = pa.prompt_pos "
+            "JOIN tags tb ON tb.tag_id = pb.tag_id "
+            "WHERE ta.canonical = ? AND tb.canonical != ? GROUP BY tb.canonical",
+            (canon, canon),
+        ).fetchall()
+        scored = [(u, round(c / math.sqrt(counts[canon] * counts[u]), 4)) for u, c in rows if counts.get(u)]
+        return sorted(scored, key=lambda us: (-us[1], us[0]))[:k]
+
+    def search(
+        self,
+        query: str = "",
+        tags: Iterable[str] = (),
+        category: str = "",
+        rank: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        q = (query or "").strip().lower()
+        tset: Set[str] = {self.normalizer.canonicalize(t) for t in (tags or []) if str(t).strip()}
+        cat = (category or "").strip().lower()
+
+        sql = ["SELECT p.doc FROM prompts p WHERE 1 = 1"]
+        params: List[Any] = []
+        if cat:
+            sql.append("AND p.category_key = ?")
+            params.append(cat)
+        if q:
+            sql.append("AND instr(p.search_text, ?) > 0")
+            params.append(q)
+        for t in sorted(tset):
+            sql.append(
+                "AND EXISTS (SELECT 1 FROM prompt_tags pt JOIN tags tg ON tg.tag_id = pt.tag_id "
+                "WHERE pt.prompt_pos = p.pos AND tg.canonical = ?)"
+            )
+            params.append(t)
+        sql.append("ORDER BY p.pos")
+        if limit is not None and not (rank and q):
+            sql.append("LIMIT ?")
+            params.append(max(0, limit))
+        results = [json.loads(doc) for (doc,) in self._conn.execute(" ".join(sql), params)]
+        if rank and q:
+            # statistics from the matching rows only; no corpus-wide index for this engine
+            return rank_bm25(results, q, limit=limit)
+        return results
+
+
+def migrate_json_to_sqlite(json_path: str, sqlite_path: str, normalizer: Optional[TagNormalizer] = None) -> int:
+    """Copy every item of a JSON DB into an (empty) SQLite DB, preserving order and fields.
+
+    Items are stored verbatim; only a missing 'id' is filled in, as the JSON engine does.
+    Returns the number of migrated items.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        items = PromptRepository._normalize_items(json.load(f))
+    repo = SqlitePromptRepository(sqlite_path, normalizer=normalizer)
+    try:
+        if repo.count():
+            raise ValueError(f"target DB is not empty: {repo.db_path}")
+        seen: Set[str] = set()
+        with repo._conn:
+            for it in items:
+                if not isinstance(it, dict):
+                    continue
+                it = dict(it)
+                if not it.get("id") or str(it["id"]) in seen:
+                    if it.get("id"):
+                        log.warning("Duplicate id %s in %s; assigning a new id", it["id"], json_path)
+                    it["id"] = uuid.uuid4().hex
+                seen.add(str(it["id"]))
+                repo._insert(it)
+        migrated = repo.count()
+    finally:
+        repo.close()
+    log.info("Migrated %s items from %s to %s", migrated, json_path, sqlite_path)
+    return migrated
@@ -4,13 +4,21 @@
 - Normalize individual tags (trim, lowercase, de-accent, unify separators)
 - Map aliases/synonyms to a canonical tag based on config/tag_aliases.json
 - Deduplicate tag lists while preserving the first-seen order
+- get_normalizer(): process-wide shared instances keyed by alias file (path, mtime, size), so
+  callers without their own normalizer do not re-read the alias file
+- canonicalize() is memoized per instance (bounded LRU); normalize_many() for batches
+- changed_keys(): normalized tags whose canonical form differs between two alias maps
+  (drives the incremental re-tagging of PromptRepository.reload_aliases)
 """
 from __future__ import annotations
 
-import json, os, re, unicodedata
-from typing import Dict, Iterable, List, Optional, Tuple
+import json, os, re, threading, unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 _NORMALIZE_NONALNUM = re.compile(r"[^a-z0-9]+")
+CANONICAL_CACHE_SIZE = 1 << 16
+DEFAULT_ALIAS_PATH = "config/tag_aliases.json"
 
 
 def _basic_normalize(text: str) -> str:
@@ -26,7 +34,7 @@ def _basic_normalize(text: str) -> str:
 class TagNormalizer:
     def __init__(self, alias_path: Optional[str] = None, alias_map: Optional[Dict[str, Iterable[str]]] = None) -> None:
         if alias_map is None:
-            alias_path = alias_path or os.environ.get("TAG_ALIAS_PATH", "config/tag_aliases.json")
+            alias_path = alias_path or os.environ.get("TAG_ALIAS_PATH", DEFAULT_ALIAS_PATH)
             if os.path.exists(alias_path):
                 with open(alias_path, "r", encoding="utf-8") as f:
                     alias_map = json.load(f)
@@ -38,6 +46,8 @@ class TagNormalizer:
             self._canonical_lookup[norm_canon] = norm_canon
             for a in aliases:
                 self._canonical_lookup[_basic_normalize(a)] = norm_canon
+        # per instance: the result depends on this alias map
+        self.canonicalize = lru_cache(maxsize=CANONICAL_CACHE_SIZE)(self._canonicalize)
 
     def normalize_tag(self, tag: str) -> str:
         return _basic_normalize(tag)
@@ -46,8 +56,22 @@ class TagNormalizer:
         norm = _basic_normalize(tag)
         return self._canonical_lookup.get(norm, norm)
 
-    def canonicalize(self, tag: str) -> str:
-        return self.map_alias(self.normalize_tag(tag))
+    def _canonicalize(self, tag: str) -> str:
+        # _basic_normalize is idempotent: one pass instead of normalize_tag + map_alias
+        norm = _basic_normalize(tag)
+        return self._canonical_lookup.get(norm, norm)
+
+    def canonicalize(self, tag: str) -> str:  # replaced by the memoized version in __init__
+        return self._canonicalize(tag)
+
+    def aliases(self) -> Dict[str, str]:
+        """Normalized alias -> canonical tag (canonical tags themselves excluded)."""
+        return {a: c for a, c in self._canonical_lookup.items() if a != c}
+
+    def changed_keys(self, other: "TagNormalizer") -> Set[str]:
+        """Normalized tags that `other` maps to a different canonical tag than this normalizer."""
+        mine, theirs = self._canonical_lookup, other._canonical_lookup
+        return {k for k in mine.keys() | theirs.keys() if mine.get(k, k) != theirs.get(k, k)}
 
     def normalize_list(self, tags: Iterable[str]):
         seen = set()
@@ -60,3 +84,54 @@ class TagNormalizer:
                 seen.add(final)
                 result.append(final)
         return result, mapping_log
+
+    def normalize_many(self, tag_lists: Iterable[Iterable[str]]) -> List[List[str]]:
+        """normalize_list() for many records (without mapping logs); each distinct raw tag
+        is canonicalized once per batch."""
+        canon = self.canonicalize
+        memo: Dict[str, str] = {}
+        out: List[List[str]] = []
+        for tags in tag_lists:
+            seen = set()
+            result: List[str] = []
+            for t in tags or []:
+                final = memo.get(t)
+                if final is None:
+                    final = memo[t] = canon(t)
+                if final and final not in seen:
+                    seen.add(final)
+                    result.append(final)
+            out.append(result)
+        return out
+
+
+_registry: Dict[Tuple[str, Optional[int], Optional[int]], TagNormalizer] = {}
+_registry_lock = threading.Lock()
+
+
+def alias_file_path(alias_path: Optional[str] = None) -> str:
+    """Absolute path of the alias file (default: $TAG_ALIAS_PATH or config/tag_aliases.json)."""
+    return os.path.abspath(alias_path or os.environ.get("TAG_ALIAS_PATH", DEFAULT_ALIAS_PATH))
+
+
+def get_normalizer(alias_path: Optional[str] = None) -> TagNormalizer:
+    """Shared TagNormalizer for `alias_path` (default: $TAG_ALIAS_PATH or config/tag_aliases.json).
+
+    - Reused as long as the alias file keeps its mtime and size; an edited file yields a new instance
+    - Treat the result as read-only: it is shared by every caller in the process
+    """
+    path = alias_file_path(alias_path)
+    try:
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        key = (path, None, None)
+    with _registry_lock:
+        tn = _registry.get(key)
+        if tn is None:
+            tn = TagNormalizer(path)
+            # superseded versions of the same file are dropped
+            for old in [k for k in _registry if k[0] == path]:
+                del _registry[old]
+            _registry[key] = tn
+        return tn
@@ -0,0 +1,79 @@
+"""Prefix index over canonical tags and their aliases (tag autocompletion).
+
+- Sorted array of (normalized key, canonical tag) + bisect: all keys with a prefix form one range
+- Aliases of the TagNormalizer point to their canonical tag ("KI" -> "ai"); only tags in use
+- suggest(): top-k canonical tags for a prefix by usage count, then alphabetically. Narrow ranges
+  are ranked directly; wide ones (short prefixes) walk the entries in rank order until k tags of
+  the range are found, and are memoized until the index is rebuilt
+"""
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_K = 10
+MEMO_MIN_RANGE = 256  # ranges narrower than this are cheap enough to rank on every keystroke
+
+
+class TagPrefixIndex:
+    def __init__(
+        self,
+        counts: Dict[str, int],
+        aliases: Optional[Dict[str, str]] = None,
+        normalize: Callable[[str], str] = lambda s: (s or "").strip().lower(),
+    ) -> None:
+        self._normalize = normalize
+        self._counts = {t: n for t, n in counts.items() if t}
+        entries = {(t, t) for t in self._counts}
+        for alias, canonical in (aliases or {}).items():
+            if canonical in self._counts and alias and alias != canonical:
+                entries.add((alias, canonical))
+        self._entries: List[Tuple[str, str]] = sorted(entries)
+        self._keys = [k for k, _ in self._entries]
+        # entry positions by rank of their canonical tag
+        self._by_rank = sorted(range(len(self._entries)),
+                               key=lambda i: (-self._counts[self._entries[i][1]], self._entries[i][1]))
+        self._memo: Dict[Tuple[str, int], List[str]] = {}
+
+    @classmethod
+    def for_repository(cls, repo, counts: Optional[Dict[str, int]] = None) -> "TagPrefixIndex":
+        """Index over the repository's tag counts (or `counts` already fetched from it) and its
+        normalizer's aliases."""
+        normalizer = repo.normalizer
+        return cls(repo.tag_counts() if counts is None else counts, normalizer.aliases(), normalizer.normalize_tag)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def count(self, tag: str) -> int:
+        return self._counts.get(tag, 0)
+
+    def suggest(self, prefix: str, k: int = DEFAULT_K) -> List[str]:
+        """Up to k canonical tags whose name or an alias starts with `prefix` (normalized)."""
+        key = self._normalize(prefix)
+        lo = bisect_left(self._keys, key)
+        hi = bisect_left(self._keys, key + "\uffff", lo)
+        if hi - lo < MEMO_MIN_RANGE:
+            return self._rank(lo, hi, k)
+        memo_key = (key, k)
+        hit = self._memo.get(memo_key)
+        if hit is None:
+            hit = self._memo[memo_key] = self._rank(lo, hi, k)
+        return list(hit)
+
+    def _rank(self, lo: int, hi: int, k: int) -> List[str]:
+        if (hi - lo) ** 2 > k * len(self._entries):
+            # wide range: about k * n / (hi - lo) entries until k hits, instead of hi - lo
+            out: List[str] = []
+            for i in self._by_rank:
+                if lo <= i < hi:
+                    tag = self._entries[i][1]
+                    if tag not in out:
+                        out.append(tag)
+                        if len(out) == k:
+                            break
+            return out
+        tags = {self._entries[i][1] for i in range(lo, hi)}
+        counts = self._counts
+        return heapq.nsmallest(k, tags, key=lambda t: (-counts[t], t))
@@ -0,0 +1,141 @@
+"""Tag co-occurrence statistics and token -> tag associations (local, no LLM).
+
+- Built from tagged prompts only: canonical tags per prompt and the first MAX_DOC_TOKENS distinct
+  tokens of title, description and content
+- Sparse dict counts: tag -> prompts, tag pair -> prompts carrying both, token -> prompts,
+  (token, tag) -> prompts; add()/remove() only touch the counts of one prompt
+- suggest(): tags for new text = sum over its tokens of idf(token) * P(tag | token), plus a
+  co-occurrence boost from tags already chosen; ranked, chosen tags excluded
+- related(): tags that co-occur with a tag, by cosine (pair count / sqrt(count a * count b))
+"""
+from __future__ import annotations
+
+import heapq, math
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from data.search_index import tokenize
+
+TOKEN_FIELDS = ("title", "description", "content")
+MAX_DOC_TOKENS = 48    # distinct tokens per prompt (title first): bounds the (token, tag) table
+MAX_QUERY_TOKENS = 256
+MAX_DF_RATIO = 0.5     # tokens in more than half of the tagged prompts carry no signal
+MIN_DOCS_FOR_DF_CUT = 20
+CO_WEIGHT = 1.0        # weight of P(tag | chosen tag) relative to the text evidence
+
+
+def _tokens(item: Dict[str, Any], limit: int) -> Tuple[str, ...]:
+    out: Dict[str, None] = {}
+    for field in TOKEN_FIELDS:
+        for tok in tokenize(str(item.get(field, "") or "")):
+            if len(tok) > 1 and not tok.isdigit():
+                out[tok] = None
+                if len(out) >= limit:
+                    return tuple(out)
+    return tuple(out)
+
+
+def _bump(table: Dict[str, Dict[str, int]], a: str, b: str, delta: int) -> None:
+    row = table.setdefault(a, {})
+    n = row.get(b, 0) + delta
+    if n > 0:
+        row[b] = n
+    else:
+        row.pop(b, None)
+        if not row:
+            del table[a]
+
+
+class TagSuggestIndex:
+    def __init__(self, canonicalize: Callable[[str], str]) -> None:
+        self._canonicalize = canonicalize
+        self._docs: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}  # id -> (tags, tokens)
+        self._tag_n: Dict[str, int] = {}
+        self._pairs: Dict[str, Dict[str, int]] = {}       # symmetric
+        self._tok_df: Dict[str, int] = {}
+        self._tok_tags: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ----------------- maintenance -----------------
+    def add(self, doc_id: str, item: Dict[str, Any]) -> None:
+        doc_id = str(doc_id)
+        if doc_id in self._docs:
+            self.remove(doc_id)
+        tags = tuple(t for t in dict.fromkeys(self._canonicalize(t) for t in (item.get("tags") or [])) if t)
+        if not tags:
+            return
+        tokens = _tokens(item, MAX_DOC_TOKENS)
+        self._docs[doc_id] = (tags, tokens)
+        self._count(tags, tokens, 1)
+
+    def remove(self, doc_id: str) -> None:
+        entry = self._docs.pop(str(doc_id), None)
+        if entry is not None:
+            self._count(entry[0], entry[1], -1)
+
+    def _count(self, tags: Tuple[str, ...], tokens: Tuple[str, ...], delta: int) -> None:
+        for t in tags:
+            n = self._tag_n.get(t, 0) + delta
+            if n > 0:
+                self._tag_n[t] = n
+            else:
+                self._tag_n.pop(t, None)
+            for u in tags:
+                if u != t:
+                    _bump(self._pairs, t, u, delta)
+        for tok in tokens:
+            n = self._tok_df.get(tok, 0) + delta
+            if n > 0:
+                self._tok_df[tok] = n
+            else:
+                self._tok_df.pop(tok, None)
+            for t in tags:
+                _bump(self._tok_tags, tok, t, delta)
+
+    @classmethod
+    def build(cls, items: Iterable[Dict[str, Any]], canonicalize: Callable[[str], str]) -> "TagSuggestIndex":
+        index = cls(canonicalize)
+        for it in items:
+            if isinstance(it, dict) and it.get("id"):
+                index.add(str(it["id"]), it)
+        return index
+
+    # ----------------- queries -----------------
+    def tag_count(self, tag: str) -> int:
+        return self._tag_n.get(self._canonicalize(tag), 0)
+
+    def cooccurrence(self, a: str, b: str) -> int:
+        return self._pairs.get(self._canonicalize(a), {}).get(self._canonicalize(b), 0)
+
+    def suggest(self, text: str, tags: Iterable[str] = (), k: int = 8) -> List[Tuple[str, float]]:
+        """Top-k (tag, score) for prompt text and already chosen `tags`, best first."""
+        n = len(self._docs)
+        if not n:
+            return []
+        chosen = [t for t in dict.fromkeys(self._canonicalize(t) for t in (tags or [])) if t]
+        max_df = n * MAX_DF_RATIO if n >= MIN_DOCS_FOR_DF_CUT else n
+        scores: Dict[str, float] = {}
+        for tok in _tokens({"content": text}, MAX_QUERY_TOKENS):
+            df = self._tok_df.get(tok)
+            if not df or df > max_df:
+                continue
+            w = math.log(1.0 + n / df) / df
+            for t, c in self._tok_tags[tok].items():
+                scores[t] = scores.get(t, 0.0) + w * c
+        for t in chosen:
+            tn = self._tag_n.get(t)
+            for u, c in (self._pairs.get(t) or {}).items():
+                scores[u] = scores.get(u, 0.0) + CO_WEIGHT * c / tn
+        for t in chosen:
+            scores.pop(t, None)
+        return [(t, round(s, 4)) for t, s in heapq.nsmallest(k, scores.items(), key=lambda ts: (-ts[1], ts[0]))]
+
+    def related(self, tag: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (tag, cosine) co-occurring with `tag`, best first."""
+        t = self._canonicalize(tag)
+        tn = self._tag_n.get(t)
+        if not tn:
+            return []
+        scored = ((u, c / math.sqrt(tn * self._tag_n[u])) for u, c in self._pairs.get(t, {}).items())
+        return [(u, round(s, 4)) for u, s in heapq.nsmallest(k, scored, key=lambda us: (-us[1], us[0]))]
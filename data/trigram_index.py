@@ -0,0 +1,58 @@
+"""Character-trigram index over the search vocabulary (typo-tolerant lookup).
+
+- Indexes the *terms* of the inverted index, not the documents: the vocabulary is
+  much smaller than the corpus, and term -> documents comes from the postings
+- Terms are padded like pg_trgm ("  word "), similarity = Jaccard of trigram sets
+- Terms are append-only in the inverted index, so sync() only indexes new ones
+"""
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from typing import Dict, List, Sequence, Set
+
+DEFAULT_THRESHOLD = 0.3
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    def __init__(self) -> None:
+        self._postings: Dict[str, array] = {}  # trigram -> term ids (ascending)
+        self._sizes = array("I")               # term id -> number of distinct trigrams
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def sync(self, terms: Sequence[str]) -> None:
+        """Index the terms appended since the last call."""
+        postings = self._postings
+        for tid in range(len(self._sizes), len(terms)):
+            grams = trigrams(terms[tid])
+            for g in grams:
+                plist = postings.get(g)
+                if plist is None:
+                    plist = postings[g] = array("I")
+                plist.append(tid)
+            self._sizes.append(len(grams))
+
+    def similar(self, token: str, threshold: float = DEFAULT_THRESHOLD) -> Dict[int, float]:
+        """Term id -> similarity for all terms at least `threshold` similar to `token`."""
+        grams = trigrams(token)
+        if not grams:
+            return {}
+        overlap: Counter = Counter()
+        for g in grams:
+            plist = self._postings.get(g)
+            if plist is not None:
+                overlap.update(plist)  # counted in C
+        n, sizes = len(grams), self._sizes
+        out: Dict[int, float] = {}
+        for tid, common in overlap.items():
+            sim = common / (n + sizes[tid] - common)
+            if sim >= threshold:
+                out[tid] = sim
+        return out
@@ -3,8 +3,8 @@ from __future__ import annotations
 import argparse, sys, json as _json, re, html as _html
 from dataclasses import dataclass, asdict
 from typing import Dict, Iterable, List, Optional
-from data.tag_normalizer import TagNormalizer
-from data.prompt_repository import PromptRepository
+from data.tag_normalizer import TagNormalizer, get_normalizer
+from data.prompt_repository import open_repository
 from .article_fetcher import clean_text
 
 @dataclass
@@ -93,7 +93,7 @@ def _derive_content(payload: Dict) -> str:
     return ""
 
 def map_extraction_to_prompts(extraction: Dict, meta: Optional[SourceMeta] = None, category: Optional[str] = None, default_tags: Optional[Iterable[str]] = None, normalizer: Optional[TagNormalizer] = None) -> List[Dict]:
-    normalizer = normalizer or TagNormalizer()
+    normalizer = normalizer or get_normalizer()
     payload: Dict = dict(extraction or {})
     title = _derive_title(payload, meta)
     content = _derive_content(payload)
@@ -143,10 +143,11 @@ def main_cli(argv: Optional[List[str]] = None) -> int:
     if args.dry_run:
         sys.stdout.write(_json.dumps(result, ensure_ascii=False))
         return 0
-    repo = PromptRepository()
-    for rec in records:
-        repo.add(rec)
-        result["saved_prompts"] += 1
+    repo = open_repository()
+    stored = repo.add_many(records, skip_duplicates=True)
+    result["saved_prompts"] = len(stored)
+    result["duplicates"] = len(records) - len(stored)
+    repo.close()
     sys.stdout.write(_json.dumps(result, ensure_ascii=False))
     return 0
 
@@ -1,6 +1,15 @@
 from __future__ import annotations
 import argparse, json, os, sys, subprocess, hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from data.prompt_repository import open_repository
+from data.signature_index import item_signature
+from data.tag_normalizer import get_normalizer
+from ingestion.article_ingestor import SourceMeta, map_extraction_to_prompts
+
+DEFAULT_BATCH_FILES = 200  # Dateien pro DB-Schreibvorgang (Engine "pool")
 
 def first_non_empty_line(text: str) -> str:
     for line in text.splitlines():
@@ -54,32 +63,100 @@ def run_ingestor_for_file(txt_path: Path, title: str, category: str, tags: str,
     }
     return result
 
-def main():
-    ap = argparse.ArgumentParser(description="Bulk-Ingest aller .txt in einem Verzeichnis (ruft ingestion.article_ingestor pro Datei).")
-    ap.add_argument("--dir", required=True, help="Ordner mit .txt Dateien")
-    ap.add_argument("--glob", default="*.txt", help="Dateimuster (Default: *.txt)")
-    ap.add_argument("--category", default="local", help="Kategorie für den Ingest")
-    ap.add_argument("--tags", default="article,pattern,local", help="Kommagetrennte Tags")
-    ap.add_argument("--dry-run", action="store_true", help="Nur Durchlauf testen, nichts speichern")
-    ap.add_argument("--max-title-len", type=int, default=120, help="Titel hart kürzen auf diese Länge")
-    ap.add_argument("--emit-jsonl", default="", help="Optional: JSONL-Logdatei mit allen Ergebnissen")
-    args = ap.parse_args()
-
-    base = Path(args.dir)
-    files = sorted(base.rglob(args.glob)) if "**" in args.glob else sorted(base.glob(args.glob))
-
-    if not files:
-        print(json.dumps({"ok": False, "files": 0, "note": "keine Dateien gefunden"}, ensure_ascii=False))
-        sys.exit(0)
+def map_file(job: Dict) -> Dict:
+    """Worker (Engine "pool"): Datei lesen und auf Prompt-Records abbilden; kein DB-Zugriff."""
+    f = Path(job["file"])
+    try:
+        txt = f.read_text(encoding="utf-8", errors="ignore")
+    except Exception as e:
+        return {"file": str(f), "ok": False, "error": f"read_error: {e}"}
+    title = (first_non_empty_line(txt) or f.stem)[:job["max_title_len"]]
+    defaults = [t.strip() for t in (job["tags"] or "").replace(";", ",").split(",") if t.strip()]
+    extraction = {"title": title, "text": txt, "tags": defaults, "key_takeaways": [], "patterns": []}
+    try:
+        # wie `python -m ingestion.article_ingestor --file ...`; Normalizer pro Worker-Prozess geteilt
+        records = map_extraction_to_prompts(
+            extraction, SourceMeta(url=to_file_uri(f), title=title), job["category"], defaults,
+            normalizer=get_normalizer(),
+        )
+    except Exception as e:
+        return {"file": str(f), "ok": True, "title": title, "content_hash": sha256_text(txt),
+                "records": [], "error": f"{type(e).__name__}: {e}"}
+    return {"file": str(f), "ok": True, "title": title, "content_hash": sha256_text(txt), "records": records}
+
+def _mapped(jobs: List[Dict], workers: int) -> Iterator[Dict]:
+    """Ergebnisse in Dateireihenfolge; Lesen + Mapping parallel in `workers` Prozessen."""
+    if workers <= 1:
+        yield from map(map_file, jobs)
+        return
+    chunk = max(1, min(32, len(jobs) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(map_file, jobs, chunksize=chunk)
+
+def _write_batch(repo, batch: List[Dict]) -> None:
+    """Single Writer: Records eines Batches mit einem add_many() speichern und die
+    gespeicherten Items (per Signatur) ihren Dateien zuordnen."""
+    owner: Dict[str, Dict] = {}
+    records: List[Dict] = []
+    for m in batch:
+        m["saved_ids"] = []
+        for rec in m.get("records") or []:
+            owner.setdefault(item_signature(rec), m)  # Dubletten im Batch: die erste gewinnt (wie add_many)
+            records.append(rec)
+    if not records or repo is None:
+        return
+    for stored in repo.add_many(records, batch_size=len(records), skip_duplicates=True):
+        m = owner.get(item_signature(stored))
+        if m is not None:
+            m["saved_ids"].append(stored.get("id"))
+
+def ingest_files(files: List[Path], category: str, tags: str, dry_run: bool, max_title_len: int,
+                 workers: Optional[int] = None, batch_files: int = DEFAULT_BATCH_FILES, repo=None) -> Iterator[Dict]:
+    """In-Process-Engine: liefert pro Datei das Ergebnis (inkl. saved_ids), sobald ihr Batch gespeichert ist."""
+    jobs = [{"file": str(f), "category": category, "tags": tags, "max_title_len": max_title_len} for f in files]
+    own_repo = repo is None and not dry_run
+    if own_repo:
+        repo = open_repository()
+    try:
+        batch: List[Dict] = []
+        for m in _mapped(jobs, workers or os.cpu_count() or 1):
+            batch.append(m)
+            if len(batch) >= max(1, batch_files):
+                _write_batch(None if dry_run else repo, batch)
+                yield from batch
+                batch = []
+        if batch:
+            _write_batch(None if dry_run else repo, batch)
+            yield from batch
+    finally:
+        if own_repo:
+            repo.close()
+
+def _run_pool(files: List[Path], args) -> Iterable[Dict]:
+    for m in ingest_files(files, args.category, args.tags, args.dry_run, args.max_title_len,
+                          workers=args.workers, batch_files=args.batch_files):
+        if not m.get("ok"):
+            yield {"file": m["file"], "ok": False, "error": m.get("error", "")}
+            continue
+        records = m.get("records") or []
+        saved = m.get("saved_ids") or []
+        yield {
+            "file": m["file"],
+            "title": m["title"],
+            "content_hash": m["content_hash"],
+            "ingestor_ok": not m.get("error"),
+            "ingestor_rc": 1 if m.get("error") else 0,
+            "ingestor_out": {"ok": not m.get("error"), "saved_prompts": len(saved),
+                             "duplicates": 0 if args.dry_run else len(records) - len(saved), "saved_ids": saved},
+            "ingestor_err": m.get("error", ""),
+        }
 
-    results = []
-    ok_count = 0
-    for idx, f in enumerate(files, 1):
+def _run_subprocess(files: List[Path], args) -> Iterable[Dict]:
+    for f in files:
         try:
             txt = f.read_text(encoding="utf-8", errors="ignore")
         except Exception as e:
-            item = {"file": str(f), "ok": False, "error": f"read_error: {e}"}
-            results.append(item)
+            yield {"file": str(f), "ok": False, "error": f"read_error: {e}"}
             continue
 
         title = first_non_empty_line(txt) or f.stem
@@ -88,7 +165,7 @@ def main():
 
         # Ingest aufrufen
         r = run_ingestor_for_file(f, title=title, category=args.category, tags=args.tags, dry_run=args.dry_run)
-        item = {
+        yield {
             "file": str(f),
             "title": title,
             "content_hash": content_hash,
@@ -97,13 +174,42 @@ def main():
             "ingestor_out": r["stdout"],
             "ingestor_err": r["stderr"],
         }
+
+def main():
+    ap = argparse.ArgumentParser(description="Bulk-Ingest aller .txt in einem Verzeichnis (parallel gelesen, gebündelt gespeichert).")
+    ap.add_argument("--dir", required=True, help="Ordner mit .txt Dateien")
+    ap.add_argument("--glob", default="*.txt", help="Dateimuster (Default: *.txt)")
+    ap.add_argument("--category", default="local", help="Kategorie für den Ingest")
+    ap.add_argument("--tags", default="article,pattern,local", help="Kommagetrennte Tags")
+    ap.add_argument("--dry-run", action="store_true", help="Nur Durchlauf testen, nichts speichern")
+    ap.add_argument("--max-title-len", type=int, default=120, help="Titel hart kürzen auf diese Länge")
+    ap.add_argument("--emit-jsonl", default="", help="Optional: JSONL-Logdatei mit allen Ergebnissen")
+    ap.add_argument("--engine", choices=["pool", "subprocess"], default="pool",
+                    help="pool: Worker-Prozesse + ein Schreiber (Default); subprocess: article_ingestor pro Datei")
+    ap.add_argument("--workers", type=int, default=None, help="Worker-Prozesse (Default: CPU-Anzahl; 1 = ohne Pool)")
+    ap.add_argument("--batch-files", type=int, default=DEFAULT_BATCH_FILES, help="Dateien pro DB-Schreibvorgang")
+    args = ap.parse_args()
+
+    base = Path(args.dir)
+    files = sorted(base.rglob(args.glob)) if "**" in args.glob else sorted(base.glob(args.glob))
+
+    if not files:
+        print(json.dumps({"ok": False, "files": 0, "note": "keine Dateien gefunden"}, ensure_ascii=False))
+        sys.exit(0)
+
+    results = []
+    ok_count = 0
+    run = _run_pool if args.engine == "pool" else _run_subprocess
+    for idx, item in enumerate(run(files, args), 1):
         results.append(item)
-        if r["ok"]:
+        if "ingestor_ok" not in item:
+            continue  # Lesefehler: kein Fortschritt, zählt als fehlgeschlagen
+        if item["ingestor_ok"]:
             ok_count += 1
 
         # Fortschritt auf stdout (ein JSON pro Zeile – gut für die GUI)
         # Infos aus dem Ingestor sammeln (falls vorhanden)
-        payload = r.get("ingestor_out") or {}
+        payload = item.get("ingestor_out") or {}
         saved_ids = []
         for key in ("saved_ids", "inserted_ids", "ids"):
             if isinstance(payload, dict) and key in payload and isinstance(payload[key], list):
@@ -114,11 +220,11 @@ def main():
         progress_obj = {
             "progress": idx,
             "total": len(files),
-            "file": str(f),
-            "title": title,                 # <— NEU
-            "ok": r["ok"],
-            "saved_ids": saved_ids,         # <— NEU (liste von ints/strs, wenn verfügbar)
-            "saved_prompts": saved_prompts, # <— NEU (anzahl, wenn verfügbar)
+            "file": item["file"],
+            "title": item["title"],
+            "ok": item["ingestor_ok"],
+            "saved_ids": saved_ids,         # liste von ints/strs, wenn verfügbar
+            "saved_prompts": saved_prompts, # anzahl, wenn verfügbar
         }
         print(json.dumps(progress_obj, ensure_ascii=False))
 
@@ -1,4 +1,4 @@
-import logging, sys, os
+import argparse, logging, sys, os
 from pathlib import Path
 
 os.environ.setdefault("PYTHONUTF8", "1")
@@ -17,14 +17,24 @@ from ui.html_import_injector import install as install_html_import
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
+def _parse_cli(argv):
+    """Own flags only; everything else is passed on to Qt."""
+    ap = argparse.ArgumentParser(add_help=False)
+    ap.add_argument("--backend", choices=["json", "journal", "sqlite"], default=None)
+    args, rest = ap.parse_known_args(argv[1:])
+    return args, [argv[0]] + rest
+
 def main():
     try:
+        args, qt_argv = _parse_cli(sys.argv)
         load_config()
+        if args.backend:
+            os.environ["PROMPT_DB_BACKEND"] = args.backend
         db_path = Path(os.getenv("DB_PATH", "data/prompts.json"))
         changed, backup = migrate_tinydb(db_path)
         logging.info(f"Migration geprüft: {changed} Einträge aktualisiert. Backup: {backup}")
 
-        app = QApplication(sys.argv)
+        app = QApplication(qt_argv)
         apply_theme(app, load_saved_theme("light"))
         win = MainWindow(app)
         install_html_import(win)
@@ -12,7 +12,7 @@ class Prompt(BaseModel):
     tags: List[str] = Field(default_factory=list)
     version: str = "v1.0"
     sample_output: str = ""
-    related_ids: List[int] = Field(default_factory=list)
+    related_ids: List[str] = Field(default_factory=list)  # ids ähnlicher Prompts (tools/find_similar.py --link)
 
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
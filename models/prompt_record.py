@@ -0,0 +1,124 @@
+"""Compact in-memory prompt record for large listings (GUI table, exports).
+
+- __slots__ instead of a per-row dict; unset fields cost one empty slot
+- category / version / tag strings are sys.intern()ed: 100k rows share a few hundred strings
+- tags and related_ids are tuples (no list over-allocation), converted back to lists by to_dict()
+- Read-only mapping API (get, [], in, keys, items) so code written against row dicts keeps working;
+  as_dict() is the boundary back to plain dicts (repository, JSON/YAML, dialogs)
+- Only saves memory where the rows are the only copy (SQLite listings, exports): next to the JSON
+  engine's cache a record is an extra copy, so the GUI table keeps the cached dicts there
+  (tools/bench_memory.py --gui)
+"""
+from __future__ import annotations
+
+import sys
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+FIELDS: Tuple[str, ...] = (
+    "id", "title", "description", "category", "tags", "version",
+    "content", "sample_output", "related_ids", "created_at", "updated_at",
+)
+_INTERNED = frozenset(("category", "version"))
+_SEQUENCES = frozenset(("tags", "related_ids"))
+_FIELD_SET = frozenset(FIELDS)
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+class PromptRecord:
+    __slots__ = FIELDS + ("_extra",)
+
+    def __init__(self, **values: Any) -> None:
+        self._extra: Optional[Dict[str, Any]] = None
+        for key, value in values.items():
+            self._set(key, value)
+
+    @classmethod
+    def from_dict(cls, item: Mapping[str, Any]) -> "PromptRecord":
+        if isinstance(item, cls):
+            return item
+        rec = cls.__new__(cls)
+        rec._extra = None
+        for key, value in item.items():
+            rec._set(key, value)
+        return rec
+
+    def _set(self, key: str, value: Any) -> None:
+        if key in _FIELD_SET:
+            if key in _SEQUENCES and isinstance(value, (list, tuple)):
+                value = tuple(_intern(v) for v in value) if key == "tags" else tuple(value)
+            elif key in _INTERNED:
+                value = _intern(value)
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    # ----------------- mapping API (read-only) -----------------
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        return self._extra.get(key, default) if self._extra else default
+
+    def __getitem__(self, key: str) -> Any:
+        marker = _MISSING
+        value = self.get(key, marker)
+        if value is marker:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING  # type: ignore[arg-type]
+
+    def keys(self) -> Iterator[str]:
+        for key in FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for key in self.keys():
+            yield key, self[key]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy; tuples back to lists like the repository stores them."""
+        out: Dict[str, Any] = {}
+        for key, value in self.items():
+            out[key] = list(value) if key in _SEQUENCES and isinstance(value, tuple) else value
+        return out
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PromptRecord):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"PromptRecord({self.to_dict()!r})"
+
+
+_MISSING = object()
+
+
+def as_record(item: Any) -> Any:
+    """Row -> PromptRecord (None stays None)."""
+    return None if item is None else PromptRecord.from_dict(item)
+
+
+def as_dict(item: Any) -> Any:
+    """Row -> plain dict; dicts are passed through uncopied."""
+    return item.to_dict() if isinstance(item, PromptRecord) else item
+
+
+def as_dicts(rows: Iterable[Any]) -> list:
+    return [as_dict(r) for r in rows]
@@ -1,9 +1,16 @@
-from datetime import datetime
 from pathlib import Path
+from data.backup_store import BackupStore
 def backup_json(src: Path, dst_dir: Path = Path("backups")) -> Path:
-    dst_dir.mkdir(parents=True, exist_ok=True)
-    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ"); dst = dst_dir / f"{src.stem}_{stamp}.json"
+    # dedupliziert: unveränderte Stände werden nur einmal (gzip, ggf. als Delta) abgelegt -> nur über restore_json/restore_point lesbar
     if not src.exists(): src.parent.mkdir(parents=True, exist_ok=True); src.write_text("[]", encoding="utf-8")
-    dst.write_text(src.read_text(encoding="utf-8"), encoding="utf-8"); return dst
+    store = BackupStore(dst_dir / "store"); entry = store.backup(src, label="backup_json")
+    return store.locate(entry["hash"])[1]
 def restore_json(backup_file: Path, dst: Path) -> None:
+    """Objekt aus dem Backup-Store (Delta-Kette aufgelöst, Hash geprüft) oder alten JSON-Export nach dst schreiben."""
+    backup_file = Path(backup_file)
+    if backup_file.name.endswith((".full.gz", ".delta.gz")):  # <store>/objects/<xx>/<hash>.<kind>.gz
+        BackupStore(backup_file.parents[2]).restore_hash(dst, backup_file.name.split(".", 1)[0]); return
     dst.parent.mkdir(parents=True, exist_ok=True); dst.write_text(backup_file.read_text(encoding="utf-8"), encoding="utf-8")
+def restore_point(dst: Path, point_in_time=None, dst_dir: Path = Path("backups")) -> dict:
+    """Stand zum Zeitpunkt point_in_time (datetime, ISO-String, Epoch; None = neuester) nach dst schreiben."""
+    return BackupStore(Path(dst_dir) / "store").restore(dst, point_in_time)
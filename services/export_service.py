@@ -1,8 +1,10 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 import csv, json
 
+from models.prompt_record import as_dict
+
 try:
     import yaml  # type: ignore
 except Exception:
@@ -13,17 +15,20 @@ DEFAULT_FIELDS = [
     "content","sample_output","related_ids","created_at","updated_at"
 ]
 
-def _ensure_list_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    # Make shallow copies to avoid mutating originals for CSV/MD
-    out = []
+def _ensure_list_rows(rows: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+    # Lazily, one row at a time: a shallow copy only for rows whose lists must be joined
+    # (originals stay untouched, no second full copy of the export in memory)
     for r in rows:
-        c = dict(r)
-        if isinstance(c.get("tags"), list):
-            c["tags"] = ", ".join(map(str, c["tags"]))
-        if isinstance(c.get("related_ids"), list):
-            c["related_ids"] = ", ".join(map(str, c["related_ids"]))
-        out.append(c)
-    return out
+        tags, related = r.get("tags"), r.get("related_ids")
+        if not isinstance(tags, (list, tuple)) and not isinstance(related, (list, tuple)):
+            yield as_dict(r)
+            continue
+        c = dict(r.items())
+        if isinstance(tags, (list, tuple)):
+            c["tags"] = ", ".join(map(str, tags))
+        if isinstance(related, (list, tuple)):
+            c["related_ids"] = ", ".join(map(str, related))
+        yield c
 
 def export_csv(rows: List[Dict[str, Any]], path: Path, fields: Optional[List[str]] = None) -> None:
     fields = fields or DEFAULT_FIELDS
@@ -84,10 +89,10 @@ def export_markdown(rows: List[Dict[str, Any]], path: Path, fields: Optional[Lis
 def export_json(rows: List[Dict[str, Any]], path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8") as f:
-        json.dump(rows, f, ensure_ascii=False, indent=2)
+        json.dump([as_dict(r) for r in rows], f, ensure_ascii=False, indent=2)
 
 def export_yaml(rows: List[Dict[str, Any]], path: Path) -> None:
     if yaml is None:
         raise RuntimeError("PyYAML ist nicht installiert. Bitte 'pip install PyYAML' ausführen.")
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(yaml.safe_dump(rows, sort_keys=False, allow_unicode=True), encoding="utf-8")
+    path.write_text(yaml.safe_dump([as_dict(r) for r in rows], sort_keys=False, allow_unicode=True), encoding="utf-8")
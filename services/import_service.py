@@ -93,34 +93,37 @@ def analyze(rows: List[Dict[str, Any]], mapping: Dict[str, Optional[str]]) -> Di
         "invalid": len(invalid),
     }
 
-def import_rows(repo, rows: List[Dict[str, Any]], mapping: Dict[str, Optional[str]], *, dry_run: bool, skip_duplicates: bool) -> Dict[str, Any]:
+def import_rows(repo, rows: List[Dict[str, Any]], mapping: Dict[str, Optional[str]], *, dry_run: bool, skip_duplicates: bool, batch_size: Optional[int] = None) -> Dict[str, Any]:
     mapped = [map_row(r, mapping) for r in rows]
     added = 0
     dupes = 0
     errors: List[str] = []
 
-    # Build existing signatures
-    existing = set()
-    for r in repo.all():
-        s = prompt_signature(r.get("title",""), r.get("content",""))
-        existing.add(s)
+    # duplicate check against the repository's signature index (O(1) per row)
+    seen = set()
 
+    to_add: List[Dict[str, Any]] = []
     for m in mapped:
         if not (m.get("title") and m.get("content")):
             errors.append(f"Ungültig (fehlende Pflichtfelder): {m.get('title','(ohne Titel)')}")
             continue
         sig = prompt_signature(m.get("title",""), m.get("content",""))
-        if skip_duplicates and sig in existing:
+        if skip_duplicates and (sig in seen or repo.has_signature(sig)):
             dupes += 1
             continue
+        seen.add(sig)
         if dry_run:
             added += 1
             continue
+        to_add.append(m)
+
+    if to_add:
         try:
-            repo.add(m)
-            existing.add(sig)
-            added += 1
+            # all-or-nothing: a failing batch rolls back the whole import
+            with repo.transaction():
+                added += len(repo.add_many(to_add, batch_size=batch_size))
         except Exception as e:
+            added = 0
             errors.append(str(e))
 
     return {"added": added, "duplicates": dupes, "errors": errors}
@@ -1,15 +1,17 @@
 from __future__ import annotations
 from pathlib import Path
 from typing import Tuple
-import shutil, datetime, json, io
+import json, io
 
-def _backup(path: Path) -> Path:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    ts = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-    bak = path.with_suffix(path.suffix + f".bak.{ts}")
-    if path.exists():
-        shutil.copy2(path, bak)
-    return bak
+from data.db_stamp import stamp_is_current
+from data.backup_store import store_for
+
+def _backup(path: Path) -> str | None:
+    # content-addressed store: a DB that did not change since the last backup costs nothing;
+    # returns hash, time and restore call (the object file itself is gzip, possibly a delta)
+    store = store_for(path)
+    entry = store.backup(path, label="migrate_tinydb")
+    return store.describe(entry) if entry else None
 
 def _normalize_utf8(path: Path) -> bool:
     """
@@ -46,14 +48,17 @@ def _normalize_utf8(path: Path) -> bool:
         path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
     return modified
 
-def migrate_tinydb(db_path: Path) -> Tuple[int, Path | None]:
+def migrate_tinydb(db_path: Path) -> Tuple[int, str | None]:
     """
     Normalize TinyDB JSON file encoding to UTF-8 (handles cp1252 files) and validate JSON.
-    Returns (changed_count, backup_path).
+    Returns (changed_count, backup), backup = BackupStore.describe() of the backup point.
     changed_count = 1 if file was modified/normalized, else 0.
+    A DB stamped by PromptRepository (unchanged since its last write) is skipped: no backup, no parse.
     """
     db_path = Path(db_path)
     bak = None
+    if db_path.exists() and stamp_is_current(str(db_path)):
+        return 0, None
     if db_path.exists():
         bak = _backup(db_path)
         changed = 1 if _normalize_utf8(db_path) else 0
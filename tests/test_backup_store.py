@@ -0,0 +1,96 @@
+import json
+
+from data.backup_store import BackupStore
+
+
+def _write(path, items):
+    path.write_bytes(json.dumps({"items": items}, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
+def _objects(store):
+    return sorted(p.name.split(".")[1] for p in (store.root / "objects").glob("*/*.gz"))
+
+
+def test_dedup_delta_chain_and_point_in_time_restore(tmp_path):
+    db, out = tmp_path / "prompts.json", tmp_path / "restored.json"
+    store = BackupStore(tmp_path / "store")
+    items = [{"id": f"id{i}", "title": f"T{i}", "content": "lorem ipsum " * 20} for i in range(50)]
+    _write(db, items)
+    first = store.backup(db, now=1000.0)
+    assert store.backup(db, now=1100.0) is not None and len(store.entries()) == 1  # unchanged -> same point
+
+    items[3]["title"] = "changed"
+    del items[7]
+    items.append({"id": "new", "title": "Neu", "content": "x"})
+    _write(db, items)
+    second = store.backup(db, now=2000.0)
+    assert (first["depth"], second["depth"]) == (0, 1)
+    assert _objects(store) == ["delta", "full"]
+
+    assert store.restore(out, 1500.0)["hash"] == first["hash"]
+    assert json.loads(out.read_text(encoding="utf-8"))["items"][3]["title"] == "T3"
+    store.restore(out)
+    assert out.read_bytes() == db.read_bytes()
+
+    # legacy layouts are stored as full objects
+    db.write_text('{"_default": {"1": {"title": "x"}}}', encoding="utf-8")
+    store.backup(db, now=3000.0)
+    assert _objects(store) == ["delta", "full", "full"]
+
+
+def test_retention_prunes_points_and_unreachable_objects(tmp_path):
+    db = tmp_path / "prompts.json"
+    store = BackupStore(tmp_path / "store", delta=False, retention={"keep_last": 2, "hourly": 0, "daily": 2, "weekly": 0})
+    for day in range(5):
+        _write(db, [{"id": "a", "title": f"day {day}"}])
+        store.backup(db, now=day * 86400.0 + 60)
+    # last two points (days 3, 4) + newest per day for the last two days (same points)
+    assert [e["ts"] // 86400 for e in store.entries()] == [3, 4]
+    assert len(_objects(store)) == 2
+
+
+def test_store_location_and_concurrent_writers_keep_all_points(tmp_path):
+    import threading
+    from data.backup_store import store_for, _REPO_ROOT
+    assert store_for(tmp_path / "db" / "prompts.json").root == tmp_path / "db" / "backups" / "store"
+    assert store_for(_REPO_ROOT / "data" / "prompts.json").root == _REPO_ROOT / "backups" / "store"
+
+    retention = {"keep_last": 1000, "hourly": 0, "daily": 0, "weekly": 0}
+
+    def writer(n):
+        store = BackupStore(tmp_path / "store", delta=False, retention=retention)  # own lock handle
+        db = tmp_path / f"db{n}.json"
+        for i in range(15):
+            _write(db, [{"id": "a", "title": f"{n}-{i}"}])
+            store.backup(db, now=1000.0 + i)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(BackupStore(tmp_path / "store").entries()) == 45
+
+
+def test_backup_json_objects_restore_through_the_store(tmp_path):
+    from services.backup_service import backup_json, restore_json, restore_point
+    db, out = tmp_path / "prompts.json", tmp_path / "restored.json"
+    items = [{"id": f"id{i}", "title": f"T{i}", "content": "lorem ipsum " * 20} for i in range(50)]
+    _write(db, items)
+    full = backup_json(db, tmp_path / "backups")
+    first = db.read_bytes()
+    items[3]["title"] = "changed"
+    _write(db, items)
+    delta = backup_json(db, tmp_path / "backups")
+    assert (full.name.endswith(".full.gz"), delta.name.endswith(".delta.gz")) == (True, True)
+
+    restore_json(delta, out)
+    assert out.read_bytes() == db.read_bytes()
+    restore_json(full, out)
+    assert out.read_bytes() == first
+
+    store = BackupStore(tmp_path / "backups" / "store")
+    entry = store.entries()[0]
+    hint = store.describe(entry)
+    assert hint.startswith(entry["hash"][:12]) and repr(entry["ts"]) in hint
+    assert restore_point(out, entry["ts"], str(tmp_path / "backups"))["hash"] == entry["hash"]
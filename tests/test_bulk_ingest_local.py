@@ -0,0 +1,27 @@
+import pytest
+
+from data.prompt_repository import PromptRepository
+from data.tag_normalizer import TagNormalizer
+from ingestion.bulk_ingest_local import ingest_files
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pool_engine_batches_writes_and_reports_per_file(tmp_path, monkeypatch, workers):
+    monkeypatch.delenv("PROMPT_DB_PATH", raising=False)
+    src = tmp_path / "in"
+    src.mkdir()
+    for i in range(7):
+        (src / f"f{i}.txt").write_text(f"Title {i % 5}\nbody {i % 5}\n", encoding="utf-8")
+    repo = PromptRepository(str(tmp_path / "p.json"), normalizer=TagNormalizer(alias_map={}))
+    commits = []
+    orig = repo.add_many
+    monkeypatch.setattr(repo, "add_many", lambda items, **kw: commits.append(len(items)) or orig(items, **kw))
+
+    files = sorted(src.glob("*.txt"))
+    results = list(ingest_files(files, "local", "Article, local", False, 120, workers=workers, batch_files=3, repo=repo))
+
+    assert [r["file"] for r in results] == [str(f) for f in files]
+    assert commits == [3, 3, 1]
+    assert [len(r["saved_ids"]) for r in results] == [1, 1, 1, 1, 1, 0, 0]  # f5/f6 duplicate f0/f1
+    assert repo.count() == 5
+    assert repo.get_by_id(results[0]["saved_ids"][0])["tags"] == ["article", "local"]
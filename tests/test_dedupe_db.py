@@ -0,0 +1,32 @@
+import argparse
+import json
+import os
+
+from data.journal_repository import JournalPromptRepository
+from data.tag_normalizer import TagNormalizer
+from tools.dedupe_db import open_db, run
+
+
+def test_apply_goes_through_the_journal_and_change_feed(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROMPT_DB_PATH", raising=False)
+    db = tmp_path / "prompts.json"
+    gui = JournalPromptRepository(str(db), normalizer=TagNormalizer(alias_map={}))
+    keep = gui.add({"title": "A", "content": "same text"})
+    gui.add({"title": "A", "content": "same  text"})                  # duplicate, only in the journal
+    other = gui.add({"title": "B", "content": "other"})
+    assert os.path.getsize(gui.journal_path) > 0
+
+    repo = open_db(db)
+    assert isinstance(repo, JournalPromptRepository)
+    args = argparse.Namespace(mode="title+content", keep="first", apply=True, limit_print=20)
+    assert run(args, db, repo) == 0
+    repo.close()
+
+    # snapshot and journal agree: the dropped record does not come back on replay
+    with open(db, encoding="utf-8") as f:
+        assert [it["id"] for it in json.load(f)["items"]] == [keep["id"], other["id"]]
+    assert os.path.getsize(gui.journal_path) == 0
+    assert [it["id"] for it in JournalPromptRepository(str(db), normalizer=gui.normalizer).all()] == [keep["id"], other["id"]]
+    # other processes get a regular delete event, not a reset
+    events = gui.poll_changes()
+    assert any(len(e.deleted) == 1 for e in events) and not any(e.reset for e in events)
@@ -0,0 +1,66 @@
+from data.facet_index import Bitmap, FacetIndex, iter_bits
+from data.prompt_repository import PromptRepository
+from data.tag_normalizer import TagNormalizer
+
+
+def test_bitmap_roundtrip():
+    bm = Bitmap()
+    for n in (0, 63, 64, 200):
+        bm.add(n)
+    bm.discard(63)
+    assert 64 in bm and 63 not in bm
+    assert list(iter_bits(bm.to_int())) == [0, 64, 200]
+    assert bm.count() == 3
+
+
+def test_rare_tags_stay_sparse_and_counts_are_maintained():
+    from data.facet_index import SPARSE_BITS_PER_MEMBER
+    items = [{"id": str(n), "tags": ["common"] + (["rare"] if n % 1000 == 999 else [])} for n in range(5000)]
+    index = FacetIndex.build(items, str.lower)
+    assert index._tags["rare"].sparse and not index._tags["common"].sparse
+    assert index.tag_counts() == {"common": 5000, "rare": 5}
+    assert index.match(["rare"]) == {"999", "1999", "2999", "3999", "4999"}
+    index.remove("999")
+    index.add("999", {"tags": ["other"]})
+    assert index.tag_counts() == {"common": 4999, "rare": 4, "other": 1}
+    for n in range(4):
+        index.remove(str(n * 1000 + 1999))
+    assert "rare" not in index.tag_counts() and index.match(["rare"]) == set()
+
+    bm = Bitmap()
+    for n in range(0, 4 * SPARSE_BITS_PER_MEMBER, SPARSE_BITS_PER_MEMBER // 2):
+        bm.add(n)
+    assert not bm.sparse and len(bm) == 8 and list(iter_bits(bm.to_int()))[-1] == 7 * SPARSE_BITS_PER_MEMBER // 2
+
+
+def test_facet_and_or_and_slot_reuse():
+    index = FacetIndex.build([
+        {"id": "a", "tags": ["x", "y"], "category": "Dev"},
+        {"id": "b", "tags": ["y"]},
+        {"id": "c", "tags": ["z"], "category": "dev "},
+    ], str.lower)
+    assert index.match(["y", "x"]) == {"a"}
+    assert index.match(["x", "z"], match_all=False) == {"a", "c"}
+    assert index.match([], category="dev") == {"a", "c"}
+    assert index.match(["y"], category="dev") == {"a"}
+    assert index.match() is None
+    index.remove("a")
+    index.add("d", {"tags": ["X"]})  # reuses the freed slot
+    assert index.match(["x"]) == {"d"}
+    assert index.tag_counts() == {"x": 1, "y": 1, "z": 1}
+
+
+def test_repository_tag_filters_follow_mutations(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROMPT_DB_PATH", raising=False)
+    repo = PromptRepository(str(tmp_path / "prompts.json"), normalizer=TagNormalizer(alias_map={"python": ["py"]}))
+    a = repo.add({"title": "A", "content": "c", "tags": ["python", "cli"], "category": "Dev"})
+    b = repo.add({"title": "B", "content": "c", "tags": ["py"]})
+    assert repo.ids_with_tags(["PY"]) == {a["id"], b["id"]}
+    assert repo.ids_with_tags(["python", "cli"]) == {a["id"]}
+    assert [it["id"] for it in repo.search(tags=["python"], category="dev")] == [a["id"]]
+
+    repo.update(b["id"], {"tags": ["cli"]})
+    repo.delete(a["id"])
+    assert repo.ids_with_tags(["python"]) == set()
+    assert repo.ids_with_tags(["cli", "python"], match_all=False) == {b["id"]}
+    assert repo.tag_counts() == {"cli": 1}
@@ -0,0 +1,62 @@
+import pytest
+
+from data.file_lock import FileLock, LockTimeout, EXCLUSIVE, SHARED
+
+
+def _locks(tmp_path, flock=True):
+    path = str(tmp_path / "prompts.json.lock")
+    a, b = FileLock(path, timeout=0.05), FileLock(path, timeout=0.05)
+    if not flock:
+        a._use_flock = b._use_flock = False
+    return a, b
+
+
+@pytest.mark.parametrize("flock", [True, False])
+def test_exclusive_excludes_and_times_out(tmp_path, flock):
+    a, b = _locks(tmp_path, flock)
+    with a.exclusive():
+        with pytest.raises(LockTimeout):
+            with b.shared():
+                pass
+    with b.exclusive():  # released again
+        pass
+    assert b.stats.timeouts == 1 and b.stats.contended == 1  # a timed-out wait counts as contended
+    assert b.stats.as_dict()["exclusive"] == 1 and b.stats.wait_s > 0
+
+
+def test_shared_holders_coexist_and_reentry(tmp_path):
+    a, b = _locks(tmp_path)
+    with a.shared(), b.shared():
+        assert a.held == SHARED and b.held == SHARED
+        with pytest.raises(LockTimeout):
+            with a.exclusive():  # upgrade waits for the other reader
+                pass
+    with a.exclusive():
+        with a.shared():  # nested shared inside exclusive costs nothing
+            assert a.held == EXCLUSIVE
+        assert a.stats.acquired == {SHARED: 2, EXCLUSIVE: 1}  # incl. re-taking shared after the failed upgrade
+    assert a.held is None
+
+
+def test_lock_file_is_only_broken_when_its_holder_is_gone(tmp_path):
+    import os, socket, subprocess, sys
+    a, b = _locks(tmp_path, flock=False)
+    with a.exclusive():
+        old = os.stat(a.excl_path).st_mtime - 3600
+        os.utime(a.excl_path, (old, old))  # a long-running holder: age alone must not break it
+        with pytest.raises(LockTimeout):
+            with b.exclusive():
+                pass
+    assert not os.path.exists(a.excl_path)
+
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    with open(a.excl_path, "w", encoding="utf-8") as f:
+        f.write(f"{dead.pid} {socket.gethostname()}\n")  # crashed holder
+    with b.exclusive():
+        assert open(b.excl_path, encoding="utf-8").read().split()[0] == str(os.getpid())
+    with open(a.excl_path, "w", encoding="utf-8") as f:
+        f.write(f"{dead.pid} some-other-host\n")  # cannot be checked from here
+    with pytest.raises(LockTimeout):
+        with b.exclusive():
+            pass
@@ -0,0 +1,35 @@
+from utils.minhash import choose_bands, estimate_jaccard, near_duplicate_clusters, shingles, signature
+
+
+def test_numbering_and_punctuation_are_ignored():
+    a = shingles("Prompt 3 — Summarize the article, briefly.")
+    b = shingles("prompt 12 - summarize the article briefly")
+    assert a == b and signature(a) == signature(b)
+
+
+def test_clusters_near_duplicates_only():
+    base = "Summarize the following article in five bullet points and keep the tone neutral and factual"
+    texts = [
+        base,
+        "Write a haiku about autumn leaves falling on a quiet mountain lake at dusk",
+        "Prompt 2 — " + base + ".",
+        base + " Add a title.",
+        "",
+    ]
+    assert near_duplicate_clusters(texts, threshold=0.7) == [[0, 2, 3]]
+    assert estimate_jaccard(signature(shingles(texts[0])), signature(shingles(texts[1]))) < 0.2
+
+
+def test_band_choice_matches_threshold():
+    bands, rows = choose_bands(128, 0.8)
+    assert bands * rows == 128 and (1 / bands) ** (1 / rows) <= 0.8
+
+
+def test_dedupe_splits_chained_clusters_around_the_keeper():
+    from tools.dedupe_db import summarize_near_dupes
+    words = [f"word{i}" for i in range(150)]
+    a, b, c = (" ".join(words[start:start + 100]) for start in (0, 25, 50))  # A~B, B~C, A!~C
+    items = [{"content": t} for t in (a, b, c)]
+    assert near_duplicate_clusters([a, b, c], threshold=0.45) == [[0, 1, 2]]
+    assert list(summarize_near_dupes(items, 0.45, 128, 3).values()) == [[0, 1]]           # C survives
+    assert list(summarize_near_dupes(items, 0.45, 128, 3, "last").values()) == [[1, 2]]   # A survives
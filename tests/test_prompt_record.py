@@ -0,0 +1,39 @@
+import csv
+import json
+
+from models.prompt_record import PromptRecord, as_dict
+from services.export_service import export_csv, export_json
+from tools.bench_memory import run, synthetic_rows
+
+
+def test_record_mapping_api_and_roundtrip():
+    item = {"id": "1", "title": "T", "category": "Dev", "tags": ["a", "b"], "custom": 7}
+    rec = PromptRecord.from_dict(item)
+    assert rec["title"] == "T" and rec.get("content") is None and rec.get("content", "") == ""
+    assert rec["tags"] == ("a", "b") and "custom" in rec and "content" not in rec
+    assert list(rec.keys()) == ["id", "title", "category", "tags", "custom"]
+    assert rec.to_dict() == item and rec == item
+    assert as_dict(rec) == item and as_dict(item) is item
+    assert PromptRecord.from_dict(rec) is rec
+
+
+def test_category_and_tag_strings_are_shared():
+    a, b = json.loads('[{"id": "1", "category": "Analyse", "tags": ["llm"]},'
+                      ' {"id": "2", "category": "Analyse", "tags": ["llm"]}]')
+    assert a["category"] is not b["category"]
+    ra, rb = PromptRecord.from_dict(a), PromptRecord.from_dict(b)
+    assert ra["category"] is rb["category"] and ra["tags"][0] is rb["tags"][0]
+
+
+def test_exports_accept_records(tmp_path):
+    rows = [PromptRecord.from_dict({"id": "1", "title": "T", "tags": ["a", "b"], "related_ids": ["2"]})]
+    export_csv(rows, tmp_path / "out.csv", fields=["id", "tags", "related_ids"])
+    with (tmp_path / "out.csv").open(encoding="utf-8") as f:
+        assert list(csv.DictReader(f)) == [{"id": "1", "tags": "a, b", "related_ids": "2"}]
+    export_json(rows, tmp_path / "out.json")
+    assert json.loads((tmp_path / "out.json").read_text(encoding="utf-8"))[0]["tags"] == ["a", "b"]
+
+
+def test_records_use_less_memory_than_dicts():
+    res = run(synthetic_rows(2000), ["id", "title", "category", "tags", "updated_at"])
+    assert res["record_bytes"] < res["dict_bytes"]
@@ -0,0 +1,266 @@
+import json
+import os
+
+import pytest
+
+from data.prompt_repository import PromptRepository
+from data.tag_normalizer import TagNormalizer
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROMPT_DB_PATH", raising=False)
+    return PromptRepository(str(tmp_path / "prompts.json"), normalizer=TagNormalizer(alias_map={}))
+
+
+def test_cached_reads_pick_up_external_writes(repo):
+    repo.add({"title": "A", "content": "alpha"})
+    assert repo.count() == 1
+
+    # external process rewrites the file (e.g. tools.ingest_jsonl_to_db)
+    with open(repo.db_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    data["items"].append({"id": "ext", "title": "B", "content": "beta"})
+    with open(repo.db_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+    assert repo.count() == 2
+    assert repo.get_by_id("ext")["title"] == "B"
+
+
+def test_cache_skips_reparse_when_file_unchanged(repo, monkeypatch):
+    repo.add({"title": "A", "content": "alpha"})
+    calls = []
+    orig = repo._load_raw
+    monkeypatch.setattr(repo, "_load_raw", lambda: calls.append(1) or orig())
+    repo.count(); repo.all_tags(); repo.search("alpha")
+    assert calls == []
+
+
+def test_journal_engine_appends_and_replays(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROMPT_DB_PATH", raising=False)
+    from data.journal_repository import JournalPromptRepository
+    db = str(tmp_path / "prompts.json")
+    tn = TagNormalizer(alias_map={})
+    repo = JournalPromptRepository(db, normalizer=tn)
+    repo.add({"title": "A", "content": "alpha"})
+    b = repo.add({"title": "B", "content": "beta"})
+    repo.update(0, {"title": "A2"})
+    repo.delete(b["id"])
+
+    with open(db, "r", encoding="utf-8") as f:
+        assert json.load(f) == {"items": []}  # snapshot untouched
+    with open(repo.journal_path, "r", encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 4
+
+    other = JournalPromptRepository(db, normalizer=tn)
+    assert [it["title"] for it in other.all()] == ["A2"]
+
+    repo.close()
+    with open(db, "r", encoding="utf-8") as f:
+        assert [it["title"] for it in json.load(f)["items"]] == ["A2"]
+    assert (tmp_path / "prompts.json.journal").read_text(encoding="utf-8") == ""
+
+
+def test_batch_api_persists_once_per_batch(repo, monkeypatch):
+    writes = []
+    orig = repo._dump
+    monkeypatch.setattr(repo, "_dump", lambda data: writes.append(1) or orig(data))
+
+    stored = repo.add_many(({"title": f"T{i}", "content": "c", "tags": ["X "]} for i in range(5)), batch_size=2)
+    assert len(writes) == 3
+    assert all(it["id"] and it["tags"] == ["x"] for it in stored)
+
+    writes.clear()
+    repo.update_many([(stored[0]["id"], {"title": "first"}), (4, {"title": "last"})])
+    assert len(writes) == 1
+    assert repo.get(0)["title"] == "first" and repo.get(4)["title"] == "last"
+
+    removed = repo.delete_many([0, stored[2]["id"], 4])
+    assert [it["title"] for it in removed] == ["first", "T2", "last"]
+    assert [it["title"] for it in repo.all()] == ["T1", "T3"]
+
+
+def test_id_index_follows_mutations(repo):
+    stored = repo.add_many({"title": f"T{i}", "content": "c"} for i in range(6))
+    ids = [it["id"] for it in stored]
+    assert repo.get_by_id(ids[3])["title"] == "T3"
+
+    repo.delete(ids[1])
+    repo.delete(0)
+    assert repo._find_index_by_id(ids[3]) == 1
+    assert repo._find_index_by_id(ids[1]) is None
+
+    repo.update(ids[5], {"title": "last"})
+    assert repo.get(-1)["title"] == "last"
+    new = repo.add({"title": "N", "content": "c"})
+    assert repo._find_index_by_id(new["id"]) == 4
+    with pytest.raises(KeyError):
+        repo.update("missing", {"title": "x"})
+
+
+def test_signature_index_rejects_duplicates(repo):
+    from utils.hash_utils import prompt_signature
+    first = repo.add({"title": "Summary", "content": "Summarize this"})
+    stored = repo.add_many(
+        [
+            {"title": " summary ", "content": "SUMMARIZE THIS"},  # same normalized signature
+            {"title": "New", "content": "fresh"},
+            {"title": "New", "content": "fresh"},                  # duplicate within the batch
+        ],
+        skip_duplicates=True,
+    )
+    assert [it["title"] for it in stored] == ["New"]
+    assert repo.has_signature(prompt_signature("New", "fresh"))
+
+    repo.update(first["id"], {"content": "changed"})
+    assert not repo.has_signature(prompt_signature("Summary", "Summarize this"))
+    repo.delete(stored[0]["id"])
+    assert not repo.is_duplicate({"title": "New", "content": "fresh"})
+
+    repo.close()
+    reopened = PromptRepository(repo.db_path, normalizer=repo.normalizer)
+    assert reopened.has_signature(prompt_signature("Summary", "changed"))
+    with open(repo.signature_index_path, "r", encoding="utf-8") as f:
+        assert set(json.load(f)["by_id"]) == {first["id"]}  # JSON, never unpickled
+
+    # a swapped sidecar is ignored and the index rebuilt from the items
+    import pickle
+    with open(repo.signature_index_path, "wb") as f:
+        pickle.dump({"version": 1, "by_id": {}}, f)
+    assert PromptRepository(repo.db_path, normalizer=repo.normalizer).has_signature(prompt_signature("Summary", "changed"))
+
+
+def test_transaction_commits_once_and_rolls_back(repo, monkeypatch):
+    keep = repo.add({"title": "keep", "content": "c"})
+    writes = []
+    orig = repo._dump
+    monkeypatch.setattr(repo, "_dump", lambda data: writes.append(1) or orig(data))
+
+    with repo.transaction():
+        a = repo.add({"title": "A", "content": "c"})
+        repo.update(a["id"], {"title": "A2"})
+        with repo.transaction():  # nested blocks join the outer one
+            repo.add_many([{"title": "B", "content": "c"}], batch_size=1)
+        assert writes == [] and repo.count() == 3
+    assert len(writes) == 1
+    assert [it["title"] for it in PromptRepository(repo.db_path, normalizer=repo.normalizer).all()] == ["keep", "A2", "B"]
+
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.delete(keep["id"])
+            repo.add({"title": "rolled back", "content": "c"})
+            raise RuntimeError("boom")
+    assert len(writes) == 1
+    assert [it["title"] for it in repo.all()] == ["keep", "A2", "B"]
+    assert repo.get_by_id(keep["id"])["title"] == "keep"
+    assert not repo.search("rolled")
+    assert not os.path.exists(repo.db_path + ".tmp")
+
+
+def test_journal_transaction_is_one_line(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROMPT_DB_PATH", raising=False)
+    from data.journal_repository import JournalPromptRepository
+    db = str(tmp_path / "prompts.json")
+    repo = JournalPromptRepository(db, normalizer=TagNormalizer(alias_map={}))
+    with repo.transaction():
+        repo.add({"title": "A", "content": "a"})
+        repo.add({"title": "B", "content": "b"})
+    with open(repo.journal_path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 1 and json.loads(lines[0])["op"] == "batch"
+    other = JournalPromptRepository(db, normalizer=TagNormalizer(alias_map={}))
+    assert [it["title"] for it in other.all()] == ["A", "B"]
+
+
+def test_concurrent_writers_do_not_lose_updates(repo):
+    # a second process (GUI vs. ingest tool) holding its own cached copy of the DB
+    other = PromptRepository(repo.db_path, normalizer=repo.normalizer)
+    assert other.count() == 0 and repo.count() == 0
+    repo.add({"title": "from gui", "content": "a"})
+    other.add({"title": "from ingest", "content": "b"})
+    with repo.transaction():
+        repo.add({"title": "from gui 2", "content": "c"})
+    titles = {it["title"] for it in PromptRepository(repo.db_path, normalizer=repo.normalizer).all()}
+    assert titles == {"from gui", "from ingest", "from gui 2"}
+    assert repo.lock_stats()["exclusive"] >= 2
+
+
+def test_failed_commit_is_not_persisted_later(tmp_path, monkeypatch):
+    from data.file_lock import FileLock, LockTimeout
+    monkeypatch.delenv("PROMPT_DB_PATH", raising=False)
+    repo = PromptRepository(str(tmp_path / "prompts.json"), normalizer=TagNormalizer(alias_map={}), lock_timeout=0.05)
+    repo.add({"title": "A", "content": "a"})
+    with FileLock(repo.db_path + ".lock").exclusive():  # another process holds the DB
+        with pytest.raises(LockTimeout):
+            repo.add({"title": "lost", "content": "b"})
+        with pytest.raises(LockTimeout):
+            with repo.transaction():
+                repo.add({"title": "lost too", "content": "c"})
+    assert repo.count() == 1 and not repo.search("lost")
+    repo.add({"title": "C", "content": "c"})
+    titles = [it["title"] for it in PromptRepository(repo.db_path, normalizer=repo.normalizer).all()]
+    assert titles == ["A", "C"] and [it["title"] for it in repo.all()] == ["A", "C"]
+
+
+def test_change_events_local_and_cross_process(repo):
+    seen = []
+    unsubscribe = repo.subscribe(seen.append)
+    a = repo.add({"title": "A", "content": "a"})
+    with repo.transaction():
+        b = repo.add({"title": "B", "content": "b"})
+        repo.update(b["id"], {"title": "B2"})
+        repo.update(a["id"], {"title": "A2"})
+    assert [(e.added, e.updated, e.deleted) for e in seen] == [((a["id"],), (), ()), ((b["id"],), (a["id"],), ())]
+    assert seen[1].generation == seen[0].generation + 1
+
+    other = PromptRepository(repo.db_path, normalizer=repo.normalizer)
+    other.delete(a["id"])
+    events = repo.poll_changes()
+    assert [(e.deleted, e.reset) for e in events] == [((a["id"],), False)] and seen[-1] is events[0]
+    assert repo.poll_changes() == []
+
+    # a tool rewriting the file without the feed -> reset
+    with open(repo.db_path, "w", encoding="utf-8") as f:
+        json.dump({"items": []}, f)
+    assert [e.reset for e in repo.poll_changes()] == [True]
+    unsubscribe()
+    repo.add({"title": "C", "content": "c"})
+    assert len(seen) == 4
+
+
+def test_stamp_skips_migration_scans_until_db_changes(repo, monkeypatch):
+    from services.migration_service import migrate_tinydb
+    repo.add({"title": "A", "content": "a"})
+    calls = []
+    monkeypatch.setattr(PromptRepository, "_ensure_schema_on_disk", lambda self: calls.append(1) or False)
+    PromptRepository(repo.db_path, normalizer=repo.normalizer)
+    assert calls == [] and migrate_tinydb(repo.db_path) == (0, None)
+
+    # same bytes, new mtime (restored copy): still current
+    os.utime(repo.db_path, ns=(1, 1))
+    PromptRepository(repo.db_path, normalizer=repo.normalizer)
+    assert calls == []
+
+    # edited by hand: stale -> full migration (and an id for the new item)
+    with open(repo.db_path, "w", encoding="utf-8") as f:
+        json.dump({"items": [{"title": "B", "content": "b"}]}, f)
+    other = PromptRepository(repo.db_path, normalizer=repo.normalizer)
+    assert calls == [1] and other.all()[0]["id"]
+    PromptRepository(repo.db_path, normalizer=repo.normalizer)
+    assert calls == [1]
+
+
+def test_check_aliases_follows_alias_file(tmp_path, monkeypatch):
+    aliases = tmp_path / "aliases.json"
+    aliases.write_text(json.dumps({"ai": ["KI"]}), encoding="utf-8")
+    monkeypatch.setenv("TAG_ALIAS_PATH", str(aliases))
+    repo = PromptRepository(str(tmp_path / "prompts.json"))
+    repo.add_many([{"title": "A", "content": "a", "tags": ["llm"]}, {"title": "B", "content": "b", "tags": ["KI"]}])
+    assert repo.check_aliases() == 0
+    aliases.write_text(json.dumps({"ai": ["KI", "LLM"]}), encoding="utf-8")
+    st = os.stat(aliases)
+    os.utime(aliases, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert repo.check_aliases() == 1
+    assert [it["tags"] for it in repo.all()] == [["ai"], ["ai"]]
+    assert repo.tag_counts() == {"ai": 2}
@@ -0,0 +1,106 @@
+import pytest
+
+from data.prompt_repository import PromptRepository
+from data.search_index import InvertedIndex
+from data.tag_normalizer import TagNormalizer
+
+
+ITEMS = [
+    {"id": "a", "title": "Zusammenfassung", "content": "Fasse den Text kurz zusammen.", "tags": ["summary"]},
+    {"id": "b", "title": "Code Review", "content": "Review this python-code for bugs", "category": "Dev"},
+    {"id": "c", "title": "Brainstorm", "content": "Ideas for a product launch", "description": "kreativ"},
+]
+
+
+def test_candidates_cover_substring_semantics():
+    index = InvertedIndex.build(ITEMS)
+    assert index.candidates("sammen") == {"a"}           # inside a term
+    assert index.candidates("n-cod") == {"b"}            # suffix + prefix across punctuation
+    assert index.candidates("view this py") == {"b"}
+    assert index.candidates("kreativ") == {"c"}          # description is indexed
+    assert index.candidates("nothing here") == set()
+    assert index.candidates("  --  ") is None            # no word chars: caller must scan
+    index.remove("b")
+    assert index.candidates("python") == set()
+    assert index.positions("c", "for") == [3]
+
+
+def test_repository_search_uses_index_and_persists(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROMPT_DB_PATH", raising=False)
+    db = str(tmp_path / "prompts.json")
+    repo = PromptRepository(db, normalizer=TagNormalizer(alias_map={}))
+    repo.add_many(ITEMS)
+    assert [it["id"] for it in repo.search("code")] == ["b"]
+    assert repo.match_ids("KREATIV") == {"c"}
+    repo.add({"id": "d", "title": "More code", "content": "x"})
+    assert [it["id"] for it in repo.search("code")] == ["b", "d"]
+    repo.delete("b")
+    assert [it["id"] for it in repo.search("code")] == ["d"]
+    repo.close()
+
+    reopened = PromptRepository(db, normalizer=TagNormalizer(alias_map={}))
+    monkeypatch.setattr(InvertedIndex, "build", classmethod(lambda cls, items: pytest.fail("index rebuilt")))
+    assert [it["id"] for it in reopened.search("code")] == ["d"]
+
+
+def test_sidecar_is_json_and_foreign_files_are_ignored(tmp_path):
+    import json, pickle
+    index = InvertedIndex.build(ITEMS)
+    index.remove("b")
+    path = str(tmp_path / "prompts.json.search.idx")
+    index.save(path, (1, 2, 3))
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["docs"] == ["a", None, "c"]
+    loaded = InvertedIndex.load(path, (1, 2, 3))
+    assert loaded.candidates("sammen") == {"a"} and loaded.bm25("ideas", ["a", "c"]) == index.bm25("ideas", ["a", "c"])
+    assert InvertedIndex.load(path, (1, 2, 4)) is None
+
+    state = json.loads(open(path, encoding="utf-8").read())
+    state["postings_lens"][0] += 1
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    assert InvertedIndex.load(path, (1, 2, 3)) is None
+
+    class Boom:
+        def __reduce__(self):
+            return (pytest.fail, ("sidecar was unpickled",))
+    evil = tmp_path / "evil.idx"
+    evil.write_bytes(pickle.dumps({"version": 1, "signature": (1, 2, 3), "x": Boom()}))
+    assert InvertedIndex.load(str(evil), (1, 2, 3)) is None
+
+
+def test_bm25_ranks_title_hits_and_term_frequency_first(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROMPT_DB_PATH", raising=False)
+    repo = PromptRepository(str(tmp_path / "prompts.json"), normalizer=TagNormalizer(alias_map={}))
+    repo.add({"title": "Notes", "content": "one python mention among many other words here"})
+    repo.add({"title": "Python helper", "content": "write code"})
+    repo.add({"title": "Scripts", "content": "python python python"})
+    repo.add({"title": "Unrelated", "content": "nothing"})
+
+    plain = [it["title"] for it in repo.search("python")]
+    assert plain == ["Notes", "Python helper", "Scripts"]
+    ranked = [it["title"] for it in repo.search("python", rank=True)]
+    assert ranked[-1] == "Notes" and set(ranked) == set(plain)
+    assert [it["title"] for it in repo.search("python", rank=True, limit=1)] == ranked[:1]
+    assert len(repo.search("python", limit=2)) == 2
+
+
+def test_bm25_statistics_follow_mutations():
+    index = InvertedIndex.build(ITEMS)
+    before = index.bm25("review", ["b"])["b"]
+    index.add("d", {"id": "d", "title": "Review", "content": "review review"})
+    assert index.bm25("review", ["b"])["b"] < before  # term got more common
+    index.remove("d")
+    assert index.bm25("review", ["b"])["b"] == pytest.approx(before)
+    assert index.bm25("review", ["missing"]) == {"missing": 0.0}
+
+
+def test_fuzzy_tolerates_typos():
+    index = InvertedIndex.build(ITEMS + [{"id": "d", "title": "Summarize article", "content": "short summary"}])
+    assert [doc for doc, _ in index.fuzzy("zusammenfasung")][:1] == ["a"]
+    assert [doc for doc, _ in index.fuzzy("sumarize", limit=1)] == ["d"]
+    index.add("e", {"title": "Summarise", "content": "british"})  # new terms get trigrams on next call
+    assert {doc for doc, _ in index.fuzzy("summarise")} >= {"d", "e"}
+    index.remove("d")
+    assert "d" not in {doc for doc, _ in index.fuzzy("sumarize")}
+    assert index.fuzzy("   ") == []
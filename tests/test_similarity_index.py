@@ -0,0 +1,40 @@
+import pytest
+
+from data.prompt_repository import PromptRepository
+from data.similarity_index import TfidfIndex
+from data.tag_normalizer import TagNormalizer
+
+
+ITEMS = [
+    {"id": "a", "title": "Summarize article", "content": "Summarize the following news article in three bullet points"},
+    {"id": "b", "title": "Article summary", "content": "Write a short summary of this news article as bullet points"},
+    {"id": "c", "title": "Python review", "content": "Review the python code for bugs and style issues"},
+    {"id": "d", "title": "Code review", "content": "Review this code and point out bugs"},
+]
+
+
+def test_similar_to_ranks_by_cosine():
+    index = TfidfIndex.build(ITEMS)
+    hits = index.similar_to("a", k=3)
+    assert hits[0][0] == "b" and "a" not in [h for h, _ in hits]
+    assert index.similar_to("c", k=1)[0][0] == "d"
+    assert index.similar_to_text("python bugs", k=1)[0][0] == "c"
+    assert all(0.0 < score <= 1.0 + 1e-9 for _, score in hits)
+
+
+def test_similarity_follows_mutations_and_links_related(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROMPT_DB_PATH", raising=False)
+    repo = PromptRepository(str(tmp_path / "prompts.json"), normalizer=TagNormalizer(alias_map={}))
+    stored = repo.add_many({k: v for k, v in it.items() if k != "id"} for it in ITEMS)
+    ids = [it["id"] for it in stored]
+    assert repo.similar(ids[2], k=1)[0][0]["id"] == ids[3]
+
+    repo.delete(ids[3])
+    new = repo.add({"title": "Python linting", "content": "Check python code style issues"})
+    assert repo.similar(ids[2], k=1)[0][0]["id"] == new["id"]
+
+    assert repo.link_related(k=1, min_score=0.1) == 4
+    assert repo.get_by_id(ids[0])["related_ids"] == [ids[1]]
+    assert repo.link_related(k=1, min_score=0.1) == 0
+    with pytest.raises(KeyError):
+        repo.similar("missing")
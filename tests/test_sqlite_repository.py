@@ -0,0 +1,139 @@
+import json
+
+import pytest
+
+from data.prompt_repository import open_repository
+from data.sqlite_repository import SqlitePromptRepository, migrate_json_to_sqlite
+from data.tag_normalizer import TagNormalizer
+
+
+@pytest.fixture(autouse=True)
+def _no_env(monkeypatch):
+    monkeypatch.delenv("PROMPT_DB_PATH", raising=False)
+    monkeypatch.delenv("PROMPT_DB_BACKEND", raising=False)
+
+
+def test_crud_search_and_facets(tmp_path):
+    tn = TagNormalizer(alias_map={"ai": ["KI"]})
+    repo = SqlitePromptRepository(str(tmp_path / "p.sqlite"), normalizer=tn)
+    a = repo.add({"title": "Summarize", "content": "Fasse zusammen", "category": "Analyse", "tags": ["KI", "text"]})
+    repo.add({"title": "Code", "content": "Write python", "category": "Dev", "tags": ["python"]})
+    assert repo.count() == 2
+    assert repo.get(0)["id"] == a["id"]
+    assert [it["title"] for it in repo.search("zusammen")] == ["Summarize"]
+    assert [it["title"] for it in repo.search(tags=["ki"])] == ["Summarize"]
+    assert [it["title"] for it in repo.search(category="dev")] == ["Code"]
+    assert repo.all_tags() == ["ai", "python", "text"]
+    assert repo.all_categories() == ["Analyse", "Dev"]
+    assert repo.ids_with_tags(["ki", "python"], match_all=False) == {a["id"], repo.get(1)["id"]}
+    assert repo.ids_with_tags(["ki", "python"]) == set()
+    assert repo.tag_counts() == {"ai": 1, "python": 1, "text": 1}
+
+    repo.update(a["id"], {"title": "Summary"})
+    assert repo.get_by_id(a["id"])["title"] == "Summary"
+    repo.delete(0)
+    assert [it["title"] for it in repo.all()] == ["Code"]
+    assert repo.search(tags=["ai"]) == []
+    repo.close()
+
+
+def test_migration_is_lossless(tmp_path):
+    src = tmp_path / "prompts.json"
+    items = [
+        {"id": "x1", "title": "A", "content": "a", "tags": ["Raw Tag"], "extra": {"k": [1, 2]}},
+        {"title": "B", "content": "b", "related_ids": ["x1"]},
+    ]
+    src.write_text(json.dumps({"items": items}), encoding="utf-8")
+    dst = tmp_path / "prompts.sqlite"
+    assert migrate_json_to_sqlite(str(src), str(dst), normalizer=TagNormalizer(alias_map={})) == 2
+
+    repo = open_repository(str(dst), normalizer=TagNormalizer(alias_map={}))
+    assert isinstance(repo, SqlitePromptRepository)
+    out = repo.all()
+    assert out[0] == items[0]
+    assert {k: v for k, v in out[1].items() if k != "id"} == items[1]
+    assert repo.search(tags=["raw tag"])[0]["id"] == "x1"
+    repo.close()
+
+
+def test_add_many_skips_duplicate_signatures(tmp_path):
+    repo = SqlitePromptRepository(str(tmp_path / "p.sqlite"), normalizer=TagNormalizer(alias_map={}))
+    repo.add({"title": "A", "content": "alpha"})
+    stored = repo.add_many([{"title": "a", "content": "ALPHA"}, {"title": "B", "content": "beta"}], skip_duplicates=True)
+    assert [it["title"] for it in stored] == ["B"]
+    assert repo.is_duplicate({"title": "B", "content": "beta"})
+    repo.close()
+
+
+@pytest.mark.parametrize("backend,name", [("json", "p.json"), ("sqlite", "p.sqlite")])
+def test_projected_listing_and_keyset_pages(tmp_path, backend, name):
+    repo = open_repository(str(tmp_path / name), backend=backend, normalizer=TagNormalizer(alias_map={}))
+    repo.add_many([{"title": f"T{i % 4}", "content": "long " * 50, "tags": ["x"]} for i in range(10)])
+    repo.add({"title": "", "content": "untitled"})
+
+    rows = repo.list_items(fields=["title", "tags"], offset=1, limit=2)
+    assert [sorted(r) for r in rows] == [["id", "tags", "title"]] * 2
+    assert [r["title"] for r in rows] == ["T1", "T2"]
+    titles = [r["title"] for r in repo.list_items(fields=["title"], order_by="title")]
+    assert titles == ["T0"] * 3 + ["T1"] * 3 + ["T2"] * 2 + ["T3"] * 2 + [""]  # empty sorts last
+    assert [r["title"] for r in repo.list_items(fields=["title"], order_by="-title", limit=2)] == ["", "T3"]  # exact reverse
+    assert repo.match_ids("UNTITLED") == {repo.get(10)["id"]}
+    # JSON keeps the full items cached: listing them for display must not copy them
+    assert repo.items_resident == (backend == "json")
+    assert (repo.list_items()[0] is repo.get(0)) == repo.items_resident
+
+    for order_by in (None, "title", "-title"):
+        seen, cursor, first = [], None, True
+        while True:
+            page, cursor = repo.page(fields=["title"], limit=3, order_by=order_by, cursor=cursor)
+            seen += [r["id"] for r in page]
+            if first:  # changes between pages neither repeat nor skip the remaining items
+                repo.delete(page[-1]["id"])
+                first = False
+            if cursor is None:
+                break
+        assert len(seen) == len(set(seen)) == 11
+        repo.add({"title": "T1", "content": "refill"})
+    with pytest.raises(ValueError):
+        repo.page(order_by="title", cursor=repo.page(limit=1)[1])
+
+
+@pytest.mark.parametrize("backend,name", [("json", "p.json"), ("sqlite", "p.sqlite")])
+def test_reload_aliases_retags_only_affected_items(tmp_path, backend, name):
+    repo = open_repository(str(tmp_path / name), backend=backend, normalizer=TagNormalizer(alias_map={"ai": ["KI"]}))
+    repo.add_many([
+        {"id": "a", "title": "A", "content": "a", "tags": ["ML", "KI"]},
+        {"id": "b", "title": "B", "content": "b", "tags": ["machine learning"]},
+        {"id": "c", "title": "C", "content": "c", "tags": ["python"]},
+    ])
+    assert repo.ids_with_tags(["ml"]) == {"a"}
+    n = repo.reload_aliases(TagNormalizer(alias_map={"ai": ["KI"], "ml": ["machine learning"]}))
+    assert n == 1
+    assert repo.get_by_id("b")["tags"] == ["ml"] and repo.get_by_id("a")["tags"] == ["ml", "ai"]
+    assert repo.ids_with_tags(["machine learning"]) == {"a", "b"}
+    assert repo.tag_counts()["ml"] == 2 and repo.ids_with_tags(["python"]) == {"c"}
+    repo.close()
+
+
+@pytest.mark.parametrize("backend,name", [("json", "p.json"), ("sqlite", "p.sqlite")])
+def test_failed_reload_aliases_keeps_old_map(tmp_path, monkeypatch, backend, name):
+    old = TagNormalizer(alias_map={"ai": ["KI"]})
+    repo = open_repository(str(tmp_path / name), backend=backend, normalizer=old)
+    repo.add_many([
+        {"id": "a", "title": "A", "content": "a", "tags": ["ML"]},
+        {"id": "b", "title": "B", "content": "b", "tags": ["machine learning"]},
+    ])
+    counts = repo.tag_counts()
+    new = TagNormalizer(alias_map={"ai": ["KI"], "ml": ["machine learning"]})
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(repo, "update_many", fail)
+        with pytest.raises(OSError):
+            repo.reload_aliases(new)
+    assert repo.normalizer is old
+    assert repo.tag_counts() == counts and repo.ids_with_tags(["machine learning"]) == {"b"}
+    assert repo.reload_aliases(new) == 1 and repo.ids_with_tags(["machine learning"]) == {"a", "b"}
+    repo.close()
@@ -19,3 +19,25 @@ def test_deduplicate_and_order_preservation():
     tags = ["AI","NLP","Artificial Intelligence","natural language processing","ai"]
     normalized, _ = tn.normalize_list(tags)
     assert normalized == ["ai","nlp"]
+
+
+def test_normalize_many_matches_normalize_list():
+    tn = TagNormalizer(alias_map={"ai": ["KI"]})
+    lists = [["KI", "AI", "Data Science"], [], ["data-science", "ki"]]
+    assert tn.normalize_many(lists) == [tn.normalize_list(t)[0] for t in lists]
+    assert tn.canonicalize("KI") == "ai" and tn.canonicalize.cache_info().hits >= 1
+
+
+def test_shared_normalizer_follows_alias_file(tmp_path):
+    import json, os
+    from data.tag_normalizer import get_normalizer
+
+    path = tmp_path / "aliases.json"
+    path.write_text(json.dumps({"ai": ["KI"]}), encoding="utf-8")
+    tn = get_normalizer(str(path))
+    assert get_normalizer(str(path)) is tn and tn.canonicalize("KI") == "ai"
+    path.write_text(json.dumps({"ml": ["KI", "machine learning"]}), encoding="utf-8")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert get_normalizer(str(path)) is not tn
+    assert get_normalizer(str(path)).canonicalize("KI") == "ml"
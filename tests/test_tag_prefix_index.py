@@ -0,0 +1,34 @@
+import time
+
+from data.prompt_repository import PromptRepository
+from data.tag_normalizer import TagNormalizer
+from data.tag_prefix_index import TagPrefixIndex
+
+
+def test_suggest_ranks_by_usage_and_resolves_aliases():
+    tn = TagNormalizer(alias_map={"ai": ["KI", "Künstliche Intelligenz"]})
+    index = TagPrefixIndex({"ai": 5, "api": 9, "agent": 1, "kotlin": 2}, tn.aliases(), tn.normalize_tag)
+    assert index.suggest("a") == ["api", "ai", "agent"]
+    assert index.suggest("A", k=1) == ["api"]
+    assert index.suggest("kü") == ["ai"]             # alias -> canonical tag
+    assert index.suggest("k") == ["ai", "kotlin"]    # "ki" alias and "kotlin", by count
+    assert index.suggest("x") == []
+    assert index.suggest("") == ["api", "ai", "kotlin", "agent"]
+
+
+def test_index_from_repository(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROMPT_DB_PATH", raising=False)
+    repo = PromptRepository(str(tmp_path / "p.json"), normalizer=TagNormalizer(alias_map={"ml": ["machine learning"]}))
+    repo.add_many([{"title": "A", "content": "a", "tags": ["ML", "python"]}, {"title": "B", "content": "b", "tags": ["ml"]}])
+    index = TagPrefixIndex.for_repository(repo)
+    assert index.suggest("mach") == ["ml"] and index.count("ml") == 2
+
+
+def test_suggest_is_fast_on_many_tags():
+    counts = {f"tag{i:05d}": i % 97 for i in range(50_000)}
+    index = TagPrefixIndex(counts)
+    index.suggest("tag")  # memoized wide range
+    start = time.perf_counter()
+    for p in ("tag", "tag1", "tag12", "tag123", "tag4"):
+        index.suggest(p)
+    assert (time.perf_counter() - start) / 5 < 0.05
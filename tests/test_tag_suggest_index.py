@@ -0,0 +1,48 @@
+import pytest
+
+from data.prompt_repository import open_repository
+from data.tag_normalizer import TagNormalizer
+from data.tag_suggest_index import TagSuggestIndex
+
+ITEMS = [
+    {"id": "1", "title": "SQL query tuning", "content": "explain the index usage of this query", "tags": ["sql", "performance"]},
+    {"id": "2", "title": "Slow query", "content": "why is this query slow", "tags": ["sql", "performance"]},
+    {"id": "3", "title": "Poem", "content": "write a poem about autumn", "tags": ["creative"]},
+    {"id": "4", "title": "Story", "content": "write a short story", "tags": ["creative", "writing"]},
+    {"id": "5", "title": "Schema", "content": "design a table schema", "tags": ["sql"]},
+]
+
+
+def test_suggest_from_tokens_and_cooccurrence():
+    index = TagSuggestIndex.build(ITEMS, str.lower)
+    assert index.suggest("optimize this slow query")[0][0] in ("sql", "performance")
+    assert index.suggest("write a poem")[0][0] == "creative"
+    assert [t for t, _ in index.suggest("", tags=["SQL"])] == ["performance"]
+    assert "sql" not in [t for t, _ in index.suggest("query", tags=["sql"])]
+    assert index.related("sql")[0][0] == "performance" and index.cooccurrence("sql", "performance") == 2
+
+
+def test_incremental_updates_match_rebuild():
+    index = TagSuggestIndex.build(ITEMS, str.lower)
+    index.add("2", {"title": "Haiku", "content": "write a haiku", "tags": ["creative"]})
+    index.remove("5")
+    index.remove("missing")
+    rebuilt = TagSuggestIndex.build(
+        [ITEMS[0], {"id": "2", "title": "Haiku", "content": "write a haiku", "tags": ["creative"]}] + ITEMS[2:4],
+        str.lower,
+    )
+    assert index.suggest("write a query") == rebuilt.suggest("write a query")
+    assert index.related("creative") == rebuilt.related("creative")
+    assert index.tag_count("sql") == 1 and index._pairs == rebuilt._pairs and index._tok_tags == rebuilt._tok_tags
+
+
+@pytest.mark.parametrize("backend,name", [("json", "p.json"), ("sqlite", "p.sqlite")])
+def test_repository_suggestions(tmp_path, monkeypatch, backend, name):
+    monkeypatch.delenv("PROMPT_DB_PATH", raising=False)
+    repo = open_repository(str(tmp_path / name), backend=backend, normalizer=TagNormalizer(alias_map={}))
+    repo.add_many([{k: v for k, v in it.items() if k != "id"} for it in ITEMS])
+    assert repo.suggest_tags("write a story")[0][0] == "creative"
+    assert repo.related_tags("SQL")[0] == ("performance", round(2 / (3 * 2) ** 0.5, 4))
+    repo.add({"title": "Ballad", "content": "write a ballad", "tags": ["creative", "music"]})
+    assert "music" in [t for t, _ in repo.related_tags("creative")]
+    repo.close()
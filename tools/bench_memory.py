@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+# ensure repo root on sys.path when executed as module or file
+import sys
+from pathlib import Path
+_THIS = Path(__file__).resolve()
+_REPO_ROOT = _THIS.parents[1]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+import argparse, gc, json, random, tempfile, tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+from models.prompt_record import PromptRecord  # type: ignore
+from data.prompt_repository import open_repository  # type: ignore
+from data.tag_normalizer import TagNormalizer  # type: ignore
+
+TABLE_FIELDS = ["id", "title", "category", "tags", "updated_at"]  # = ui.prompt_table_model.COLUMNS
+CATEGORIES = ["Entwicklung", "Analyse", "Dokumentation", "Kreativ", "Sonstiges"]
+TAGS = [f"tag{i:03d}" for i in range(300)]
+
+
+def synthetic_rows(n: int, seed: int = 1) -> List[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(n):
+        rows.append({
+            "id": f"{i:08x}-{rnd.getrandbits(64):016x}",
+            "title": f"Prompt {i} " + " ".join(rnd.choice(TAGS) for _ in range(3)),
+            "description": "",
+            "category": rnd.choice(CATEGORIES),
+            "tags": rnd.sample(TAGS, rnd.randint(1, 6)),
+            "version": "v1.0",
+            "content": f"Content of prompt {i}. " * rnd.randint(2, 20),
+            "sample_output": "",
+            "related_ids": [],
+            "created_at": "2025-01-01T00:00:00",
+            "updated_at": f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T12:00:00",
+        })
+    return rows
+
+
+def measure(build: Callable[[], Any]) -> int:
+    """Bytes still allocated by build()'s result (strings from JSON decoding included)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        obj = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del obj
+    return size
+
+
+def run(rows: List[Dict[str, Any]], fields: Optional[List[str]]) -> Dict[str, Any]:
+    if fields is not None:
+        rows = [{"id": r.get("id"), **{f: r[f] for f in fields if f in r}} for r in rows]
+    # decode from JSON like the repository does, so every row owns its own strings
+    payload = json.dumps(rows, ensure_ascii=False)
+    dicts = measure(lambda: json.loads(payload))
+    records = measure(lambda: [PromptRecord.from_dict(r) for r in json.loads(payload)])
+    return {
+        "rows": len(rows),
+        "fields": fields or "all",
+        "dict_bytes": dicts,
+        "record_bytes": records,
+        "dict_per_row": round(dicts / max(1, len(rows)), 1),
+        "record_per_row": round(records / max(1, len(rows)), 1),
+        "saved_pct": round(100.0 * (dicts - records) / max(1, dicts), 1),
+    }
+
+
+def gui_footprint(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Repository plus table rows, loaded like MainWindow.refresh() does, per engine.
+
+    The JSON engine keeps every full item in its cache, so the table has to be measured
+    together with it: records built next to the cached dicts are additional copies.
+    """
+    layouts = [
+        # (label, backend, fields, records); "(GUI)" = MainWindow._table_fields() and the table model
+        ("json: cache + row refs (GUI)", "json", None, False),
+        ("json: cache + projected records", "json", TABLE_FIELDS, True),
+        ("sqlite: projected records (GUI)", "sqlite", TABLE_FIELDS, True),
+        ("sqlite: full dicts", "sqlite", None, False),
+    ]
+    normalizer = TagNormalizer(alias_map={})
+    out = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"json": str(Path(tmp) / "prompts.json"), "sqlite": str(Path(tmp) / "prompts.sqlite")}
+        for backend, path in paths.items():
+            repo = open_repository(path, backend=backend, normalizer=normalizer)
+            repo.add_many(rows)
+            repo.close()
+        for label, backend, fields, records in layouts:
+            def build():
+                repo = open_repository(paths[backend], backend=backend, normalizer=normalizer)
+                table = repo.list_items(fields=fields)
+                if records:
+                    table = [PromptRecord.from_dict(r) for r in table]
+                return repo, table
+            size = measure(build)
+            out.append({"layout": label, "bytes": size, "per_row": round(size / max(1, len(rows)), 1)})
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Memory of prompt rows as plain dicts vs. compact PromptRecords (tracemalloc). "
+                                             "Without --gui only the table rows are measured, as if nothing else held them.")
+    ap.add_argument("-n", "--rows", type=int, default=100_000, help="synthetic rows (ignored with --db)")
+    ap.add_argument("--db", help="measure the rows of this DB instead of synthetic ones")
+    ap.add_argument("--full", action="store_true", help="all fields instead of the GUI table columns")
+    ap.add_argument("--gui", action="store_true", help="repository cache + table rows per engine (what the GUI holds)")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    if args.db:
+        rows = open_repository(args.db).all()
+    else:
+        rows = synthetic_rows(args.rows)
+    if args.gui:
+        res = gui_footprint(rows)
+        if args.json:
+            print(json.dumps(res, ensure_ascii=False))
+        else:
+            print(f"{len(rows)} rows, repository + table rows")
+            for r in res:
+                print(f"  {r['layout']:34s} {r['bytes'] / 1e6:8.1f} MB  ({r['per_row']} B/row)")
+        return 0
+    res = run(rows, None if args.full else TABLE_FIELDS)
+    if args.json:
+        print(json.dumps(res, ensure_ascii=False))
+    else:
+        print(f"{res['rows']} rows ({'all fields' if args.full else 'table columns'})")
+        print(f"  dicts:   {res['dict_bytes'] / 1e6:8.1f} MB  ({res['dict_per_row']} B/row)")
+        print(f"  records: {res['record_bytes'] / 1e6:8.1f} MB  ({res['record_per_row']} B/row)")
+        print(f"  saved:   {res['saved_pct']} %")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
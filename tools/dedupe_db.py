@@ -1,10 +1,21 @@
 # tools/dedupe_db.py
 from __future__ import annotations
 
-import argparse, json, hashlib, re, shutil, sys
+import argparse, hashlib, os, re, sys
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
-from datetime import datetime, UTC  # timezone-aware
+
+# ensure repo root on sys.path when executed as file
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from utils.minhash import (  # type: ignore
+    near_duplicate_clusters, estimate_jaccard, shingles, signature, DEFAULT_NUM_PERM, DEFAULT_SHINGLE,
+)
+from data.prompt_repository import PromptRepository  # type: ignore
+from data.journal_repository import JournalPromptRepository  # type: ignore
+from data.backup_store import store_for  # type: ignore
 
 
 def repo_root() -> Path:
@@ -16,24 +27,16 @@ def db_path_from_root(root: Path) -> Path:
     return root / "data" / "prompts.json"
 
 
-def load_items(path: Path) -> List[Dict[str, Any]]:
+def open_db(path: Path) -> PromptRepository:
+    """Repository over the DB; the journal engine while <db>.journal still holds ops, so
+    those are seen and the result is compacted into the snapshot again."""
     if not path.exists():
         raise FileNotFoundError(f"DB not found: {path}")
-    with path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    if isinstance(data, dict) and "items" in data and isinstance(data["items"], list):
-        return data["items"]
-    if isinstance(data, list):
-        return data
-    raise ValueError("Unsupported DB format; expected dict with 'items' list or a list")
-
-
-def write_items(path: Path, items: List[Dict[str, Any]]) -> None:
-    payload = {"items": items}
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-    tmp.replace(path)
+    try:
+        journal = os.path.getsize(str(path) + ".journal") > 0
+    except OSError:
+        journal = False
+    return JournalPromptRepository(str(path)) if journal else PromptRepository(str(path))
 
 
 _ws_re = re.compile(r"\s+")
@@ -63,27 +66,82 @@ def summarize_dupes(items: List[Dict[str, Any]], mode: str):
     return groups
 
 
-def backup_file(path: Path) -> Path:
-    bdir = path.parent.parent / "backups"
-    bdir.mkdir(parents=True, exist_ok=True)
-    stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%SZ")
-    bpath = bdir / f"prompts_{stamp}.json"
-    shutil.copy2(path, bpath)
-    return bpath
+def summarize_near_dupes(items: List[Dict[str, Any]], threshold: float, num_perm: int, shingle_size: int,
+                         policy: str = "first"):
+    """Near-duplicate groups via MinHash/LSH over content (title if content is empty).
+
+    LSH clusters are chained (A~B and B~C puts C next to A), so every cluster is split
+    around its keeper: a group only holds records similar to the record it keeps.
+    """
+    texts = [str(it.get("content") or it.get("title") or "") for it in items]
+    clusters = near_duplicate_clusters(texts, threshold=threshold, num_perm=num_perm, shingle_size=shingle_size)
+    groups: List[List[int]] = []
+    for idxs in clusters:
+        sigs = {i: signature(shingles(texts[i], shingle_size), num_perm) for i in idxs}
+        groups.extend(split_around_keeper(items, idxs, policy, sigs, threshold))
+    return {(f"near#{n}", content_hash(items[idxs[0]])): idxs for n, idxs in enumerate(groups, start=1)}
+
+
+def split_around_keeper(items: List[Dict[str, Any]], idxs: List[int], policy: str,
+                        sigs: Dict[int, Tuple[int, ...]], threshold: float) -> List[List[int]]:
+    """Split a cluster into groups (size >= 2) of a keeper and the members whose estimated
+    Jaccard to that keeper reaches `threshold`; the rest is split again."""
+    groups: List[List[int]] = []
+    rest = list(idxs)
+    while len(rest) > 1:
+        keep = pick_keeper(items, rest, policy)
+        group = [i for i in rest if i == keep or estimate_jaccard(sigs[keep], sigs[i]) >= threshold]
+        if len(group) > 1:
+            groups.append(group)
+        taken = set(group)
+        rest = [i for i in rest if i not in taken]
+    return groups
+
+
+def pick_keeper(items: List[Dict[str, Any]], idxs: List[int], policy: str) -> int:
+    if policy == "last":
+        return idxs[-1]
+    if policy == "longest":
+        # longest content wins; earliest on ties
+        return max(idxs, key=lambda i: (len(str(items[i].get("content") or "")), -i))
+    return idxs[0]
+
+
+def backup_file(path: Path) -> str:
+    # content-addressed store next to the old backups/ folder; unchanged DBs are stored once.
+    # Its objects are gzip deltas, so report the point (hash, time, restore call), not a file
+    store = store_for(path)
+    entry = store.backup(path, label="dedupe_db")
+    return store.describe(entry)
 
 
 def main() -> int:
     ap = argparse.ArgumentParser(description="Detect and optionally remove duplicate records in prompts DB.")
-    ap.add_argument("--mode", choices=["title+content", "content"], default="title+content", help="Key for duplicate detection")
-    ap.add_argument("--keep", choices=["first", "last"], default="first", help="Which record to keep per duplicate group")
+    ap.add_argument("--mode", choices=["title+content", "content", "near"], default="title+content",
+                    help="Key for duplicate detection (near = MinHash/LSH similarity of content)")
+    ap.add_argument("--keep", choices=["first", "last", "longest"], default="first", help="Which record to keep per duplicate group")
+    ap.add_argument("--threshold", type=float, default=0.8, help="--mode near: min. estimated Jaccard similarity")
+    ap.add_argument("--num-perm", type=int, default=DEFAULT_NUM_PERM, help="--mode near: MinHash signature length")
+    ap.add_argument("--shingle-size", type=int, default=DEFAULT_SHINGLE, help="--mode near: words per shingle")
     ap.add_argument("--apply", action="store_true", help="Write de-duplicated DB in place (creates backup)")
     ap.add_argument("--limit-print", type=int, default=20, help="Max groups to print in summary")
     args = ap.parse_args()
 
-    root = repo_root()
-    db = db_path_from_root(root)
-    items = load_items(db)
-    groups = summarize_dupes(items, "content" if args.mode=="content" else "title+content")
+    db = db_path_from_root(repo_root())
+    # all reads/writes through the repository: its lock, journal, stamp and change feed
+    repo = open_db(db)
+    try:
+        return run(args, db, repo)
+    finally:
+        repo.close()
+
+
+def run(args: argparse.Namespace, db: Path, repo: PromptRepository) -> int:
+    items = repo.all()
+    if args.mode == "near":
+        groups = summarize_near_dupes(items, args.threshold, args.num_perm, args.shingle_size, args.keep)
+    else:
+        groups = summarize_dupes(items, "content" if args.mode=="content" else "title+content")
 
     total_dupes = sum(len(v)-1 for v in groups.values())
     total_groups = len(groups)
@@ -94,7 +152,7 @@ def main() -> int:
     print()
     shown = 0
     for (title_key, chash), idxs in list(groups.items())[: args.limit_print]:
-        keep_idx = idxs[0] if args.keep=="first" else idxs[-1]
+        keep_idx = pick_keeper(items, idxs, args.keep)
         titles = [ (items[i].get('title') or '').strip() for i in idxs ]
         print(f"- key=({title_key[:40]}…, {chash})  idxs={idxs}  keep={keep_idx}  titles={titles}")
         shown += 1
@@ -106,27 +164,29 @@ def main() -> int:
         return 0
 
     # Apply: build new list preserving order but dropping duplicates per policy
-    to_keep = set()
-    for (title_key, chash), idxs in groups.items():
-        keep_idx = idxs[0] if args.keep=="first" else idxs[-1]
-        to_keep.add(keep_idx)
-    new_items: List[Dict[str, Any]] = []
-    seen_keys: set[Tuple[str,str]] = set()
-    for i, it in enumerate(items):
-        k = make_key(it, "content" if args.mode=="content" else "title+content")
-        if k in seen_keys:
-            continue
-        if i in to_keep or k not in groups:
-            new_items.append(it)
-            seen_keys.add(k)
-
-    if len(new_items) == len(items):
+    drop: set[int] = set()
+    for idxs in groups.values():
+        keep_idx = pick_keeper(items, idxs, args.keep)
+        drop.update(i for i in idxs if i != keep_idx)
+    # deleted by id, so a concurrent writer cannot shift them; records sharing their id with a
+    # kept one (copied by hand) cannot be told apart by the repository and stay
+    kept_ids = {str(it.get("id")) for i, it in enumerate(items) if i not in drop}
+    ids = list(dict.fromkeys(str(items[i].get("id")) for i in sorted(drop)))
+    shared = [i for i in ids if i in kept_ids]
+    ids = [i for i in ids if i not in kept_ids]
+    if shared:
+        print(f"Skipping {len(shared)} duplicates that share their id with a kept record.")
+
+    if not ids:
         print("No changes to apply.")
         return 0
 
-    bpath = backup_file(db)
-    write_items(db, new_items)
-    print(f"Applied. New items: {len(new_items)} (was {len(items)}). Backup: {bpath}")
+    if isinstance(repo, JournalPromptRepository):
+        repo.compact()  # the backup must contain the journaled ops too
+    backup = backup_file(db)
+    with repo.transaction():  # one commit (and one change event) for all deletes
+        removed = repo.delete_many(ids)
+    print(f"Applied. New items: {len(items) - len(removed)} (was {len(items)}). Backup: {backup}")
     return 0
 
 
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+# ensure repo root on sys.path when executed as module or file
+import sys
+from pathlib import Path
+_THIS = Path(__file__).resolve()
+_REPO_ROOT = _THIS.parents[1]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+import argparse, json
+from data.prompt_repository import open_repository, BACKENDS  # type: ignore
+
+def _shorten(s: str, n: int) -> str:
+    s = str(s or "")
+    return s if len(s) <= n else s[: max(0, n - 1)] + "…"
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Find prompts similar to a prompt or a text (local TF-IDF, no network).")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--id", help="prompt id (or index) to compare against")
+    src.add_argument("--text", help="free text to compare against")
+    src.add_argument("--link", action="store_true", help="fill related_ids of all prompts with their top-k matches")
+    ap.add_argument("-k", "--top", type=int, default=10)
+    ap.add_argument("--min-score", type=float, default=0.0, help="ignore matches below this cosine similarity (--link default: 0.2)")
+    ap.add_argument("--backend", choices=BACKENDS, default=None)
+    ap.add_argument("--json", action="store_true")
+    ap.add_argument("--truncate", type=int, default=80)
+    args = ap.parse_args()
+
+    repo = open_repository(backend=args.backend)
+    try:
+        if args.link:
+            updated = repo.link_related(k=args.top, min_score=args.min_score or 0.2)
+            print(json.dumps({"updated": updated, "total": repo.count()}, ensure_ascii=False))
+            return 0
+        if args.id is not None:
+            key = int(args.id) if args.id.lstrip("-").isdigit() else args.id
+            try:
+                hits = repo.similar(key, k=args.top)
+            except (KeyError, IndexError):
+                print(f"Prompt nicht gefunden: {args.id}", file=sys.stderr)
+                return 1
+        else:
+            hits = repo.similar_to_text(args.text, k=args.top)
+    finally:
+        repo.close()
+
+    hits = [(it, score) for it, score in hits if score >= args.min_score]
+    if args.json:
+        print(json.dumps([{"id": it.get("id"), "title": it.get("title", ""), "score": round(score, 4)}
+                          for it, score in hits], ensure_ascii=False, indent=2))
+        return 0
+    for it, score in hits:
+        print(f"{score:.3f}  {it.get('id', '')}  {_shorten(it.get('title', ''), args.truncate)}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
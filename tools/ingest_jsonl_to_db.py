@@ -15,7 +15,8 @@ import argparse
 import json
 from typing import Dict, List, Optional, Any
 
-from data.prompt_repository import PromptRepository
+from data.prompt_repository import open_repository, BACKENDS, DEFAULT_BATCH_SIZE
+from utils.hash_utils import prompt_signature
 from ingestion.article_ingestor import map_extraction_to_prompts, SourceMeta
 
 
@@ -178,6 +179,12 @@ def build_argparser() -> argparse.ArgumentParser:
                     help="Extension to additional tags, e.g. \".md=article,notes;.html=article,pattern\"")
     ap.add_argument("--map-overwrite", action="store_true",
                     help="Overwrite category/tags from data with mapped values (default: False = only fill if empty)")
+    ap.add_argument("--allow-duplicates", action="store_true",
+                    help="Store records even if a prompt with the same title+content already exists")
+    ap.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                    help=f"Records persisted per DB write (default: {DEFAULT_BATCH_SIZE})")
+    ap.add_argument("--backend", choices=BACKENDS, default=None,
+                    help="Storage engine (default: $PROMPT_DB_BACKEND or derived from the DB path)")
     return ap
 
 
@@ -192,7 +199,7 @@ def main(argv: Optional[List[str]] = None) -> int:
         return 2
 
     defaults = [t.strip() for t in (args.default_tags or "").replace(";", ",").split(",") if t.strip()]
-    repo = PromptRepository()
+    repo = open_repository(backend=args.backend)
 
     cat_map = _parse_simple_map(args.ext_category_map)
     tag_map = _parse_tag_map(args.ext_tag_map)
@@ -202,8 +209,25 @@ def main(argv: Optional[List[str]] = None) -> int:
     errors = 0
     skipped = 0
     skipped_short = 0
+    duplicates = 0
+    seen_sigs: set = set()  # signatures of this run (not yet flushed)
     applied_cat = 0
     applied_tags = 0
+    pending: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        # one unit of work per batch: a failed batch is rolled back as a whole, earlier ones stay
+        nonlocal errors, saved
+        if not pending:
+            return
+        try:
+            with repo.transaction():
+                repo.add_many(pending)
+        except Exception as e:
+            print(f"[ingest_jsonl_to_db] ERROR writing batch of {len(pending)}: {e}", file=sys.stderr)
+            errors += 1
+            saved -= len(pending)
+        pending.clear()
 
     for fp in files:
         rows = _read_jsonl(fp)
@@ -254,18 +278,33 @@ def main(argv: Optional[List[str]] = None) -> int:
                         continue
                     filtered.append(rec)
 
+                # Reject duplicates (title+content signature) in O(1) via the repository index
+                if not args.allow_duplicates:
+                    unique = []
+                    for rec in filtered:
+                        sig = prompt_signature(rec.get("title", ""), rec.get("content", ""))
+                        if sig in seen_sigs or repo.has_signature(sig):
+                            duplicates += 1
+                            continue
+                        seen_sigs.add(sig)
+                        unique.append(rec)
+                    filtered = unique
+
                 if not filtered:
                     continue
 
                 if not args.dry_run:
-                    for rec in filtered:
-                        repo.add(rec)
+                    pending.extend(filtered)
+                    if len(pending) >= args.batch_size:
+                        flush()
                 saved += len(filtered)
 
             except Exception as e:
                 print(f"[ingest_jsonl_to_db] ERROR {fp.name}: {e}", file=sys.stderr)
                 errors += 1
 
+    flush()
+    repo.close()
     summary = {
         "ok": errors == 0,
         "files": len(files),
@@ -273,11 +312,14 @@ def main(argv: Optional[List[str]] = None) -> int:
         "saved_prompts": saved,
         "skipped": skipped,
         "skipped_short": skipped_short,
+        "duplicates": duplicates,
         "errors": errors,
         "min_content_len": args.min_content_len,
         "applied_category_mappings": applied_cat,
         "applied_tag_mappings": applied_tags,
     }
+    if hasattr(repo, "lock_stats"):  # JSON/journal engines; SQLite does its own locking
+        summary["lock"] = repo.lock_stats()
     import json as _json
     sys.stdout.write(_json.dumps(summary, ensure_ascii=False))
     return 0 if errors == 0 else 1
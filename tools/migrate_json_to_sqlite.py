@@ -0,0 +1,51 @@
+# tools/migrate_json_to_sqlite.py
+# Copy the JSON prompts DB into a SQLite DB. Usage:
+#   python -m tools.migrate_json_to_sqlite --src data/prompts.json --dst data/prompts.sqlite
+from __future__ import annotations
+
+# Ensure repo root on sys.path when executed directly
+import sys
+from pathlib import Path
+
+_THIS = Path(__file__).resolve()
+_REPO_ROOT = _THIS.parents[1]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+import argparse, json, os
+from typing import List, Optional
+
+from data.sqlite_repository import migrate_json_to_sqlite
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Migrate the JSON prompts DB ({'items': [...]}) into SQLite.")
+    ap.add_argument("--src", default=str(_REPO_ROOT / "data" / "prompts.json"), help="JSON DB (default: data/prompts.json)")
+    ap.add_argument("--dst", default=str(_REPO_ROOT / "data" / "prompts.sqlite"), help="SQLite DB (default: data/prompts.sqlite)")
+    ap.add_argument("--overwrite", action="store_true", help="Replace an existing target DB")
+    args = ap.parse_args(argv)
+
+    src, dst = Path(args.src).expanduser().resolve(), Path(args.dst).expanduser().resolve()
+    if not src.exists():
+        print(f"[migrate_json_to_sqlite] Source not found: {src}", file=sys.stderr)
+        return 2
+    if dst.exists():
+        if not args.overwrite:
+            print(f"[migrate_json_to_sqlite] Target exists (use --overwrite): {dst}", file=sys.stderr)
+            return 2
+        for suffix in ("", "-wal", "-shm"):
+            Path(str(dst) + suffix).unlink(missing_ok=True)
+
+    # explicit paths win over PROMPT_DB_PATH for this tool
+    os.environ.pop("PROMPT_DB_PATH", None)
+    try:
+        count = migrate_json_to_sqlite(str(src), str(dst))
+    except Exception as e:
+        print(f"[migrate_json_to_sqlite] ERROR: {e}", file=sys.stderr)
+        return 1
+    sys.stdout.write(json.dumps({"ok": True, "src": str(src), "dst": str(dst), "migrated": count}, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
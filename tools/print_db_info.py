@@ -1,11 +1,11 @@
 
 # Print DB info (path, exists, count). Usage: python -m tools.print_db_info
 from __future__ import annotations
-from data.prompt_repository import PromptRepository
+from data.prompt_repository import open_repository
 from pathlib import Path
 
 def main():
-    repo = PromptRepository()
+    repo = open_repository()
     p = Path(repo.db_path)
     print(f"DB path: {repo.db_path}")
     print(f"Exists: {p.exists()}  Size: {p.stat().st_size if p.exists() else 0} bytes")
@@ -10,7 +10,7 @@ if str(_REPO_ROOT) not in sys.path:
 
 import argparse, json
 from typing import List, Any
-from data.prompt_repository import PromptRepository  # type: ignore
+from data.prompt_repository import open_repository  # type: ignore
 
 def _shorten(s: str, n: int) -> str:
     if s is None: return ""
@@ -30,7 +30,7 @@ def main() -> int:
     ap.add_argument("--json", action="store_true")
     args = ap.parse_args()
 
-    repo = PromptRepository()
+    repo = open_repository()
     items = repo.all()
     if args.limit and args.limit > 0:
         items = items[-args.limit:]
@@ -16,10 +16,11 @@ Startet den HTML→Prompts→DB Workflow schrittweise in Unterprozessen:
 3) Qualitäts-Cleanup der JSONL-Zeilen (HTML-Attribute/Tags/Whitespace säubern):
    python -m tools.clean_jsonl_prompts --in <out.jsonl> --out <out.clean.jsonl>
 
-4) Ingest in die TinyDB:
+4) Ingest in die DB (Duplikate – gleicher Titel+Content – verwirft der Ingest selbst
+   über den Signatur-Index des Repositories):
    python -m tools.ingest_jsonl_to_db --path <out.clean.jsonl>
 
-5) Dedupe:
+5) Dedupe (gleicher Content bei abweichendem Titel; das erkennt der Signatur-Index nicht):
    python -m tools.dedupe_db --mode content --apply
 """
 
@@ -270,7 +271,7 @@ class IngestRunner(QObject):  # pragma: no cover
         # Ingest in DB
         cmds.append(_wrap_cmd(["python", "-m", "tools.ingest_jsonl_to_db", "--path", str(ingest_path)]))
 
-        # Dedupe
+        # Dedupe: gleicher Content unter anderem Titel (Titel+Content-Duplikate hat der Ingest schon verworfen)
         cmds.append(_wrap_cmd(["python", "-m", "tools.dedupe_db", "--mode", "content", "--apply"]))
 
         return cmds
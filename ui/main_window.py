@@ -2,7 +2,8 @@
 
 import sys                    
 import json                   
-from typing import Optional, List
+import html
+from typing import Optional, List, Set, Dict
 from pathlib import Path
 
 from PySide6.QtWidgets import (
@@ -10,14 +11,19 @@ from PySide6.QtWidgets import (
     QTextEdit, QSplitter, QToolBar, QFileDialog, QMessageBox, QPushButton,
     QDockWidget, QComboBox, QToolButton, QMenu, QCheckBox, QScrollArea, QProgressDialog
 )
-from PySide6.QtCore import Qt, QSortFilterProxyModel, QModelIndex, QSize, QPoint, QProcess
+from PySide6.QtCore import Qt, QSortFilterProxyModel, QModelIndex, QSize, QPoint, QProcess, QTimer, QFileSystemWatcher
 from PySide6.QtGui import QIcon, QAction, QKeySequence
 
-from data.prompt_repository import PromptRepository
+from data.prompt_repository import open_repository, project_item
+from data.tag_normalizer import alias_file_path
+from data.tag_prefix_index import TagPrefixIndex
 from services.export_service import export_csv, export_markdown, export_json, export_yaml
-from ui.prompt_table_model import PromptTableModel
+from models.prompt_record import as_dict
+from ui.prompt_table_model import PromptTableModel, COLUMNS as TABLE_FIELDS
 from ui.prompt_editor import PromptEditor
+from ui.tag_completer import TagCompleter
 from ui.import_dialog import ImportDialog
+from ui.similar_dialog import SimilarPromptsDialog
 from theme_manager import apply_theme, available_themes, load_saved_theme
 from services import prefs
 
@@ -38,6 +44,10 @@ except Exception:
 from utils.flow_layout import FlowLayout
 
 ICON_DIR = Path("assets/icons")
+FUZZY_LIMIT = 100  # max. Treffer der unscharfen Suche
+SIMILAR_TOP_K = 15
+RELATED_TAGS_K = 8
+FEED_POLL_MS = 1000  # Intervall für Änderungen anderer Prozesse (Ingest, Tools)
 def icon(name: str) -> QIcon:
     p = ICON_DIR / f"{name}.svg"
     return QIcon(str(p)) if p.exists() else QIcon()
@@ -48,16 +58,21 @@ class PromptFilterProxyModel(QSortFilterProxyModel):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.text = ""
+        self.text_ids: Optional[Set[str]] = None  # Treffer aus dem Volltext-Index (None = selbst prüfen)
         self.tags: List[str] = []
+        self.tag_ids: Optional[Set[str]] = None  # Treffer aus dem Facetten-Index (None = selbst prüfen)
         self.category = ""
         self.tag_logic_or = False  # False=UND (default), True=ODER
+        self.rank: Optional[Dict[str, int]] = None  # id -> Relevanz-Platz (None = Spaltensortierung)
 
-    def set_text(self, text: str):
+    def set_text(self, text: str, ids: Optional[Set[str]] = None):
         self.text = (text or "").strip().lower()
+        self.text_ids = ids
         self.invalidateFilter()
 
-    def set_tags(self, tags: List[str]):
+    def set_tags(self, tags: List[str], ids: Optional[Set[str]] = None):
         self.tags = [t.strip().lower() for t in (tags or []) if t.strip()]
+        self.tag_ids = ids
         self.invalidateFilter()
 
     def set_category(self, category: str):
@@ -68,6 +83,20 @@ class PromptFilterProxyModel(QSortFilterProxyModel):
         self.tag_logic_or = bool(is_or)
         self.invalidateFilter()
 
+    def set_rank(self, rank: Optional[Dict[str, int]]):
+        self.rank = rank
+        self.invalidate()
+
+    def lessThan(self, left, right):
+        if self.rank is None:
+            return super().lessThan(left, right)
+        model = self.sourceModel()
+        a, b = model.row_at(left.row()), model.row_at(right.row())
+        last = len(self.rank)
+        ra = self.rank.get(str((a or {}).get('id', '')), last)
+        rb = self.rank.get(str((b or {}).get('id', '')), last)
+        return (ra, left.row()) < (rb, right.row())
+
     def filterAcceptsRow(self, source_row, source_parent):
         model = self.sourceModel()
         row = model.row_at(source_row)
@@ -75,15 +104,22 @@ class PromptFilterProxyModel(QSortFilterProxyModel):
             return True
 
         if self.text:
-            blob = f"{row.get('title','')}\n{row.get('content','')}\n{row.get('description','')}\n{row.get('category','')}".lower()
-            if self.text not in blob:
-                return False
+            if self.text_ids is not None:
+                if str(row.get('id', '')) not in self.text_ids:
+                    return False
+            else:
+                blob = f"{row.get('title','')}\n{row.get('content','')}\n{row.get('description','')}\n{row.get('category','')}".lower()
+                if self.text not in blob:
+                    return False
 
         if self.category:
             if (row.get('category') or '').strip().lower() != self.category:
                 return False
 
-        if self.tags:
+        if self.tags and self.tag_ids is not None:
+            if str(row.get('id', '')) not in self.tag_ids:
+                return False
+        elif self.tags:
             row_tags = [t.lower() for t in (row.get('tags') or [])]
             if self.tag_logic_or:
                 if not any(t in row_tags for t in self.tags):
@@ -103,7 +139,7 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Prompt-Datenbank (Qt)")
         self.resize(1360, 900)
 
-        self.repo = PromptRepository()
+        self.repo = open_repository()
 
         #Ignest aufrufe
         self._ingest_proc: QProcess | None = None
@@ -180,8 +216,15 @@ class MainWindow(QMainWindow):
         search_row = QHBoxLayout()
         self.search_edit = QLineEdit()
         self.search_edit.setPlaceholderText("Volltextsuche (Titel, Beschreibung, Content, Kategorie)")
+        self.cb_fuzzy = QCheckBox("Unscharf")
+        self.cb_fuzzy.setToolTip("Tippfehler-tolerante Suche (Trigramm-Ähnlichkeit), beste Treffer zuerst")
+        self.cb_fuzzy.setEnabled(callable(getattr(self.repo, "fuzzy_search", None)))
+        self._fuzzy_hits: List[dict] = []
         self.tags_edit = QLineEdit()
         self.tags_edit.setPlaceholderText("Tags (kommagetrennt)")
+        # Autovervollständigung über Präfix-Index (Tags + Aliase, nach Häufigkeit)
+        self._tag_index: Optional[TagPrefixIndex] = None
+        self.tags_completer = TagCompleter(self.tags_edit)
 
         self.category_combo = QComboBox()
         self.category_combo.addItem("")
@@ -195,6 +238,7 @@ class MainWindow(QMainWindow):
 
         search_row.addWidget(QLabel("Suche:"))
         search_row.addWidget(self.search_edit, 2)
+        search_row.addWidget(self.cb_fuzzy)
         search_row.addSpacing(8)
         search_row.addWidget(QLabel("Kategorie:"))
         search_row.addWidget(self.category_combo, 1)
@@ -203,18 +247,32 @@ class MainWindow(QMainWindow):
         search_row.addWidget(self.tags_edit, 1)
         search_row.addSpacing(12)
         search_row.addWidget(self.btn_tag_logic)
+        search_row.addSpacing(8)
+        self.sort_combo = QComboBox()
+        self.sort_combo.addItems(["Tabelle", "Relevanz"])
+        self.sort_combo.setToolTip("Relevanz: Treffer der Volltextsuche nach BM25 sortieren")
+        search_row.addWidget(QLabel("Sortierung:"))
+        search_row.addWidget(self.sort_combo)
 
         # Tag-Chips (Dark-Theme gut lesbar)
         chips_container = QWidget()
         self.chips_layout = FlowLayout(chips_container, spacing=6)
+        self._chip_tags: List[str] = []
         self._build_tag_chips()
         chips_scroll = QScrollArea()
         chips_scroll.setWidgetResizable(True)
         chips_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         chips_scroll.setWidget(chips_container)
 
+        # Verwandte Tags zur aktuellen Tag-Auswahl (Co-Occurrence); Klick ergänzt den Tag-Filter
+        self.related_lbl = QLabel("")
+        self.related_lbl.setTextFormat(Qt.RichText)
+        self.related_lbl.setWordWrap(True)
+        self.related_lbl.linkActivated.connect(self._add_filter_tag)
+
         # Tabelle & Detail-Panel
-        self.model = PromptTableModel(self.repo.all())
+        # Zeilen kommen in refresh(); Records nur für eigene (projizierte) Zeilen, siehe _table_fields
+        self.model = PromptTableModel(compact=not self.repo.items_resident)
         self.proxy = PromptFilterProxyModel(self)
         self.proxy.setSourceModel(self.model)
 
@@ -250,6 +308,7 @@ class MainWindow(QMainWindow):
         left_layout.addLayout(search_row)
         left_layout.addWidget(QLabel("Tags (Chips):"))
         left_layout.addWidget(chips_scroll)
+        left_layout.addWidget(self.related_lbl)
         left_layout.addWidget(self.table)
         splitter.addWidget(split_left)
         splitter.addWidget(self.detail)
@@ -287,8 +346,10 @@ class MainWindow(QMainWindow):
 
         # Signals
         self.search_edit.textChanged.connect(self.on_search_changed)
+        self.cb_fuzzy.toggled.connect(lambda _: self.on_search_changed(self.search_edit.text()))
         self.tags_edit.textChanged.connect(self.on_tags_changed)
         self.category_combo.currentTextChanged.connect(self.on_category_changed)
+        self.sort_combo.currentTextChanged.connect(lambda _: self._apply_rank())
         self.table.selectionModel().currentRowChanged.connect(self.on_row_selected)
         btn_new.clicked.connect(self.on_new)
         btn_edit.clicked.connect(self.on_edit)
@@ -310,6 +371,21 @@ class MainWindow(QMainWindow):
         # Preferences laden
         self._load_prefs()
 
+        # Änderungen (eigene und die anderer Prozesse, z. B. Ingest) als Deltas übernehmen
+        subscribe = getattr(self.repo, "subscribe", None)
+        self._unsubscribe = subscribe(self._on_repo_changed) if callable(subscribe) else None
+        self._feed_timer: QTimer | None = None
+        if self._unsubscribe is not None:
+            self._feed_timer = QTimer(self)
+            self._feed_timer.setInterval(FEED_POLL_MS)
+            self._feed_timer.timeout.connect(self._poll_repo_changes)
+            self._feed_timer.start()
+
+        # Tag-Aliase: Änderungen an der Alias-Datei ohne Neustart übernehmen
+        self._alias_watcher = QFileSystemWatcher(self)
+        self._watch_alias_file()
+        self._alias_watcher.fileChanged.connect(self._on_aliases_changed)
+
         self.refresh()
 
     
@@ -356,19 +432,114 @@ class MainWindow(QMainWindow):
         name = self.theme_combo.currentText() or "light"
         apply_theme(self.app, name)
 
+    def _table_fields(self):
+        """SQLite: nur die Tabellenspalten laden, Content & Co. erst bei Auswahl (current_row_data).
+        JSON/Journal halten alle Einträge im Cache: Zeilen verweisen darauf, Projektionen wären Kopien."""
+        return None if self.repo.items_resident else TABLE_FIELDS
+
     def refresh(self):
-        rows = self.repo.all()
+        rows = self.repo.list_items(fields=self._table_fields())
         self.model.set_rows(rows)
-        self._rebuild_chips_if_needed()
+        self._refilter()
         self.statusBar().showMessage(f"{len(rows)} Einträge geladen.")
+
+    def _refilter(self, tags_changed: bool = True):
+        self.on_search_changed(self.search_edit.text())  # Index-Treffer neu bestimmen
+        if tags_changed:  # Chips, Zähler und Tag-Vervollständigung nur bei Tag-Änderungen
+            self._rebuild_chips_if_needed()
+        self._apply_tag_filter()
         self._update_details(self.current_row_data())
 
+    # --- Change-Events ---
+    def _on_repo_changed(self, event):
+        """Commit des Repositories (eigener oder fremder Prozess): Tabelle per Delta nachführen."""
+        if event.reset:
+            self._reload_categories()
+            self.refresh()
+            return
+
+        fields = self._table_fields()
+
+        def rows(ids):
+            out = []
+            for i in ids:
+                try:
+                    out.append(project_item(self.repo.get_by_id(i), fields))
+                except KeyError:
+                    pass  # inzwischen wieder gelöscht
+            return out
+
+        added, updated = rows(event.added), rows(event.updated)
+        tags_changed = self._touches_tags(event, added, updated)  # vor apply_changes: alte Zeilen
+        self.model.apply_changes(added, updated, event.deleted)
+        if event.added or event.updated:
+            self._reload_categories()
+        self._refilter(tags_changed)
+        self.statusBar().showMessage(
+            f"{self.model.rowCount()} Einträge (+{len(event.added)} ~{len(event.updated)} -{len(event.deleted)})."
+        )
+
+    def _touches_tags(self, event, added, updated) -> bool:
+        """Ändert das Event Tags (getaggte Einträge neu/gelöscht, Tag-Liste geändert)?"""
+        before = self.model.rows_by_id(list(event.updated) + list(event.deleted))
+
+        def tags(row):
+            return list((row or {}).get("tags") or [])
+
+        return (
+            any(tags(r) for r in added)
+            or any(tags(before.get(str(i))) for i in event.deleted)
+            or any(tags(r) != tags(before.get(str(r.get("id")))) for r in updated)
+        )
+
+    def _watch_alias_file(self):
+        path = alias_file_path()
+        if Path(path).exists() and path not in self._alias_watcher.files():
+            self._alias_watcher.addPath(path)
+
+    def _on_aliases_changed(self, _path):
+        """Alias-Datei geändert: nur betroffene Einträge neu taggen (Delta kommt über die Change-Events)."""
+        self._watch_alias_file()  # Editoren ersetzen die Datei oft (neuer Inode, Watch geht verloren)
+        check = getattr(self.repo, "check_aliases", None)
+        if not callable(check):
+            return
+        try:
+            n = check()
+        except Exception as e:
+            self.statusBar().showMessage(f"Tag-Aliase konnten nicht geladen werden: {e}", 4000)
+            return
+        if n:
+            self._after_local_change()
+        self._rebuild_chips_if_needed()
+        self.statusBar().showMessage(f"Tag-Aliase neu geladen ({n} Einträge angepasst).", 4000)
+
+    def _poll_repo_changes(self):
+        try:
+            self.repo.poll_changes()
+        except Exception as e:
+            self.statusBar().showMessage(f"Änderungen konnten nicht gelesen werden: {e}", 4000)
+
+    def _after_local_change(self):
+        """Nach eigener Änderung; mit Change-Events hat _on_repo_changed das Delta schon übernommen."""
+        if self._unsubscribe is None:
+            self._reload_categories()
+            self.refresh()
+
     def current_row_data(self):
         index: QModelIndex = self.table.currentIndex()
         if not index.isValid():
             return None
         src_index = self.proxy.mapToSource(index)
-        return self.model.row_at(src_index.row())
+        return self._full_row(self.model.row_at(src_index.row()))
+
+    def _full_row(self, row):
+        """Tabellenzeilen sind ggf. projiziert (_table_fields); vollständigen Datensatz nachladen."""
+        if not row:
+            return row
+        try:
+            return self.repo.get_by_id(str(row.get("id", "")))
+        except KeyError:
+            return as_dict(row)
 
     def _render_html(self, row):
         if _render_details is None:
@@ -409,14 +580,22 @@ class MainWindow(QMainWindow):
                     tags.append(t)
         return tags
 
-    def _build_tag_chips(self):
+    def _build_tag_chips(self, tags: Optional[List[str]] = None, counts: Optional[Dict[str, int]] = None):
+        selected = set(self._selected_tags_from_chips())
         while self.chips_layout.count():
             self.chips_layout.takeAt(0)
-        tags = sorted(self.repo.all_tags(), key=lambda s: s.lower())
+        if tags is None:
+            tags = sorted(self.repo.all_tags(), key=lambda s: s.lower())
+        self._chip_tags = tags
+        if counts is None:
+            counts = self.repo.tag_counts()  # aus den Tag-Bitmaps, kein Scan pro Chip
+        canon = self.repo.normalizer.canonicalize
         for t in tags:
-            b = QPushButton(t)
+            n = counts.get(canon(t), 0)
+            b = QPushButton(f"{t} ({n})" if n else t)
             b.tag_value = t
             b.setCheckable(True)
+            b.setChecked(t in selected)
             b.setStyleSheet("""
                 QPushButton {
                     border: 1px solid #4b5563;
@@ -436,7 +615,27 @@ class MainWindow(QMainWindow):
             self.chips_layout.addWidget(b)
 
     def _rebuild_chips_if_needed(self):
-        self._build_tag_chips()
+        """Chips nur neu aufbauen, wenn sich die Tag-Menge geändert hat; sonst nur Zähler aktualisieren."""
+        counts = self.repo.tag_counts()
+        self._rebuild_tag_index(counts)
+        tags = sorted(self.repo.all_tags(), key=lambda s: s.lower())
+        if tags != self._chip_tags:
+            self._build_tag_chips(tags, counts)
+            return
+        canon = self.repo.normalizer.canonicalize
+        for i in range(self.chips_layout.count()):
+            w = self.chips_layout.itemAt(i).widget()
+            t = getattr(w, "tag_value", None)
+            if t:
+                n = counts.get(canon(t), 0)
+                w.setText(f"{t} ({n})" if n else t)
+
+    def _rebuild_tag_index(self, counts: Optional[Dict[str, int]] = None):
+        try:
+            self._tag_index = TagPrefixIndex.for_repository(self.repo, counts)
+        except Exception:
+            self._tag_index = None  # ohne Vervollständigung weiterarbeiten
+        self.tags_completer.set_index(self._tag_index)
 
     def _filtered_rows(self):
         rows = []
@@ -446,7 +645,7 @@ class MainWindow(QMainWindow):
             src_index = proxy.mapToSource(proxy.index(r, 0))
             row = model.row_at(src_index.row())
             if row:
-                rows.append(row)
+                rows.append(self._full_row(row))
         return rows
 
     # --- Tag logic toggle ---
@@ -455,6 +654,39 @@ class MainWindow(QMainWindow):
         self.proxy.set_tag_logic_or(is_or)
         self.btn_tag_logic.setText("Logik: ODER" if is_or else "Logik: UND")
         self.btn_tag_logic.setToolTip("Klicken, um auf UND umzuschalten" if is_or else "Klicken, um auf ODER umzuschalten")
+        self._apply_tag_filter()
+
+    def _apply_tag_filter(self):
+        """Chip- und Texteingabe-Tags kombinieren; Trefferliste per Bitmap-Schnitt/-Vereinigung."""
+        text_tags = [t.strip() for t in self.tags_edit.text().split(",") if t.strip()]
+        chip_tags = self._selected_tags_from_chips()
+        combined = list(dict.fromkeys(chip_tags + text_tags))
+        ids_with_tags = getattr(self.repo, "ids_with_tags", None)
+        ids = None
+        if combined and callable(ids_with_tags):
+            ids = ids_with_tags(combined, match_all=not self.btn_tag_logic.isChecked())
+        self.proxy.set_tags(combined, ids)
+        self._update_related_tags(combined)
+
+    def _update_related_tags(self, tags):
+        related_tags = getattr(self.repo, "related_tags", None)
+        if not tags or not callable(related_tags):
+            self.related_lbl.setText("")
+            return
+        chosen = {self.repo.normalizer.canonicalize(t) for t in tags}
+        scores: Dict[str, float] = {}
+        for t in tags:
+            for u, s in related_tags(t, k=RELATED_TAGS_K):
+                if u not in chosen:
+                    scores[u] = scores.get(u, 0.0) + s
+        top = sorted(scores, key=lambda u: (-scores[u], u))[:RELATED_TAGS_K]
+        links = ", ".join(f'<a href="{html.escape(u)}">{html.escape(u)}</a>' for u in top)
+        self.related_lbl.setText(f"Verwandte Tags: {links}" if top else "")
+
+    def _add_filter_tag(self, tag):
+        text_tags = [t.strip() for t in self.tags_edit.text().split(",") if t.strip()]
+        if tag not in text_tags:
+            self.tags_edit.setText(", ".join(text_tags + [tag]))
 
     # --- signals ---
     def on_row_selected(self, current, prev):
@@ -462,22 +694,38 @@ class MainWindow(QMainWindow):
         self._update_details(row)
 
     def on_search_changed(self, text):
-        self.proxy.set_text(text)
+        if self.cb_fuzzy.isChecked() and text.strip():
+            self._fuzzy_hits = self.repo.fuzzy_search(text, limit=FUZZY_LIMIT)
+            self.proxy.set_text(text, {str(it.get("id", "")) for it in self._fuzzy_hits})
+            self._apply_rank()
+            return
+        self._fuzzy_hits = []
+        match_ids = getattr(self.repo, "match_ids", None)
+        ids = match_ids(text, ("title", "content", "description", "category")) if callable(match_ids) else None
+        self.proxy.set_text(text, ids)
+        self._apply_rank()
+
+    def _apply_rank(self):
+        """Im Modus "Relevanz" die Tabelle nach BM25-Rang der Suchtreffer ordnen."""
+        text = self.search_edit.text().strip()
+        if self.sort_combo.currentText() != "Relevanz" or not text:
+            if self.proxy.rank is not None:
+                self.proxy.set_rank(None)
+                header = self.table.horizontalHeader()
+                self.proxy.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+            return
+        ranked = self._fuzzy_hits if self.cb_fuzzy.isChecked() else self.repo.search(text, rank=True)
+        self.proxy.set_rank({str(it.get("id", "")): i for i, it in enumerate(ranked)})
+        self.proxy.sort(0, Qt.AscendingOrder)
 
     def on_tags_changed(self, text):
-        tags = [t.strip() for t in text.split(",")] if text else []
-        chip_tags = self._selected_tags_from_chips()
-        combined = list(dict.fromkeys(chip_tags + tags))
-        self.proxy.set_tags(combined)
+        self._apply_tag_filter()
 
     def on_category_changed(self, text):
         self.proxy.set_category(text)
 
     def on_chip_changed(self):
-        text_tags = [t.strip() for t in self.tags_edit.text().split(",") if t.strip()]
-        chip_tags = self._selected_tags_from_chips()
-        combined = list(dict.fromkeys(chip_tags + text_tags))
-        self.proxy.set_tags(combined)
+        self._apply_tag_filter()
 
     def on_reset_filters(self):
         self.search_edit.clear()
@@ -492,26 +740,28 @@ class MainWindow(QMainWindow):
         self.proxy.set_tags([])
 
     # CRUD
+    def _suggest_fn(self):
+        fn = getattr(self.repo, "suggest_tags", None)
+        return fn if callable(fn) else None
+
     def on_new(self):
-        dlg = PromptEditor(self)
+        dlg = PromptEditor(self, tag_index=self._tag_index, suggest_tags=self._suggest_fn())
         if dlg.exec():
             data = dlg.get_result()
             if data.get("title") and data.get("content"):
                 self.repo.add(data)
-                self._reload_categories()
-                self.refresh()
+                self._after_local_change()
 
     def on_edit(self):
         row = self.current_row_data()
         if not row:
             QMessageBox.information(self, "Bearbeiten", "Bitte Eintrag auswählen.")
             return
-        dlg = PromptEditor(self, data=row)
+        dlg = PromptEditor(self, data=row, tag_index=self._tag_index, suggest_tags=self._suggest_fn())
         if dlg.exec():
             data = dlg.get_result()
             self.repo.update(row["id"], data)
-            self._reload_categories()
-            self.refresh()
+            self._after_local_change()
 
     def on_duplicate(self):
         row = self.current_row_data()
@@ -521,12 +771,11 @@ class MainWindow(QMainWindow):
         data = dict(row)
         data.pop("id", None)
         data["title"] = f"{row.get('title','')} (Kopie)".strip()
-        dlg = PromptEditor(self, data=data)
+        dlg = PromptEditor(self, data=data, tag_index=self._tag_index, suggest_tags=self._suggest_fn())
         if dlg.exec():
             new_data = dlg.get_result()
             self.repo.add(new_data)
-            self._reload_categories()
-            self.refresh()
+            self._after_local_change()
 
     def on_delete(self):
         row = self.current_row_data()
@@ -537,14 +786,12 @@ class MainWindow(QMainWindow):
         confirm = MB.question(self, "Löschen", f"Eintrag '{row.get('title','')}' wirklich löschen?")
         if confirm == MB.Yes:
             self.repo.delete(row["id"])
-            self._reload_categories()
-            self.refresh()
+            self._after_local_change()
 
     def on_import(self):
         dlg = ImportDialog(self.repo, self)
         if dlg.exec():
-            self._reload_categories()
-            self.refresh()
+            self._after_local_change()
 
     def _reload_categories(self):
         current = self.category_combo.currentText()
@@ -569,11 +816,13 @@ class MainWindow(QMainWindow):
         act_copy_title = QAction("Titel kopieren", self)
         act_copy_tags = QAction("Tags kopieren", self)
         act_dup = QAction("Duplizieren …", self)
+        act_similar = QAction("Ähnliche Prompts …", self)
         menu.addAction(act_copy_prompt)
         menu.addAction(act_copy_title)
         menu.addAction(act_copy_tags)
         menu.addSeparator()
         menu.addAction(act_dup)
+        menu.addAction(act_similar)
 
         def _copy(text: str):
             if not text:
@@ -585,8 +834,32 @@ class MainWindow(QMainWindow):
         act_copy_title.triggered.connect(lambda: _copy(row.get("title", "") if row else ""))
         act_copy_tags.triggered.connect(lambda: _copy(", ".join(row.get("tags", []) if row else [])))
         act_dup.triggered.connect(self.on_duplicate)
+        act_similar.triggered.connect(lambda: self.on_similar(row))
         menu.exec(self.table.viewport().mapToGlobal(point))
 
+    def on_similar(self, row):
+        if not row or not row.get("id"):
+            return
+        try:
+            hits = self.repo.similar(row["id"], k=SIMILAR_TOP_K)
+        except Exception as e:
+            QMessageBox.warning(self, "Ähnliche Prompts", f"Suche fehlgeschlagen:\n{e}")
+            return
+        dlg = SimilarPromptsDialog(row, hits, self)
+        dlg.prompt_chosen.connect(self._select_by_id)
+        dlg.exec()
+
+    def _select_by_id(self, prompt_id: str):
+        """Zeile mit dieser id in der (gefilterten) Tabelle auswählen."""
+        for r in range(self.proxy.rowCount()):
+            idx = self.proxy.index(r, 0)
+            row = self.model.row_at(self.proxy.mapToSource(idx).row())
+            if row and str(row.get("id", "")) == prompt_id:
+                self.table.selectRow(r)
+                self.table.scrollTo(idx)
+                return
+        self.statusBar().showMessage("Eintrag ist durch die aktuellen Filter ausgeblendet.", 4000)
+
     # --- Export helpers ---
     def _rows_for_export(self):
         if self.cb_export_filtered.isChecked():
@@ -714,6 +987,7 @@ class MainWindow(QMainWindow):
                 dlg.setLabelText((dlg.labelText() or "") + "\n" + raw)
                 continue
 
+            if "progress" in obj and "total" in obj:
                 i, n = int(obj["progress"]), int(obj["total"])
                 if dlg.maximum() != n:
                     dlg.setMaximum(n)
@@ -731,9 +1005,8 @@ class MainWindow(QMainWindow):
                 if ids:
                     lines.append(f"→ IDs : {', '.join(map(str, ids))}")
                 dlg.setLabelText("\n".join(lines))
-                return
-
-                #continue
+                # weiterlesen: die Pool-Engine schreibt die Zeilen eines Batches auf einmal
+                continue
 
             if "summary" in obj:
                 s = obj["summary"]
@@ -768,10 +1041,13 @@ class MainWindow(QMainWindow):
             self._ingest_progress.setValue(1)
         # Prozess freigeben
         self._ingest_proc = None
-        # Nach erfolgreichem Ingest: Tabelle neu laden
+        # Nach dem Ingest: Änderungen des Subprozesses sofort übernehmen (ohne Change-Feed: neu laden)
         try:
-            self._reload_categories()
-            self.refresh()
+            if self._unsubscribe is not None:
+                self._poll_repo_changes()
+            else:
+                self._reload_categories()
+                self.refresh()
         except Exception:
             pass
 
@@ -779,4 +1055,9 @@ class MainWindow(QMainWindow):
     # Persist preferences on close
     def closeEvent(self, event):
         self._save_prefs()
+        if self._feed_timer is not None:
+            self._feed_timer.stop()
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+        self.repo.close()
         super().closeEvent(event)
@@ -3,12 +3,17 @@ from typing import Optional, Dict, Any, List
 
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTextEdit,
-    QComboBox, QDialogButtonBox
+    QComboBox, QDialogButtonBox, QPushButton
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
+
+from ui.tag_completer import TagCompleter
+
+SUGGEST_K = 6
+SUGGEST_DELAY_MS = 300  # erst nach einer Tipp-Pause neu vorschlagen
 
 class PromptEditor(QDialog):
-    def __init__(self, parent=None, data: Optional[Dict[str, Any]] = None):
+    def __init__(self, parent=None, data: Optional[Dict[str, Any]] = None, tag_index=None, suggest_tags=None):
         super().__init__(parent)
         self.setWindowTitle("Prompt bearbeiten")
         self.resize(700, 540)
@@ -31,6 +36,19 @@ class PromptEditor(QDialog):
         self.tags_edit = QLineEdit(", ".join(self.data.get("tags", []) or []))
         root.addWidget(QLabel("Tags (Komma-getrennt)"))
         root.addWidget(self.tags_edit)
+        self.tags_completer = TagCompleter(self.tags_edit, tag_index)
+
+        # Tag-Vorschläge aus den vorhandenen Prompts (suggest_tags(text, tags, k), ohne LLM)
+        self._suggest_tags = suggest_tags
+        self.suggest_row = QHBoxLayout()
+        self.suggest_row.addWidget(QLabel("Vorschläge:"))
+        self.suggest_row.addStretch(1)
+        if suggest_tags is not None:
+            root.addLayout(self.suggest_row)
+        self._suggest_timer = QTimer(self)
+        self._suggest_timer.setSingleShot(True)
+        self._suggest_timer.setInterval(SUGGEST_DELAY_MS)
+        self._suggest_timer.timeout.connect(self.update_suggestions)
 
         # Beschreibung
         self.desc_edit = QTextEdit(self.data.get("description",""))
@@ -69,8 +87,38 @@ class PromptEditor(QDialog):
         self.content_edit.textChanged.connect(self.validate)
         self.tags_edit.textChanged.connect(self.validate)
 
+        if suggest_tags is not None:
+            for sig in (self.title_edit.textChanged, self.desc_edit.textChanged,
+                        self.content_edit.textChanged, self.tags_edit.textChanged):
+                sig.connect(self._suggest_timer.start)
+            self.update_suggestions()
+
         self.validate()
 
+    def update_suggestions(self):
+        if self._suggest_tags is None:
+            return
+        # alte Buttons entfernen (Label vorne und Stretch hinten bleiben)
+        while self.suggest_row.count() > 2:
+            w = self.suggest_row.takeAt(1).widget()
+            if w is not None:
+                w.deleteLater()
+        text = "\n".join([self.title_edit.text(), self.desc_edit.toPlainText(), self.content_edit.toPlainText()])
+        try:
+            hits = self._suggest_tags(text, self._parse_tags(self.tags_edit.text()), SUGGEST_K)
+        except Exception:
+            hits = []  # Vorschläge sind optional
+        for i, (tag, _score) in enumerate(hits):
+            b = QPushButton(f"+ {tag}")
+            b.setFlat(True)
+            b.clicked.connect(lambda _=False, t=tag: self._add_tag(t))
+            self.suggest_row.insertWidget(1 + i, b)
+
+    def _add_tag(self, tag: str):
+        tags = self._parse_tags(self.tags_edit.text())
+        if tag.lower() not in {t.lower() for t in tags}:
+            self.tags_edit.setText(", ".join(tags + [tag]))
+
     def _parse_tags(self, text: str) -> List[str]:
         # Erlaubt Komma oder Semikolon als Trenner
         parts = [p.strip() for p in text.replace(";",",").split(",")]
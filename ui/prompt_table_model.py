@@ -1,6 +1,7 @@
 from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex
 from PySide6.QtGui import QIcon
 from pathlib import Path
+from models.prompt_record import as_record
 
 COLUMNS = ["id", "title", "category", "tags", "updated_at"]
 CAT_ICON_DIR = Path("assets/icons/categories")
@@ -18,16 +19,72 @@ def category_icon_path(cat: str) -> Path | None:
     p = CAT_ICON_DIR / fname
     return p if p.exists() else None
 
+def display_text(row, key: str) -> str:
+    val = row.get(key, "")
+    if key == "tags" and isinstance(val, (list, tuple)):
+        return ", ".join(val)
+    return str(val) if val is not None else ""
+
 class PromptTableModel(QAbstractTableModel):
-    def __init__(self, rows=None, parent=None):
+    def __init__(self, rows=None, parent=None, compact: bool = True):
         super().__init__(parent)
-        self._rows = rows or []
+        # compact: eigene Zeilen als PromptRecords (__slots__, internierte Tags/Kategorien);
+        # sonst Verweise auf die dicts des Repository-Caches (Records wären dort nur Kopien)
+        self.compact = compact
+        self._rows = [self._convert(r) for r in rows or []]
+        # spaltenweise vorformatierte Anzeigetexte: data() ist nur noch ein Index-Zugriff
+        self._display = self._columns(self._rows)
+        self._icons = {}
+
+    def _convert(self, row):
+        return as_record(row) if self.compact else row
+
+    @staticmethod
+    def _columns(rows):
+        return [[display_text(r, key) for r in rows] for key in COLUMNS]
 
     def set_rows(self, rows):
         self.beginResetModel()
-        self._rows = rows
+        self._rows = [self._convert(r) for r in rows]
+        self._display = self._columns(self._rows)
         self.endResetModel()
 
+    def apply_changes(self, added=(), updated=(), deleted_ids=()):
+        """Zeilen gezielt entfernen/aktualisieren/anhängen (kein Modell-Reset)."""
+        pos = {str(r.get("id", "")): i for i, r in enumerate(self._rows)}
+        gone = sorted((pos[str(d)] for d in deleted_ids if str(d) in pos), reverse=True)
+        # zusammenhängende Bereiche von hinten entfernen, damit die Indizes davor gültig bleiben
+        k = 0
+        while k < len(gone):
+            last = first = gone[k]
+            k += 1
+            while k < len(gone) and gone[k] == first - 1:
+                first = gone[k]
+                k += 1
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._rows[first:last + 1]
+            for col in self._display:
+                del col[first:last + 1]
+            self.endRemoveRows()
+        if deleted_ids:
+            pos = {str(r.get("id", "")): i for i, r in enumerate(self._rows)}
+        for row in updated:
+            i = pos.get(str(row.get("id", "")))
+            if i is None:
+                continue
+            self._rows[i] = rec = self._convert(row)
+            for key, col in zip(COLUMNS, self._display):
+                col[i] = display_text(rec, key)
+            self.dataChanged.emit(self.index(i, 0), self.index(i, len(COLUMNS) - 1))
+        if added:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            recs = [self._convert(r) for r in added]
+            self._rows.extend(recs)
+            for key, col in zip(COLUMNS, self._display):
+                col.extend(display_text(r, key) for r in recs)
+            self.endInsertRows()
+
     def rowCount(self, parent=QModelIndex()):
         return 0 if parent.isValid() else len(self._rows)
 
@@ -37,19 +94,15 @@ class PromptTableModel(QAbstractTableModel):
     def data(self, index, role=Qt.DisplayRole):
         if not index.isValid():
             return None
-        row = self._rows[index.row()]
-        key = COLUMNS[index.column()]
-
         if role in (Qt.DisplayRole, Qt.EditRole):
-            val = row.get(key, "")
-            if key == "tags" and isinstance(val, (list, tuple)):
-                return ", ".join(val)
-            return str(val) if val is not None else ""
+            return self._display[index.column()][index.row()]
 
-        if role == Qt.DecorationRole and key == "category":
-            p = category_icon_path(row.get("category",""))
-            if p:
-                return QIcon(str(p))
+        if role == Qt.DecorationRole and COLUMNS[index.column()] == "category":
+            cat = self._display[index.column()][index.row()]
+            if cat not in self._icons:
+                p = category_icon_path(cat)
+                self._icons[cat] = QIcon(str(p)) if p else None
+            return self._icons[cat]
 
         return None
 
@@ -61,5 +114,12 @@ class PromptTableModel(QAbstractTableModel):
             return headers.get(COLUMNS[section], COLUMNS[section])
         return str(section + 1)
 
+    def rows_by_id(self, ids):
+        """Aktuelle Zeilen zu den ids (fehlende ids fehlen im Ergebnis)."""
+        want = {str(i) for i in ids}
+        if not want:
+            return {}
+        return {str(r.get("id", "")): r for r in self._rows if str(r.get("id", "")) in want}
+
     def row_at(self, row_idx: int):
         return self._rows[row_idx] if 0 <= row_idx < len(self._rows) else None
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem, QAbstractItemView
+)
+
+
+class SimilarPromptsDialog(QDialog):
+    """Zeigt die ähnlichsten Prompts (TF-IDF, lokal); Doppelklick springt zum Eintrag."""
+    prompt_chosen = Signal(str)
+
+    def __init__(self, source: Dict, hits: List[Tuple[Dict, float]], parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Ähnliche Prompts")
+        self.resize(720, 420)
+        self._ids: List[str] = []
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"Ähnlich zu: {source.get('title', '')}", self))
+
+        self.table = QTableWidget(0, 3, self)
+        self.table.setHorizontalHeaderLabels(["Ähnlichkeit", "Titel", "Kategorie"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setColumnWidth(0, 90)
+        self.table.setColumnWidth(1, 420)
+        for item, score in hits:
+            r = self.table.rowCount()
+            self.table.insertRow(r)
+            self.table.setItem(r, 0, QTableWidgetItem(f"{score:.2f}"))
+            self.table.setItem(r, 1, QTableWidgetItem(str(item.get("title", ""))))
+            self.table.setItem(r, 2, QTableWidgetItem(str(item.get("category", ""))))
+            self._ids.append(str(item.get("id", "")))
+        layout.addWidget(self.table)
+        if not hits:
+            layout.addWidget(QLabel("Keine ähnlichen Prompts gefunden.", self))
+
+        buttons = QHBoxLayout()
+        buttons.addStretch(1)
+        self.btn_open = QPushButton("Anzeigen", self)
+        btn_close = QPushButton("Schließen", self)
+        buttons.addWidget(self.btn_open)
+        buttons.addWidget(btn_close)
+        layout.addLayout(buttons)
+
+        self.table.cellDoubleClicked.connect(lambda row, _col: self._choose(row))
+        self.btn_open.clicked.connect(lambda: self._choose(self.table.currentRow()))
+        btn_close.clicked.connect(self.reject)
+
+    def _choose(self, row: int) -> None:
+        if 0 <= row < len(self._ids):
+            self.prompt_chosen.emit(self._ids[row])
+            self.accept()
+
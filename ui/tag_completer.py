@@ -0,0 +1,46 @@
+from __future__ import annotations
+from typing import Optional
+
+from PySide6.QtWidgets import QCompleter, QLineEdit
+from PySide6.QtCore import Qt, QStringListModel
+
+from data.tag_prefix_index import TagPrefixIndex, DEFAULT_K
+
+
+class TagCompleter(QCompleter):
+    """Vervollständigung für kommagetrennte Tag-Felder.
+
+    Vorschläge (Top-k nach Häufigkeit, inkl. Aliase) kommen aus einem TagPrefixIndex;
+    ergänzt wird nur das gerade getippte, letzte Tag.
+    """
+
+    def __init__(self, line_edit: QLineEdit, index: Optional[TagPrefixIndex] = None, k: int = DEFAULT_K):
+        super().__init__(line_edit)
+        self._edit = line_edit
+        self._index = index
+        self._k = k
+        self._model = QStringListModel(self)
+        self.setModel(self._model)
+        self.setCaseSensitivity(Qt.CaseInsensitive)
+        # Liste ist bereits gefiltert/sortiert; Qt soll nicht nochmal nach dem Präfix filtern
+        self.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.setWidget(line_edit)  # nicht setCompleter(): das würde den ganzen Text ersetzen
+        line_edit.textEdited.connect(self._on_text_edited)
+        self.activated.connect(self._insert)
+
+    def set_index(self, index: Optional[TagPrefixIndex]) -> None:
+        self._index = index
+
+    def _on_text_edited(self, text: str) -> None:
+        token = text.split(",")[-1].strip()
+        items = self._index.suggest(token, self._k) if (self._index is not None and token) else []
+        self._model.setStringList(items)
+        if items:
+            self.complete()
+        else:
+            self.popup().hide()
+
+    def _insert(self, tag: str) -> None:
+        parts = self._edit.text().split(",")
+        parts[-1] = (" " if len(parts) > 1 else "") + tag
+        self._edit.setText(",".join(parts) + ", ")
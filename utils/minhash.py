@@ -0,0 +1,119 @@
+"""MinHash + LSH banding for near-duplicate detection (stdlib only).
+
+- Text -> word shingles after normalization (case, punctuation, numbering prefixes)
+- One-permutation MinHash: every shingle is hashed once (crc32) and lands in one of
+  `num_perm` bins; empty bins are filled by rotation (densification)
+- LSH: the signature is cut into bands; items sharing any band bucket are candidates,
+  verified by their estimated Jaccard and merged with union-find
+Runtime is linear in the total text size plus the (verified) candidate pairs.
+"""
+from __future__ import annotations
+
+import re, zlib
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE = 3
+
+_MAX = 0xFFFFFFFF
+_WORD_RE = re.compile(r"\w+")
+# "Prompt 3 — …", "3) …", "#12: …", "Nr. 4 - …"
+_NUMBERING_RE = re.compile(r"^\s*(?:(?:prompt|nr|no|#)\.?\s*)?\d+\s*[.):\-–—]*\s*", re.IGNORECASE)
+
+
+def normalize_tokens(text: str) -> List[str]:
+    text = _NUMBERING_RE.sub("", text or "", count=1)
+    return _WORD_RE.findall(text.lower())
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE) -> Set[str]:
+    tokens = normalize_tokens(text)
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def signature(items: Iterable[str], num_perm: int = DEFAULT_NUM_PERM) -> Tuple[int, ...]:
+    """One-permutation MinHash signature of a shingle set (densified)."""
+    sig = [_MAX] * num_perm
+    crc = zlib.crc32
+    for s in items:
+        h = crc(s.encode("utf-8"))
+        b = h % num_perm
+        v = h // num_perm
+        if v < sig[b]:
+            sig[b] = v
+    first = next((b for b in range(num_perm) if sig[b] != _MAX), None)
+    if first is None:
+        return tuple(sig)
+    # rotation densification: an empty bin borrows the next filled bin to the right
+    # (wrapping around), offset by the distance so borrowed values stay distinguishable
+    step = _MAX // num_perm + 1
+    nxt, pos = sig[first], first + num_perm
+    for b in range(num_perm - 1, -1, -1):
+        v = sig[b]
+        if v == _MAX:
+            sig[b] = nxt + (pos - b) * step
+        else:
+            nxt, pos = v, b
+    return tuple(sig)
+
+
+def estimate_jaccard(a: Sequence[int], b: Sequence[int]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a) if a else 0.0
+
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(bands, rows) with rows*bands == num_perm and the LSH S-curve midpoint
+    (1/bands)^(1/rows) at or just below `threshold` (favours recall)."""
+    options = [(num_perm // r, r) for r in range(1, num_perm + 1) if num_perm % r == 0]
+    midpoint = lambda br: (1.0 / br[0]) ** (1.0 / br[1])
+    below = [br for br in options if midpoint(br) <= threshold]
+    return max(below, key=midpoint) if below else min(options, key=midpoint)
+
+
+class _UnionFind:
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def near_duplicate_clusters(
+    texts: Sequence[str],
+    threshold: float = 0.8,
+    num_perm: int = DEFAULT_NUM_PERM,
+    shingle_size: int = DEFAULT_SHINGLE,
+) -> List[List[int]]:
+    """Clusters (ascending indexes, size >= 2) of texts with estimated Jaccard >= threshold."""
+    bands, rows = choose_bands(num_perm, threshold)
+    sigs: List[Tuple[int, ...]] = []
+    buckets: List[Dict[Tuple[int, ...], int]] = [{} for _ in range(bands)]
+    uf = _UnionFind(len(texts))
+    for idx, text in enumerate(texts):
+        sh = shingles(text, shingle_size)
+        sig = signature(sh, num_perm) if sh else None
+        sigs.append(sig)
+        if sig is None:
+            continue
+        for band in range(bands):
+            key = sig[band * rows:(band + 1) * rows]
+            first = buckets[band].setdefault(key, idx)
+            # compare with the bucket's first member only: linear, union-find adds transitivity
+            if first != idx and uf.find(first) != uf.find(idx) and estimate_jaccard(sigs[first], sig) >= threshold:
+                uf.union(first, idx)
+    clusters: Dict[int, List[int]] = {}
+    for idx in range(len(texts)):
+        if sigs[idx] is not None:
+            clusters.setdefault(uf.find(idx), []).append(idx)
+    return [members for members in clusters.values() if len(members) > 1]